@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 19:02:37 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark validating a large column of host:port values with the harisekhon.utils batch validation API
+
+Compares calling validate_hostport() per value, as scripts loading inventories used to, against is_many() with the
+isHostPort() predicate both in process and fanned out across a pool of --processes
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import sys
+import time
+import traceback
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import is_many, isHostPort, validate_hostport, validate_int, InvalidOptionException
+    from harisekhon import CLI
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+class BenchBatchValidation(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchBatchValidation, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.num = None
+        self.processes = None
+        self.timeout_default = 3600
+
+    def add_options(self):
+        self.add_opt('-n', '--num', default=200000, help='Number of host:port values to validate (default: 200000)')
+        self.add_opt('-p', '--processes', default=4, help='Number of processes for the pooled run (default: 4)')
+
+    def process_options(self):
+        self.no_args()
+        self.num = self.get_opt('num')
+        validate_int(self.num, 'num', 1)
+        self.num = int(self.num)
+        self.processes = self.get_opt('processes')
+        validate_int(self.processes, 'processes', 1)
+        self.processes = int(self.processes)
+
+    def run(self):
+        # 1 in 100 invalid ports
+        values = ['host{0}.harisekhon.com:{1}'.format(_, 0 if not _ % 100 else _ % 65535 + 1)
+                  for _ in range(self.num)]
+        # warm up so that the one-off TLD load isn't counted against the first run
+        isHostPort(values[1])
+        print('values: {0}, processes: {1}\n'.format(self.num, self.processes))
+        start = time.time()
+        invalid = 0
+        for value in values:
+            try:
+                validate_hostport(value)
+            except InvalidOptionException:
+                invalid += 1
+        self.print_result('validate_hostport() loop', time.time() - start, invalid)
+        start = time.time()
+        (_, invalid_indexes) = is_many(isHostPort, values)
+        self.print_result('is_many()', time.time() - start, len(invalid_indexes))
+        start = time.time()
+        (_, invalid_indexes) = is_many(isHostPort, values, processes=self.processes)
+        self.print_result('is_many() x {0} processes'.format(self.processes), time.time() - start,
+                          len(invalid_indexes))
+
+    def print_result(self, name, seconds, invalid):
+        print('{0:<32} {1:>8.3f} secs {2:>10.3f} us/value {3:>8} invalid'.format(name, seconds,
+                                                                             seconds / self.num * 1000000,
+                                                                             invalid))
+
+
+if __name__ == '__main__':
+    BenchBatchValidation().main()
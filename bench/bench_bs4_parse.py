@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 06:12:38 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark RequestBS4Handler parsing a large HDFS NameNode style status page for its uptime and version
+
+Compares the previous full BeautifulSoup(content, 'html.parser') tree against parse_only of the th / td elements,
+and the same with lxml if installed, for the time to parse and look up the values and the memory held by the tree
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import re
+import sys
+import time
+import traceback
+import tracemalloc
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from bs4 import BeautifulSoup
+    from harisekhon.utils import validate_int
+    from harisekhon import CLI, RequestBS4Handler
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+class StatusHandler(RequestBS4Handler):
+
+    def parse(self, soup):
+        uptime = soup.find('th', string=re.compile('Uptime:?', re.I)).find_next_sibling().get_text()
+        version = soup.find('th', string=re.compile('Version:?', re.I)).find_next_sibling().get_text()
+        return (uptime, version)
+
+
+class Response(object):  # pylint: disable=too-few-public-methods
+
+    def __init__(self, content):
+        self.content = content
+
+
+class BenchBS4Parse(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchBS4Parse, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.datanodes = None
+        self.iterations = None
+        self.timeout_default = 3600
+
+    def add_options(self):
+        self.add_opt('-n', '--datanodes', default=2000,
+                     help='Number of datanode rows in the generated status page (default: 2000)')
+        self.add_opt('-i', '--iterations', default=3, help='Iterations to take the best time of (default: 3)')
+
+    def process_options(self):
+        self.no_args()
+        for name in ('datanodes', 'iterations'):
+            value = self.get_opt(name)
+            validate_int(value, name, 1, 1000000)
+            setattr(self, name, int(value))
+
+    def generate(self):
+        html = ['<html><head><title>Namenode information</title>',
+                '<script type="text/javascript">var data = {0};</script></head>'.format('[1,2,3],' * 5000),
+                '<body><div class="container"><div class="page-header"><h1>Overview</h1></div>',
+                '<table class="table table-bordered table-striped">',
+                '<tr><th>Started:</th><td>Mon Oct 19 06:12:38 BST 2026</td></tr>',
+                '<tr><th>Uptime:</th><td>5 days, 3 hours</td></tr>',
+                '<tr><th>Version:</th><td>3.3.6, r1be78238728da9266a4f88195058f08fd012bf9c</td></tr>',
+                '</table><div class="datanodes"><ul class="nav nav-tabs">']
+        for index in range(self.datanodes):
+            html.append('<li><div class="node"><a href="http://datanode{0}.example.com:9864">datanode{0}</a>'
+                        .format(index) +
+                        '<span class="label label-success">In Service</span><p>Capacity: <b>{0} TB</b>, '
+                        .format(index % 12 + 1) +
+                        'Used: <b>{0}%</b>, Blocks: <i>{1}</i></p></div></li>'.format(index % 100, index * 37))
+        html.append('</ul></div></div></body></html>')
+        return ''.join(html).encode('utf-8')
+
+    def run(self):
+        content = self.generate()
+        print('status page: {0:,} bytes, {1} datanode rows'.format(len(content), self.datanodes))
+        parsers = ['html.parser']
+        try:
+            import lxml  # pylint: disable=unused-variable
+            parsers.append('lxml')
+        except ImportError:
+            print('lxml not installed, skipping')
+        expected = None
+        for parser in parsers:
+            for parse_only in (None, ('th', 'td')):
+                handler = StatusHandler()
+                handler.parser = parser
+                handler.parse_only = parse_only
+                (secs, bytes_held, result) = self.measure(handler, content)
+                if expected is None:
+                    expected = result
+                elif result != expected:
+                    raise AssertionError('{0} parse_only={1} gave {2} instead of {3}'
+                                         .format(parser, parse_only, result, expected))
+                print('{0:12s} parse_only={1:14s} {2:8.3f} secs, {3:14,.0f} bytes held'
+                      .format(parser, str(parse_only), secs, bytes_held))
+
+    # returns the best secs taken to parse and look up the values, the bytes held by the soup and the values
+    def measure(self, handler, content):
+        best = None
+        result = None
+        for _ in range(self.iterations):
+            start = time.time()
+            result = handler.__parse__(Response(content))
+            secs = time.time() - start
+            best = secs if best is None else min(best, secs)
+        # memory measured separately as tracing slows the allocations being timed
+        tracemalloc.start()
+        soup = BeautifulSoup(content, handler.parser, parse_only=handler.get_parse_only())
+        (current, _) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del soup
+        return (best, current, result)
+
+if __name__ == '__main__':
+    BenchBS4Parse().main()
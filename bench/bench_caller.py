@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 01:02:17 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark the caller lookups done on the qquit() error path and by get_topfile()
+
+Compares the previous inspect.stack() based lookups, which build a FrameInfo with source lines for every frame in the
+stack, against the lazy sys._getframe() walks of get_caller() and get_bottom_frame(), at a call stack --depth typical
+of a plugin raising from inside a client library
+
+Then times a failure storm of --iterations qquit() calls with an invalid status in result mode, each of which looks up
+its caller for the warning
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import inspect
+import logging
+import os
+import sys
+import time
+import traceback
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import log, get_caller, get_bottom_frame, qquit, set_result_mode, validate_int, \
+                                 QuitException
+    from harisekhon import CLI
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+def legacy_get_caller():
+    return inspect.stack()[2][3]
+
+
+def legacy_bottom_frame():
+    return inspect.getfile(inspect.stack()[-1][0])
+
+
+def bottom_frame():
+    return get_bottom_frame().f_code.co_filename
+
+
+def invalid_qquit():
+    try:
+        qquit('INVALID', 'failure storm')
+    except QuitException:
+        pass
+
+
+def at_depth(depth, function, iterations):
+    # recurse to put depth frames on the stack before timing the function
+    if depth > 0:
+        return at_depth(depth - 1, function, iterations)
+    start = time.time()
+    for _ in range(iterations):
+        function()
+    return (time.time() - start) * 1000000 / iterations
+
+
+class BenchCaller(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchCaller, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.iterations = None
+        self.depth = None
+        self.timeout_default = 600
+
+    def add_options(self):
+        self.add_opt('-n', '--iterations', default=2000, help='Number of lookups to time (default: 2000)')
+        self.add_opt('-d', '--depth', default=30, help='Extra call stack depth to time lookups at (default: 30)')
+
+    def process_options(self):
+        self.no_args()
+        for name in ('iterations', 'depth'):
+            value = self.get_opt(name)
+            validate_int(value, name, 0 if name == 'depth' else 1, 500 if name == 'depth' else 10000000)
+            setattr(self, name, int(value))
+
+    def run(self):
+        print('iterations:                    {0}'.format(self.iterations))
+        print('stack depth:                   {0}'.format(len(inspect.stack()) + self.depth))
+        for (name, legacy, lazy) in (('get_caller()', legacy_get_caller, get_caller),
+                                     ('get_topfile() frame', legacy_bottom_frame, bottom_frame)):
+            legacy_usecs = at_depth(self.depth, legacy, self.iterations)
+            lazy_usecs = at_depth(self.depth, lazy, self.iterations)
+            print('{0:<20} inspect.stack() {1:10.2f} usecs, sys._getframe() {2:6.2f} usecs ({3:.0f}x faster)'
+                  .format(name, legacy_usecs, lazy_usecs, legacy_usecs / lazy_usecs))
+        # the qquit() warning is filtered out by the log level but its arguments are still evaluated
+        level = log.level
+        log.setLevel(logging.CRITICAL)
+        set_result_mode()
+        try:
+            storm_usecs = at_depth(self.depth, invalid_qquit, self.iterations)
+        finally:
+            set_result_mode(False)
+            log.setLevel(level)
+        print('qquit() invalid status storm:  {0:.2f} usecs per call, {1:.0f} calls/sec'
+              .format(storm_usecs, 1000000 / storm_usecs))
+
+
+if __name__ == '__main__':
+    BenchCaller().main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 21:57:16 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark checks per second of a trivial NagiosPlugin run by fork-exec of a new Python process per check, as Nagios
+does, versus requests to the persistent harisekhon.nagiosplugin.check_daemon
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import validate_int, CriticalError
+    from harisekhon.nagiosplugin.check_daemon import request_check
+    from harisekhon import CLI
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+PLUGIN_SCRIPT = '''#!/usr/bin/env python
+"""
+Trivial check for benchmarking
+"""
+import sys
+sys.path.append({libdir!r})
+from harisekhon.nagiosplugin import NagiosPlugin
+
+__version__ = '0.1'
+
+
+class CheckBench(NagiosPlugin):
+    def run(self):
+        self.ok()
+        self.msg = 'bench ok'
+
+
+if __name__ == '__main__':
+    CheckBench().main()
+'''
+
+
+class BenchCheckDaemon(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchCheckDaemon, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.num = None
+        self.timeout_default = 3600
+
+    def add_options(self):
+        self.add_opt('-n', '--num', default=50, help='Number of checks to run each way (default: 50)')
+
+    def process_options(self):
+        self.no_args()
+        self.num = self.get_opt('num')
+        validate_int(self.num, 'num', 1)
+        self.num = int(self.num)
+
+    def run(self):
+        tmpdir = tempfile.mkdtemp()
+        daemon = None
+        try:
+            plugin = os.path.join(tmpdir, 'check_bench.py')
+            with open(plugin, 'w') as filehandle:
+                filehandle.write(PLUGIN_SCRIPT.format(libdir=libdir))
+            socket_path = os.path.join(tmpdir, 'check_daemon.sock')
+            start = time.time()
+            for _ in range(self.num):
+                output = subprocess.check_output([sys.executable, plugin])
+                if output != b'OK: bench ok\n':
+                    raise CriticalError('unexpected fork-exec check output: {0}'.format(output))
+            fork_exec_time = time.time() - start
+            daemon = subprocess.Popen([sys.executable,
+                                       os.path.join(libdir, 'harisekhon', 'nagiosplugin', 'check_daemon.py'),
+                                       '--socket', socket_path, plugin])
+            for _ in range(300):
+                if os.path.exists(socket_path):
+                    break
+                time.sleep(0.1)
+            start = time.time()
+            for _ in range(self.num):
+                result = request_check(['check_bench'], socket_path, timeout=30)
+                if result != (0, 'OK: bench ok\n'):
+                    raise CriticalError('unexpected check daemon result: {0}'.format(result))
+            daemon_time = time.time() - start
+            print('checks: {0}\n'.format(self.num))
+            print('fork-exec:     {0:>8.1f} checks/sec'.format(self.num / fork_exec_time))
+            print('check daemon:  {0:>8.1f} checks/sec'.format(self.num / daemon_time))
+            print('speedup:       {0:>8.1f}x'.format(fork_exec_time / daemon_time))
+        finally:
+            if daemon is not None:
+                daemon.terminate()
+                daemon.wait()
+            shutil.rmtree(tmpdir)
+
+
+if __name__ == '__main__':
+    BenchCheckDaemon().main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 17:02:11 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark the import time of harisekhon.utils in fresh Python interpreters
+
+Also times the first domain validation afterwards, which is the point at which the TLD list is now loaded
+and the TLD regexes are built, to show that programs which never validate a domain don't pay for them
+
+Exits CRITICAL if the median import time exceeds the --budget in milliseconds
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import subprocess
+import sys
+import tempfile
+import traceback
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import log, qquit, validate_int
+    from harisekhon import CLI
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+# runs in the child interpreter, prints the import time followed by the first domain validation time in secs
+BENCH_SCRIPT = """
+import sys
+import time
+sys.path.insert(0, {libdir!r})
+start = time.time()
+import harisekhon.utils
+imported = time.time()
+harisekhon.utils.isDomain('harisekhon.com')
+validated = time.time()
+print(imported - start, validated - imported)
+"""
+
+
+class BenchImport(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchImport, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.iterations = None
+        self.budget = None
+        self.timeout_default = 600
+
+    def add_options(self):
+        self.add_opt('-n', '--iterations', default=20, help='Number of fresh interpreters to time (default: 20)')
+        self.add_opt('-b', '--budget', help='Median import time budget in milliseconds (optional)')
+
+    def process_options(self):
+        self.no_args()
+        self.iterations = self.get_opt('iterations')
+        validate_int(self.iterations, 'iterations', 1, 10000)
+        self.iterations = int(self.iterations)
+        self.budget = self.get_opt('budget')
+        if self.budget is not None:
+            validate_int(self.budget, 'budget', 1)
+            self.budget = int(self.budget)
+
+    def run(self):
+        (filehandle, script) = tempfile.mkstemp(suffix='.py')
+        os.write(filehandle, BENCH_SCRIPT.format(libdir=libdir).encode('utf-8'))
+        os.close(filehandle)
+        import_times = []
+        validate_times = []
+        try:
+            for _ in range(self.iterations):
+                output = subprocess.check_output([sys.executable, script]).decode('utf-8')
+                log.debug('output: %s', output)
+                (import_time, validate_time) = [float(x) * 1000 for x in output.split()]
+                import_times.append(import_time)
+                validate_times.append(validate_time)
+        finally:
+            os.remove(script)
+        import_median = median(import_times)
+        print('iterations:                     {0}'.format(self.iterations))
+        print('import harisekhon.utils:        min {0:.2f} ms, median {1:.2f} ms, max {2:.2f} ms'
+              .format(min(import_times), import_median, max(import_times)))
+        print('first isDomain() (TLD load):    min {0:.2f} ms, median {1:.2f} ms, max {2:.2f} ms'
+              .format(min(validate_times), median(validate_times), max(validate_times)))
+        if self.budget is not None:
+            if import_median > self.budget:
+                qquit('CRITICAL', 'median import time {0:.2f} ms exceeds budget of {1} ms'
+                      .format(import_median, self.budget))
+            print('median import time is within budget of {0} ms'.format(self.budget))
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+if __name__ == '__main__':
+    BenchImport().main()
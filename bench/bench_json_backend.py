@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 20:31:54 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark the harisekhon.utils JSON backend on a large Ambari style API payload
+
+Times json_loads(), isJson() and jsonpp() with the standard library json module against the fastest installed
+backend as auto-selected by get_json_backend()
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import gc
+import json
+import os
+import sys
+import time
+import traceback
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import get_json_backend, set_json_backend, json_loads, isJson, jsonpp, validate_int
+    from harisekhon import CLI
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+class BenchJsonBackend(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchJsonBackend, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.hosts = None
+        self.iterations = None
+        self.timeout_default = 3600
+
+    def add_options(self):
+        self.add_opt('-n', '--hosts', default=2000, help='Number of hosts in the generated payload (default: 2000)')
+        self.add_opt('-i', '--iterations', default=5, help='Iterations to take the best time of (default: 5)')
+
+    def process_options(self):
+        self.no_args()
+        self.hosts = self.get_opt('hosts')
+        validate_int(self.hosts, 'hosts', 1)
+        self.hosts = int(self.hosts)
+        self.iterations = self.get_opt('iterations')
+        validate_int(self.iterations, 'iterations', 1)
+        self.iterations = int(self.iterations)
+
+    def generate(self):
+        items = []
+        for index in range(self.hosts):
+            items.append({
+                'href': 'http://ambari:8080/api/v1/clusters/cluster1/hosts/host{0}.example.com'.format(index),
+                'Hosts': {
+                    'cluster_name': 'cluster1',
+                    'host_name': 'host{0}.example.com'.format(index),
+                    'host_state': 'HEALTHY',
+                    'host_status': 'HEALTHY' if index % 10 else 'UNHEALTHY',
+                    'ip': '10.0.{0}.{1}'.format(index // 250, index % 250 + 1),
+                    'last_heartbeat_time': 1760000000000 + index,
+                    'os_type': 'centos7',
+                    'rack_info': '/default-rack',
+                    'disk_info': [{'device': '/dev/sd{0}'.format(_), 'mountpoint': '/data{0}'.format(_),
+                                   'percent': '{0}%'.format(_ * 7 % 100), 'size': '1031069848', 'type': 'xfs'}
+                                  for _ in range(8)],
+                },
+                'host_components': [{'HostRoles': {'component_name': name, 'state': 'STARTED',
+                                                   'host_name': 'host{0}.example.com'.format(index)}}
+                                    for name in ('DATANODE', 'NODEMANAGER', 'METRICS_MONITOR', 'HDFS_CLIENT',
+                                                 'YARN_CLIENT', 'ZOOKEEPER_CLIENT')],
+            })
+        return json.dumps({'href': 'http://ambari:8080/api/v1/clusters/cluster1/hosts', 'items': items})
+
+    def best_time(self, func, arg):
+        best = None
+        for _ in range(self.iterations):
+            gc.collect()
+            start = time.time()
+            func(arg)
+            seconds = time.time() - start
+            if best is None or seconds < best:
+                best = seconds
+        return best
+
+    def run(self):
+        content = self.generate()
+        backend = get_json_backend()
+        print('payload size: {0:.1f} MB, auto-selected backend: {1}\n'.format(len(content) / 1024 ** 2, backend))
+        print('{0:<14} {1:>12} {2:>12} {3:>10}'.format('function', 'json secs', backend + ' secs', 'speedup'))
+        for (name, func) in (('json_loads()', json_loads), ('isJson()', isJson), ('jsonpp()', jsonpp)):
+            try:
+                set_json_backend('json')
+                stdlib_time = self.best_time(func, content)
+            finally:
+                set_json_backend(backend)
+            backend_time = self.best_time(func, content)
+            print('{0:<14} {1:>12.3f} {2:>12.3f} {3:>9.1f}x'.format(name, stdlib_time, backend_time,
+                                                                    stdlib_time / backend_time))
+
+
+if __name__ == '__main__':
+    BenchJsonBackend().main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 19:48:12 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark extracting a few fields from a large Elasticsearch _nodes/stats style JSON response
+
+Compares the latency and peak memory of the current RestNagiosPlugin path of reading the whole body and json.loads()
+against streaming only the wanted paths out of it with harisekhon.utils.json_extract_paths() as RestNagiosPlugin
+subclasses setting self.json_paths now do
+
+Paths sharing the same prefix up to their wildcard are extracted in a single pass by ijson's generator interface,
+while each additional prefix adds another incremental parse, so both cases are shown
+
+The response is written to a temporary file and read back as a stream to stand in for the HTTP response body.
+Peak memory is measured with --memory, which requires Python 3.4+ tracemalloc and slows down all runs considerably
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import json_extract_paths, validate_int
+    from harisekhon import CLI
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+class BenchJsonPaths(CLI):
+
+    paths = ['nodes.*.name', 'nodes.*.jvm.mem.heap_used_percent']
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchJsonPaths, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.nodes = None
+        self.memory = False
+        self.timeout_default = 3600
+
+    def add_options(self):
+        self.add_opt('-n', '--nodes', default=2000, help='Number of nodes in the generated response (default: 2000)')
+        self.add_opt('-m', '--memory', action='store_true', help='Also measure peak memory with tracemalloc')
+
+    def process_options(self):
+        self.no_args()
+        self.nodes = self.get_opt('nodes')
+        validate_int(self.nodes, 'nodes', 1)
+        self.nodes = int(self.nodes)
+        self.memory = self.get_opt('memory')
+        if self.memory and tracemalloc is None:
+            self.usage('--memory requires Python 3.4+ tracemalloc')
+
+    def generate(self, filename):
+        node = {
+            'name': None,
+            'jvm': {
+                'mem': {'heap_used_percent': 42, 'heap_used_in_bytes': 123456789, 'pools': {}},
+                'gc': {'collectors': {'young': {'collection_count': 1234, 'collection_time_in_millis': 5678},
+                                      'old': {'collection_count': 12, 'collection_time_in_millis': 345}}},
+            },
+            'indices': dict([('stat{0}'.format(_), {'count': _, 'size_in_bytes': _ * 1024, 'time_in_millis': _ * 3})
+                             for _ in range(40)]),
+            'thread_pool': dict([('pool{0}'.format(_), {'threads': 8, 'queue': 0, 'active': 1, 'rejected': 0,
+                                                        'largest': 8, 'completed': _ * 1000})
+                                 for _ in range(30)]),
+        }
+        nodes = {}
+        for index in range(self.nodes):
+            node['name'] = 'node{0}'.format(index)
+            node['jvm']['mem']['heap_used_percent'] = index % 100
+            nodes['nodeid{0:08d}'.format(index)] = json.loads(json.dumps(node))
+        with open(filename, 'w') as filehandle:
+            json.dump({'cluster_name': 'benchmark', 'nodes': nodes}, filehandle)
+
+    @staticmethod
+    def load(filename):
+        with open(filename, 'rb') as filehandle:
+            content = filehandle.read()
+        json_data = json.loads(content.decode('utf-8'))
+        return [[_['name'] for _ in json_data['nodes'].values()],
+                [_['jvm']['mem']['heap_used_percent'] for _ in json_data['nodes'].values()],
+                [json_data['cluster_name']]]
+
+    def stream(self, filename, paths):
+        with open(filename, 'rb') as filehandle:
+            return list(json_extract_paths(filehandle, paths).values())
+
+    @staticmethod
+    def measure(func, use_tracemalloc, *args):
+        if use_tracemalloc:
+            tracemalloc.start()
+        start = time.time()
+        result = func(*args)
+        seconds = time.time() - start
+        peak = None
+        if use_tracemalloc:
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        return (result, seconds, peak)
+
+    def run(self):
+        (filehandle, filename) = tempfile.mkstemp(suffix='.json')
+        os.close(filehandle)
+        try:
+            self.generate(filename)
+            print('nodes: {0}, response size: {1:.1f} MB\n'.format(self.nodes, os.path.getsize(filename) / 1024 ** 2))
+            # warm the page cache
+            self.load(filename)
+            for (name, func, args) in (
+                    ('read + json.loads()', self.load, ()),
+                    ('json_extract_paths() 1 prefix', self.stream, (self.paths,)),
+                    ('json_extract_paths() 2 prefixes', self.stream, (self.paths + ['cluster_name'],))):
+                for use_tracemalloc in (False, True):
+                    if use_tracemalloc and not self.memory:
+                        continue
+                    (result, seconds, peak) = self.measure(func, use_tracemalloc, filename, *args)
+                    if func == self.load:
+                        expected = result
+                    elif result != expected[:len(result)]:
+                        raise AssertionError('results differ between json.loads() and json_extract_paths()')
+                    if use_tracemalloc:
+                        print('{0:<34} {1:>8.3f} secs with tracemalloc, {2:.1f} MB peak'
+                              .format(name, seconds, peak / 1024 ** 2))
+                    else:
+                        print('{0:<34} {1:>8.3f} secs'.format(name, seconds))
+        finally:
+            os.unlink(filename)
+
+
+if __name__ == '__main__':
+    BenchJsonPaths().main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 05:31:09 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark recording many latency samples and taking their percentiles
+
+Compares appending to a list and sorting it for nearest rank percentiles against LatencyRecorder, for the time to
+record and summarize, the memory held and the worst relative percentile error, then times merging per worker recorders
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import math
+import os
+import random
+import sys
+import time
+import traceback
+import tracemalloc
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import validate_int
+    from harisekhon import CLI
+    from harisekhon.nagiosplugin import LatencyRecorder
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+PERCENTILES = (50, 95, 99, 99.9)
+
+
+def list_percentiles(samples):
+    samples = sorted(samples)
+    return dict([(pct, samples[max(0, int(math.ceil(pct / 100.0 * len(samples))) - 1)]) for pct in PERCENTILES])
+
+
+class BenchLatency(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchLatency, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.samples = None
+        self.workers = None
+        self.timeout_default = 600
+
+    def add_options(self):
+        self.add_opt('-n', '--samples', default=1000000, help='Number of latency samples (default: 1000000)')
+        self.add_opt('-w', '--workers', default=16, help='Number of worker recorders to merge (default: 16)')
+
+    def process_options(self):
+        self.no_args()
+        for name in ('samples', 'workers'):
+            value = self.get_opt(name)
+            validate_int(value, name, 1, 100000000)
+            setattr(self, name, int(value))
+
+    def run(self):
+        random.seed(0)
+        # long tailed, mostly around a millisecond
+        samples = [random.lognormvariate(-7, 1.5) for _ in range(self.samples)]
+        print('samples:                    {0}'.format(self.samples))
+
+        def sorted_list():
+            recorded = []
+            append = recorded.append
+            for sample in samples:
+                append(sample)
+            return (recorded, list_percentiles(recorded))
+
+        def recorder():
+            latency = LatencyRecorder()
+            record = latency.record
+            for sample in samples:
+                record(sample)
+            return (latency, latency.percentiles(PERCENTILES))
+
+        (secs, bytes_held, exact) = self.measure(sorted_list)
+        print('list append + sort:         {0:8.3f} secs, {1:12,.0f} bytes held'.format(secs, bytes_held))
+        (secs, bytes_held, percentiles) = self.measure(recorder)
+        print('LatencyRecorder:            {0:8.3f} secs, {1:12,.0f} bytes held'.format(secs, bytes_held))
+        error = max([abs(percentiles[pct] - exact[pct]) / exact[pct] for pct in PERCENTILES])
+        print('worst percentile error:     {0:8.3f}%  ({1})'
+              .format(error * 100, ', '.join(['p{0:g}'.format(pct) for pct in PERCENTILES])))
+
+        recorders = [LatencyRecorder() for _ in range(self.workers)]
+        for (index, sample) in enumerate(samples):
+            recorders[index % self.workers].record(sample)
+        start = time.time()
+        merged = LatencyRecorder()
+        for _ in recorders:
+            merged.merge(_)
+        secs = time.time() - start
+        if merged.percentiles(PERCENTILES) != percentiles:
+            raise AssertionError('merged recorders give different percentiles')
+        print('merge {0:3d} recorders:        {1:8.3f} ms'.format(self.workers, secs * 1000))
+
+    # returns the secs taken, the bytes held by the samples in the result and the percentiles
+    @staticmethod
+    def measure(function):
+        start = time.time()
+        function()
+        secs = time.time() - start
+        # memory measured separately as tracing slows the allocations being timed
+        tracemalloc.start()
+        (_, percentiles) = function()
+        (current, _) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return (secs, current, percentiles)
+
+
+if __name__ == '__main__':
+    BenchLatency().main()
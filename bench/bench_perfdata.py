@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 03:29:05 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark building, rendering and parsing perfdata for large metric sets
+
+Compares the previous ad-hoc string concatenation with get_perf_thresholds() for each metric against Perfdata, then
+times Perfdata.parse() reading the rendered perfdata back, and the memory used per metric
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import random
+import sys
+import time
+import traceback
+import tracemalloc
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import validate_int
+    from harisekhon import CLI
+    from harisekhon.nagiosplugin import Perfdata, Threshold
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+def legacy_perf_thresholds(warning, critical):
+    # the previous NagiosPlugin.get_perf_thresholds()
+    return ';{0};{1}'.format('{0:f}'.format(warning.thresholds['upper']), '{0:f}'.format(critical.thresholds['upper']))
+
+
+class BenchPerfdata(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchPerfdata, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.metrics = None
+        self.iterations = None
+        self.timeout_default = 600
+
+    def add_options(self):
+        self.add_opt('-m', '--metrics', default=10000, help='Number of metrics per perfdata (default: 10000)')
+        self.add_opt('-n', '--iterations', default=10, help='Number of iterations to time (default: 10)')
+
+    def process_options(self):
+        self.no_args()
+        for name in ('metrics', 'iterations'):
+            value = self.get_opt(name)
+            validate_int(value, name, 1, 10000000)
+            setattr(self, name, int(value))
+
+    def run(self):
+        random.seed(0)
+        metrics = [('queue_{0}'.format(_), random.randint(0, 1000)) for _ in range(self.metrics)]
+        warning = Threshold(800)
+        critical = Threshold(950)
+
+        def legacy():
+            msg = ''
+            for (name, value) in metrics:
+                msg += ' {0}={1}c{2}'.format(name, value, legacy_perf_thresholds(warning, critical))
+            return msg.lstrip()
+
+        def build():
+            perfdata = Perfdata()
+            for (name, value) in metrics:
+                perfdata.add(name, value, 'c', warning=warning, critical=critical)
+            return str(perfdata)
+
+        rendered = build()
+        print('metrics:                   {0}'.format(self.metrics))
+        print('iterations:                {0}'.format(self.iterations))
+        legacy_secs = self.time(legacy)
+        print('legacy concatenation:      {0:8.2f} ms, {1:12,.0f} metrics/sec'
+              .format(legacy_secs * 1000, self.metrics / legacy_secs))
+        secs = self.time(build)
+        print('Perfdata add + render:     {0:8.2f} ms, {1:12,.0f} metrics/sec ({2:.1f}x)'
+              .format(secs * 1000, self.metrics / secs, legacy_secs / secs))
+        if str(Perfdata.parse(rendered)) != rendered:
+            raise AssertionError('parsed perfdata renders differently')
+        secs = self.time(lambda: Perfdata.parse(rendered))
+        print('Perfdata.parse():          {0:8.2f} ms, {1:12,.0f} metrics/sec ({2:,.1f} MB/sec)'
+              .format(secs * 1000, self.metrics / secs, len(rendered) / secs / 1024 / 1024))
+        tracemalloc.start()
+        perfdata = Perfdata.parse(rendered)
+        (current, _) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print('Perfdata memory:           {0:8.1f} bytes per metric (rendered {1:.1f} bytes per metric)'
+              .format(current / len(perfdata), len(rendered) / len(perfdata)))
+
+    def time(self, function):
+        start = time.time()
+        for _ in range(self.iterations):
+            function()
+        return (time.time() - start) / self.iterations
+
+
+if __name__ == '__main__':
+    BenchPerfdata().main()
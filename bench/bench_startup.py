@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 00:14:38 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark the script metadata lookups done on every CLI / NagiosPlugin start up - the top level script filename and its
+docstring, version and GitHub repo
+
+Compares the previous separate inspect.stack() walk and ast.parse() of the script for each of the docstring and version
+against the single pass get_file_metadata() uncached, cached in memory and cached on disk, using a generated plugin
+script of --lines lines
+
+Then times fresh interpreters running the generated plugin script's --version, with and without the on-disk cache
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import ast
+import inspect
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import traceback
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon import utils
+    from harisekhon.utils import log, get_file_metadata, validate_int
+    from harisekhon import CLI
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+PLUGIN_SCRIPT = '''#!/usr/bin/env python
+#
+#  https://github.com/HariSekhon/Nagios-Plugins
+#
+
+"""
+
+Generated Nagios Plugin to benchmark start up
+
+{description}
+
+"""
+
+import sys
+sys.path.append({libdir!r})
+from harisekhon.nagiosplugin import NagiosPlugin
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+class CheckBench(NagiosPlugin):
+
+    def run(self):
+        self.ok()
+        self.msg = 'ok'
+
+{filler}
+
+if __name__ == '__main__':
+    CheckBench().main()
+'''
+
+FILLER_FUNCTION = '''
+def filler_{0}(arg):
+    # comment
+    if arg > {0}:
+        return [_ for _ in range(arg) if _ % 2]
+    return {{'key': 'value {0}'}}
+'''
+
+
+def legacy_metadata(filename):
+    # the previous implementation - a full inspect.stack() and a parse of the whole script for each field
+    frame = inspect.stack()[-1][0]
+    inspect.getfile(frame)
+    content = open(filename).read()
+    docstring = ast.get_docstring(ast.parse(content, filename=filename, mode='exec'))
+    version = None
+    tree = ast.parse(open(filename).read(), filename=filename, mode='exec')
+    for node in (n for n in tree.body if isinstance(n, ast.Assign)):
+        if len(node.targets) == 1 and isinstance(node.targets[0], ast.Name) and node.targets[0].id == '__version__':
+            version = node.value.s
+            break
+    github_repo = ''
+    with open(filename) as filehandle:
+        for line in filehandle:
+            if 'https://github.com/HariSekhon' in line:
+                github_repo = line.lstrip('#').strip()
+                break
+    return {'docstring': docstring, 'version': version, 'github_repo': github_repo}
+
+
+def uncached_metadata(filename):
+    utils._file_metadata.clear()  # pylint: disable=protected-access
+    utils._topfile = None  # pylint: disable=protected-access
+    utils.get_topfile()
+    return get_file_metadata(filename)
+
+
+def cached_metadata(filename):
+    utils.get_topfile()
+    return get_file_metadata(filename)
+
+
+class BenchStartup(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchStartup, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.iterations = None
+        self.processes = None
+        self.lines = None
+        self.timeout_default = 600
+
+    def add_options(self):
+        self.add_opt('-n', '--iterations', default=200, help='Number of in-process lookups to time (default: 200)')
+        self.add_opt('-p', '--processes', default=10,
+                     help='Number of fresh interpreters to time, 0 to skip (default: 10)')
+        self.add_opt('-l', '--lines', default=2000, help='Approximate lines of generated plugin script (default: 2000)')
+
+    def process_options(self):
+        self.no_args()
+        for name in ('iterations', 'processes', 'lines'):
+            value = self.get_opt(name)
+            validate_int(value, name, 0 if name == 'processes' else 1, 1000000)
+            setattr(self, name, int(value))
+
+    def run(self):
+        tmpdir = tempfile.mkdtemp()
+        try:
+            script = os.path.join(tmpdir, 'check_bench.py')
+            with open(script, 'w') as filehandle:
+                filehandle.write(PLUGIN_SCRIPT.format(description='Description line\n' * 20,
+                                                      libdir=libdir,
+                                                      filler=''.join([FILLER_FUNCTION.format(_)
+                                                                      for _ in range(self.lines // 6)])))
+            print('script lines:                   {0}'.format(len(open(script).readlines())))
+            print('iterations:                     {0}'.format(self.iterations))
+            expected = legacy_metadata(script)
+            legacy = self.time_lookups(legacy_metadata, script, expected)
+            print('legacy stack + 2x ast.parse:    {0:.3f} ms per start up'.format(legacy))
+            uncached = self.time_lookups(uncached_metadata, script, expected)
+            print('get_file_metadata() uncached:   {0:.3f} ms per start up ({1:.1f}x faster)'
+                  .format(uncached, legacy / uncached))
+            cached = self.time_lookups(cached_metadata, script, expected)
+            print('get_file_metadata() cached:     {0:.3f} ms per lookup ({1:.0f}x faster)'
+                  .format(cached, legacy / cached))
+            os.environ['HARISEKHON_CACHE_DIR'] = os.path.join(tmpdir, 'cache')
+            try:
+                uncached_metadata(script)
+                disk_cached = self.time_lookups(uncached_metadata, script, expected)
+            finally:
+                del os.environ['HARISEKHON_CACHE_DIR']
+            print('get_file_metadata() disk cache: {0:.3f} ms per start up ({1:.1f}x faster)'
+                  .format(disk_cached, legacy / disk_cached))
+            if self.processes:
+                print()
+                print('fresh interpreters:             {0}'.format(self.processes))
+                no_cache = self.time_processes(script)
+                print('check_bench.py --version:       {0:.1f} ms median'.format(no_cache))
+                disk_cached = self.time_processes(script, cache_dir=os.path.join(tmpdir, 'cache'))
+                print('with $HARISEKHON_CACHE_DIR:     {0:.1f} ms median'.format(disk_cached))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def time_lookups(self, function, script, expected):
+        if function(script) != expected:
+            raise AssertionError('{0} returned different metadata'.format(function.__name__))
+        start = time.time()
+        for _ in range(self.iterations):
+            function(script)
+        return (time.time() - start) * 1000 / self.iterations
+
+    def time_processes(self, script, cache_dir=None):
+        env = dict(os.environ)
+        if cache_dir:
+            env['HARISEKHON_CACHE_DIR'] = cache_dir
+        timings = []
+        for _ in range(self.processes):
+            start = time.time()
+            process = subprocess.Popen([sys.executable, script, '--version'], env=env,
+                                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            output = process.communicate()[0]
+            timings.append((time.time() - start) * 1000)
+            log.debug('output: %s', output)
+            if not re.search(br'check_bench\.py version 0\.1', output):
+                raise AssertionError('unexpected output from {0}: {1}'.format(script, output))
+        timings.sort()
+        return timings[len(timings) // 2]
+
+
+if __name__ == '__main__':
+    BenchStartup().main()
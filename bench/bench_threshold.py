@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 02:04:51 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark checking many results against a warning and critical Threshold, eg. per partition or per node metrics
+
+Compares the previous Threshold.check() implementation, which re-validated each result with isFloat() and looked up
+the boundaries in dicts, against the compiled Threshold.check() and check_many(), which uses NumPy if available
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import random
+import sys
+import time
+import traceback
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon.utils import isFloat, validate_int
+    from harisekhon import CLI
+    from harisekhon.nagiosplugin import Threshold
+    from harisekhon.nagiosplugin.threshold import _get_numpy
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+def legacy_check(threshold, result):
+    # the previous Threshold.check()
+    thresholds = threshold.thresholds
+    if thresholds['upper'] is None and thresholds['lower'] is None:
+        return ''
+    if not isFloat(result):
+        return '(not a float!)'
+    result = float(result)
+    if threshold.opts['invert']:
+        if thresholds['lower'] is not None and thresholds['upper'] is not None and \
+           result >= thresholds['lower'] and result <= thresholds['upper']:
+            return '({0:g} <= {1:g} <= {2:g})'.format(thresholds['lower'], result, thresholds['upper'])
+    else:
+        if thresholds['lower'] is not None and result < thresholds['lower']:
+            return '({0:g} < {1:g})'.format(result, thresholds['lower'])
+        if thresholds['upper'] is not None and result > thresholds['upper']:
+            return '({0:g} > {1:g})'.format(result, thresholds['upper'])
+    return ''
+
+
+class BenchThreshold(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchThreshold, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.results = None
+        self.iterations = None
+        self.timeout_default = 600
+
+    def add_options(self):
+        self.add_opt('-r', '--results', default=10000, help='Number of results to check per iteration (default: 10000)')
+        self.add_opt('-n', '--iterations', default=20, help='Number of iterations to time (default: 20)')
+
+    def process_options(self):
+        self.no_args()
+        for name in ('results', 'iterations'):
+            value = self.get_opt(name)
+            validate_int(value, name, 1, 100000000)
+            setattr(self, name, int(value))
+
+    def run(self):
+        random.seed(0)
+        # mostly within thresholds as in a healthy cluster
+        results = [random.random() * 100 for _ in range(self.results)]
+        warning = Threshold('80', name='warning', integer=False)
+        critical = Threshold('95', name='critical', integer=False)
+        expected = [index for (index, result) in enumerate(results)
+                    if legacy_check(critical, result) or legacy_check(warning, result)]
+        print('results:                  {0} ({1} breaching)'.format(self.results, len(expected)))
+        print('iterations:               {0}'.format(self.iterations))
+        print('numpy available:          {0}'.format(_get_numpy() is not None))
+
+        def legacy():
+            return [index for (index, result) in enumerate(results)
+                    if legacy_check(critical, result) or legacy_check(warning, result)]
+
+        def compiled():
+            return [index for (index, result) in enumerate(results)
+                    if critical.check(result) or warning.check(result)]
+
+        def check_many():
+            return sorted(set(critical.check_many(results)) | set(warning.check_many(results)))
+
+        legacy_secs = None
+        for (name, function) in (('legacy check()', legacy),
+                                 ('compiled check()', compiled),
+                                 ('check_many()', check_many)):
+            if function() != expected:
+                raise AssertionError('{0} returned different breaches'.format(name))
+            start = time.time()
+            for _ in range(self.iterations):
+                function()
+            secs = (time.time() - start) / self.iterations
+            legacy_secs = legacy_secs or secs
+            print('{0:<25} {1:8.2f} ms, {2:12,.0f} results/sec ({3:.1f}x)'
+                  .format(name + ':', secs * 1000, self.results / secs, legacy_secs / secs))
+
+
+if __name__ == '__main__':
+    BenchThreshold().main()
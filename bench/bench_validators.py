@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 17:41:05 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Benchmark the per-call cost of the harisekhon.utils validation predicates over a large number of values
+
+Compares the precompiled anchored regexes and the label + TLD set based domain validation now used by isHost(),
+isFqdn(), isEmail(), isUrl() etc. against the old style of re.match('^' + regex + '$', value) on every call,
+optionally purging the re module's cache every --purge-every calls to simulate the recompiles caused by cache
+evictions in programs using many regexes
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+
+import os
+import re
+import sys
+import time
+import traceback
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+try:
+    # pylint: disable=wrong-import-position
+    from harisekhon import utils
+    from harisekhon.utils import validate_int
+    from harisekhon import CLI
+except ImportError as _:
+    print(traceback.format_exc(), end='')
+    sys.exit(4)
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+class BenchValidators(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BenchValidators, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.num = None
+        self.purge_every = None
+        self.timeout_default = 3600
+
+    def add_options(self):
+        self.add_opt('-n', '--num', default=200000, help='Number of values to validate per predicate (default: 200000)')
+        self.add_opt('--purge-every', default=0,
+                     help='Purge the re module cache every N calls in the old style run (default: 0 = never)')
+
+    def process_options(self):
+        self.no_args()
+        self.num = self.get_opt('num')
+        validate_int(self.num, 'num', 1)
+        self.num = int(self.num)
+        self.purge_every = self.get_opt('purge_every')
+        validate_int(self.purge_every, 'purge every', 0)
+        self.purge_every = int(self.purge_every)
+
+    def run(self):
+        benchmarks = (
+            ('isHost', 'host_regex', ['host{0}.harisekhon.COM'.format(_) for _ in range(self.num // 2)] +
+             ['10.{0}.{1}.{2}'.format(_ % 256, (_ // 256) % 256, _ % 250 + 1) for _ in range(self.num // 2)]),
+            ('isDomain', 'domain_regex', ['domain{0}.co.UK'.format(_) for _ in range(self.num)]),
+            ('isHostname', 'hostname_regex', ['host{0}.harisekhon.COM'.format(_) for _ in range(self.num)]),
+            ('isFqdn', 'fqdn_regex', ['host{0}.eu-west-1.compute.internal'.format(_) for _ in range(self.num)]),
+            ('isEmail', 'email_regex', ['user{0}@harisekhon.COM'.format(_) for _ in range(self.num)]),
+            ('isUrl', 'url_regex', ['https://host{0}.harisekhon.COM:8443/path/{0}'.format(_) for _ in range(self.num)]),
+            ('isKrb5Princ', 'krb5_principal_regex',
+             ['hari/host{0}.harisekhon.COM@HARISEKHON.COM'.format(_) for _ in range(self.num)]),
+            ('isIP', 'ip_regex', ['192.168.{0}.{1}'.format(_ % 256, _ % 254 + 1) for _ in range(self.num)]),
+            ('isVersion', 'version_regex', ['1.{0}.{1}'.format(_ % 100, _) for _ in range(self.num)]),
+        )
+        print('values per predicate: {0}, purge re cache every: {1}\n'.format(self.num, self.purge_every or 'never'))
+        print('{0:<12} {1:>16} {2:>16} {3:>10}'.format('predicate', 'old us/call', 'new us/call', 'speedup'))
+        for (func_name, regex_name, values) in benchmarks:
+            regex = getattr(utils, regex_name)
+            func = getattr(utils, func_name)
+            # warm up both so that the one-off TLD load and compile isn't counted against either
+            re.match('^' + regex + '$', values[0])
+            func(values[0])
+            old_time = self.time_old_style(regex, values)
+            start = time.time()
+            for value in values:
+                func(value)
+            new_time = time.time() - start
+            print('{0:<12} {1:>16.3f} {2:>16.3f} {3:>9.1f}x'.format(func_name,
+                                                                   old_time / len(values) * 1000000,
+                                                                   new_time / len(values) * 1000000,
+                                                                   old_time / new_time))
+
+    def time_old_style(self, regex, values):
+        purge_every = self.purge_every
+        start = time.time()
+        for (index, value) in enumerate(values):
+            if purge_every and not index % purge_every:
+                re.purge()
+            str(value)
+            re.match('^' + regex + '$', value)
+        return time.time() - start
+
+
+if __name__ == '__main__':
+    BenchValidators().main()
@@ -20,24 +20,51 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import importlib
+import sys
+
 # from harisekhon.utils import *
-# enables 'from harisekhon import CLI'
-from harisekhon.cli import CLI
-from harisekhon.request_handler import RequestHandler
-from harisekhon.request_bs4_handler import RequestBS4Handler
-# enables 'from harisekhon import NagiosPlugin'
-from harisekhon.nagiosplugin import NagiosPlugin
-from harisekhon.nagiosplugin import DockerNagiosPlugin
-from harisekhon.nagiosplugin import KeyCheckNagiosPlugin
-from harisekhon.nagiosplugin import KeyWriteNagiosPlugin
-from harisekhon.nagiosplugin import LiveNodesNagiosPlugin
-from harisekhon.nagiosplugin import DeadNodesNagiosPlugin
-from harisekhon.nagiosplugin import StatusNagiosPlugin
-from harisekhon.nagiosplugin import VersionNagiosPlugin
-from harisekhon.nagiosplugin import PubSubNagiosPlugin
-from harisekhon.nagiosplugin import RestNagiosPlugin
-from harisekhon.nagiosplugin import RestVersionNagiosPlugin
-from harisekhon.nagiosplugin import Threshold
-
-# pulls submodules in to 'from harisekhon import *'
-# __all__ = [ 'submodule1', 'submodule2' ]
+# enables 'from harisekhon import CLI' and 'from harisekhon import NagiosPlugin'
+#
+# PEP 562 - each class is only imported on first access so that a simple plugin doesn't pay for importing the third
+# party modules of the classes it doesn't use, eg. BeautifulSoup, the Docker SDK and Kerberos auth
+_exports = {
+    'CLI': 'harisekhon.cli',
+    'Result': 'harisekhon.result',
+    'Deadline': 'harisekhon.deadline',
+    'RequestHandler': 'harisekhon.request_handler',
+    'RequestBS4Handler': 'harisekhon.request_bs4_handler',
+    'NagiosPlugin': 'harisekhon.nagiosplugin',
+    'DockerNagiosPlugin': 'harisekhon.nagiosplugin',
+    'KeyCheckNagiosPlugin': 'harisekhon.nagiosplugin',
+    'KeyWriteNagiosPlugin': 'harisekhon.nagiosplugin',
+    'LiveNodesNagiosPlugin': 'harisekhon.nagiosplugin',
+    'DeadNodesNagiosPlugin': 'harisekhon.nagiosplugin',
+    'StatusNagiosPlugin': 'harisekhon.nagiosplugin',
+    'VersionNagiosPlugin': 'harisekhon.nagiosplugin',
+    'PubSubNagiosPlugin': 'harisekhon.nagiosplugin',
+    'RestNagiosPlugin': 'harisekhon.nagiosplugin',
+    'RestVersionNagiosPlugin': 'harisekhon.nagiosplugin',
+    'Threshold': 'harisekhon.nagiosplugin',
+}
+
+# pulls the classes in to 'from harisekhon import *'
+__all__ = [str(_) for _ in _exports]
+
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module(_exports[name]), name)
+        # cache as a real attribute so later lookups don't come back through here
+        globals()[name] = value
+        return value
+    raise AttributeError("module '{0}' has no attribute '{1}'".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
+
+# Python < 3.7 doesn't support module __getattr__ so fall back to importing everything up front
+if sys.version_info < (3, 7):
+    for _ in _exports:
+        __getattr__(_)
@@ -30,6 +30,7 @@ import os
 # import re # re-enable if suppressing broken pipe to exclude check_ code
 import signal
 import sys
+import threading
 import time
 import traceback
 #import traceback
@@ -52,11 +53,26 @@ sys.path.append(libdir)
 import harisekhon
 from harisekhon.utils import log, getenvs2, isBlankOrNone, isInt, isHost, isPort, isStr, isList, validate_int
 from harisekhon.utils import CodingError, InvalidOptionException, ERRORS, qquit  # , die
+from harisekhon.utils import QuitException, is_result_mode, set_result_mode
 from harisekhon.utils import get_topfile, get_file_docstring, get_file_github_repo, get_file_version, plural
 from harisekhon.utils import CriticalError, WarningError, UnknownError
+from harisekhon.result import Result
+from harisekhon.deadline import Deadline
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.9.6'
+__version__ = '0.11.2'
+
+# secs past the --timeout for the watchdog to hard exit if SIGALRM failed to stop the main thread
+TIMEOUT_GRACE_SECS = 5
+
+
+class ResultModeOptionParser(OptionParser):
+
+    # optparse prints option errors to stderr and exits 2, keep the message for the Result in result mode instead
+    def error(self, msg):
+        if is_result_mode():
+            raise InvalidOptionException(msg)
+        OptionParser.error(self, msg)
 
 
 class CLI(object):
@@ -90,6 +106,13 @@ class CLI(object):
         self.__timeout = None
         self.__timeout_max = 86400
         self.__total_run_time = time.time()
+        # argv to parse instead of sys.argv[1:], set by execute()
+        self.__argv = None
+        # set from --timeout by main(), use self.deadline.timeout() for blocking calls' timeouts
+        self.deadline = None
+        # hard exits the process if the main thread doesn't stop at the deadline
+        self.__timeout_backstop = None
+        self.__timeout_alarm = False
         self.topfile = get_topfile()
         self._docstring = get_file_docstring(self.topfile)
         if self._docstring:
@@ -135,7 +158,7 @@ class CLI(object):
         # limit the width to 200 as we don't want super long strings going all the way across
         # 27" Thunderbolt displays of 364 columns etc.
         width = min(width, 200)
-        self.__parser = OptionParser(add_help_option=False, formatter=IndentedHelpFormatter(width=width))
+        self.__parser = ResultModeOptionParser(add_help_option=False, formatter=IndentedHelpFormatter(width=width))
         # duplicate key error or duplicate options, sucks
         # self.__parser.add_option('-V', dest='version', help='Show version and exit', action='store_true')
         self.setup()
@@ -156,6 +179,7 @@ class CLI(object):
             self.add_default_opts()
         except InvalidOptionException as _:
             self.usage(_)
+        previous_deadline = Deadline.current()
         try:
             self.__parse_args__()
             # broken
@@ -167,16 +191,19 @@ class CLI(object):
             log.info('verbose level: %s (%s)', self.verbose, logging.getLevelName(log.getEffectiveLevel()))
             if self.timeout is not None:
                 validate_int(self.timeout, 'timeout', 0, self.timeout_max)
-                log.debug('setting timeout alarm (%s)', self.timeout)
-                signal.signal(signal.SIGALRM, self.timeout_handler)
-                signal.alarm(int(self.timeout))
+                log.debug('setting timeout deadline (%s)', self.timeout)
+                self.deadline = Deadline(self.timeout)
+                Deadline.set_current(self.deadline)
+                # in result mode the caller handles the timeout via DeadlineExceeded as the process must live on
+                if not is_result_mode():
+                    self.__set_timeout_alarm__()
             # if self.options.version:
             #     print(self.version)
             #     sys.exit(ERRORS['UNKNOWN'])
             self.process_options()
             self.process_args()
             try:
-                self.run()
+                self.__run__()
             except CriticalError as _:
                 qquit('CRITICAL', _)
             except WarningError as _:
@@ -191,6 +218,16 @@ class CLI(object):
         except KeyboardInterrupt:
             # log.debug('Caught control-c...')
             print('Caught control-c...')  # pragma: no cover
+        finally:
+            if self.__timeout_alarm:
+                signal.alarm(0)
+                self.__timeout_alarm = False
+            if self.__timeout_backstop is not None:
+                self.__timeout_backstop.cancel()
+                self.__timeout_backstop = None
+            if self.deadline is not None:
+                self.deadline.cancel()
+            Deadline.set_current(previous_deadline)
 #        except IOError as _:
 #            if str(_) == '[Errno 32] Broken pipe' and not re.match('^check_', self.topfile):
 #                pass
@@ -203,7 +240,42 @@ class CLI(object):
         #        log.debug(traceback.format_exc())
         #    die('{exception_type}: {msg}'.format(exception_type=exception_type, msg=_))
 
+    # runs main() returning a Result instead of printing and exiting, for running many checks in one process
+    #
+    # argv excludes the program name and defaults to sys.argv[1:]
+    #
+    # ideally use a new instance per execution as options and state accumulate on the object the same as for main()
+    def execute(self, argv=None):
+        if argv is not None:
+            argv = [str(_) for _ in argv]
+        self.__argv = argv
+        start_time = time.time()
+        previous_result_mode = is_result_mode()
+        set_result_mode(True)
+        (status, msg) = ('OK', '')
+        try:
+            self.main()
+        except QuitException as _:
+            (status, msg) = (_.status, _.msg)
+        except SystemExit as _:
+            # a plain sys.exit() such as from --version
+            status = 'UNKNOWN'
+            for (name, code) in ERRORS.items():
+                if code == _.code and name != 'DEPENDENT':
+                    status = name
+        finally:
+            set_result_mode(previous_result_mode)
+            self.__argv = None
+        return Result(status, msg, start_time=start_time, run_time=time.time() - start_time)
+
+    # runs the program, extended by NagiosPlugin to return cached results
+    def __run__(self):
+        self.run()
+        self.check_timeout()
+
     def usage(self, msg='', status='UNKNOWN'):
+        if is_result_mode():
+            qquit(status, msg)
         if msg:
             print('%s\n' % msg, file=sys.stderr)
         else:
@@ -233,7 +305,7 @@ class CLI(object):
     def is_option_defined(self, name):
         return name in dir(self.options)
 
-    def timeout_handler(self, signum, frame):  # pylint: disable=unused-argument
+    def timeout_handler(self, signum=None, frame=None):  # pylint: disable=unused-argument
         # problem with this is that it'll print and then the exit exception will be caught and quit() printed again
         # raising a custom TimeoutException will need to be handled in main, but that would also likely print and be
         # re-caught and re-printed by NagiosPlugin
@@ -243,10 +315,54 @@ class CLI(object):
         # only exit would be caught
         qquit('UNKNOWN', 'self timed out after %d second%s' % (self.timeout, plural(self.timeout)))
 
+    # SIGALRM interrupts blocking calls in the main thread to raise the timeout_handler() SystemExit in main() as
+    # before, with the deadline watchdog hard exiting as a backstop a grace period later in case it doesn't stop.
+    # Signals are only available to the main thread so elsewhere the watchdog exits at the deadline
+    def __set_timeout_alarm__(self):
+        if not self.timeout:
+            return
+        grace = 0
+        # threading.main_thread() is Python 3.4+ only
+        # pylint: disable=protected-access
+        if hasattr(signal, 'SIGALRM') and isinstance(threading.current_thread(), threading._MainThread):
+            signal.signal(signal.SIGALRM, self.timeout_handler)
+            signal.alarm(int(self.timeout))
+            self.__timeout_alarm = True
+            grace = TIMEOUT_GRACE_SECS
+        self.__timeout_backstop = Deadline(self.timeout + grace, on_expire=self.__timeout_exit__)
+
+    # called from the deadline watchdog thread, which unlike SIGALRM can't interrupt the main thread, so print the
+    # timeout_handler() output and hard exit with its exit code instead
+    def __timeout_exit__(self, deadline):  # pylint: disable=unused-argument
+        try:
+            self.timeout_handler()
+        except SystemExit as _:
+            sys.stdout.flush()
+            os._exit(_.code)  # pylint: disable=protected-access
+
+    # raises DeadlineExceeded => 'UNKNOWN: self timed out' once past the --timeout deadline, call between the steps of
+    # long running checks so that they stop promptly in result mode where the watchdog doesn't exit the process
+    def check_timeout(self):
+        if self.deadline is not None:
+            self.deadline.check()
+
+    # sleep which stops at the --timeout deadline
+    def sleep(self, secs):
+        if self.deadline is not None:
+            self.deadline.sleep(secs)
+        else:
+            time.sleep(secs)
+
     def disable_timeout(self):
         log.info('disabling timeout')
         self.timeout = 0
-        signal.alarm(0)
+        if self.__timeout_alarm:
+            signal.alarm(0)
+            self.__timeout_alarm = False
+        if self.__timeout_backstop is not None:
+            self.__timeout_backstop.cancel()
+        if self.deadline is not None:
+            self.deadline.cancel()
 
     @property
     def timeout(self):
@@ -338,7 +454,7 @@ class CLI(object):
 
     def __parse_args__(self):
         try:
-            (self.options, self.args) = self.__parser.parse_args()
+            (self.options, self.args) = self.__parser.parse_args(args=self.__argv)
         # I don't agree with zero exit code from OptionParser for help/usage,
         # and want UNKNOWN not CRITICAL(2) for switch mis-usage...
         except SystemExit:  # pragma: no cover
@@ -346,6 +462,8 @@ class CLI(object):
         if self.options.help:  # pragma: no cover
             self.usage()
         if self.options.version:  # pragma: no cover
+            if is_result_mode():
+                qquit('UNKNOWN', self.version)
             print('%(version)s' % self.__dict__)
             sys.exit(ERRORS['UNKNOWN'])
         self.__parse_verbose__()
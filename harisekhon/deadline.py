@@ -0,0 +1,223 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 23:26:35 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Deadline Class - thread safe timeouts for running many checks concurrently, replacing the process global SIGALRM
+
+Code that blocks should take its timeouts from deadline.timeout() and call deadline.check() between steps, which raises
+DeadlineExceeded, an UnknownError, giving the usual 'UNKNOWN: self timed out after N seconds'
+
+A single watchdog thread fires the callbacks of expired deadlines, eg. to close connections to cancel in-flight I/O
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+#from __future__ import unicode_literals
+
+import heapq
+import itertools
+import os
+import sys
+import threading
+import time
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, code_error, isFloat, plural, UnknownError
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1.1'
+
+try:
+    # Python 3.3+, unaffected by system clock changes
+    _now = time.monotonic
+except AttributeError:
+    _now = time.time
+
+
+class DeadlineExceeded(UnknownError):
+    pass
+
+
+class Deadline(object):
+
+    _current = threading.local()
+
+    # secs of None or 0 is no deadline, on_expire is a callback added via add_callback()
+    def __init__(self, secs, on_expire=None):
+        if secs is not None and not isFloat(secs):
+            code_error('invalid secs passed to Deadline(), must be a number of seconds or None')
+        self.secs = float(secs) if secs else None
+        self.expires_at = _now() + self.secs if self.secs else None
+        self.cancelled = False
+        self.__expired = threading.Event()
+        self.__callbacks = []
+        self.__lock = threading.Lock()
+        if on_expire is not None:
+            self.add_callback(on_expire)
+        if self.expires_at is not None:
+            _watchdog.schedule(self)
+
+    # the deadline of the check running in this thread, set by CLI.main(), for code that isn't passed the deadline
+    @classmethod
+    def current(cls):
+        return getattr(cls._current, 'deadline', None)
+
+    @classmethod
+    def set_current(cls, deadline):
+        if deadline is not None and not isinstance(deadline, Deadline):
+            code_error('non-Deadline passed to Deadline.set_current()')
+        cls._current.deadline = deadline
+
+    def __enter__(self):
+        self.__previous = self.current()  # pylint: disable=attribute-defined-outside-init
+        self.set_current(self)
+        return self
+
+    def __exit__(self, *args):
+        self.set_current(self.__previous)
+        self.cancel()
+
+    @property
+    def msg(self):
+        return 'self timed out after {0:g} second{1}'.format(self.secs, plural(self.secs))
+
+    def remaining(self):
+        if self.expires_at is None:
+            return None
+        return max(self.expires_at - _now(), 0)
+
+    def expired(self):
+        if self.__expired.is_set():
+            return True
+        return self.expires_at is not None and not self.cancelled and _now() >= self.expires_at
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded(self.msg)
+
+    # returns the secs to use for a blocking call's timeout, capped to the given secs, None if neither is set
+    def timeout(self, secs=None):
+        self.check()
+        remaining = self.remaining()
+        if remaining is None:
+            return secs
+        if secs is None:
+            return remaining
+        return min(secs, remaining)
+
+    # sleeps up to the deadline, raising DeadlineExceeded if the deadline is reached
+    def sleep(self, secs):
+        remaining = self.remaining()
+        if remaining is not None and remaining < secs:
+            self.__expired.wait(remaining)
+            self.check()
+            # cancelled during the wait, finish the sleep
+            time.sleep(max(secs - remaining, 0))
+        else:
+            time.sleep(secs)
+
+    # callbacks are called with this deadline from the watchdog thread when it expires
+    def add_callback(self, callback):
+        if not callable(callback):
+            code_error('non-callable passed to Deadline.add_callback()')
+        with self.__lock:
+            if not self.__expired.is_set():
+                self.__callbacks.append(callback)
+                return callback
+        callback(self)
+        return callback
+
+    def remove_callback(self, callback):
+        with self.__lock:
+            if callback in self.__callbacks:
+                self.__callbacks.remove(callback)
+
+    def cancel(self):
+        self.cancelled = True
+
+    def expire(self):
+        with self.__lock:
+            if self.cancelled or self.__expired.is_set():
+                return
+            self.__expired.set()
+            callbacks = list(self.__callbacks)
+        log.debug('deadline expired: %s', self.msg)
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as _:  # pylint: disable=broad-except
+                log.warning('deadline callback %s failed: %s', callback, _)
+
+
+class DeadlineWatchdog(object):
+
+    def __init__(self):
+        self.__pid = None
+        self.__heap = None
+        self.__condition = None
+        self.__counter = itertools.count()
+
+    def schedule(self, deadline):
+        # locked so that concurrent first deadlines in a process share one watchdog and are all pushed onto its heap
+        with _watchdog_lock:
+            if self.__pid != os.getpid():
+                # threads don't survive fork so start a new watchdog in child processes
+                self.__pid = os.getpid()
+                self.__heap = []
+                self.__condition = threading.Condition()
+                thread = threading.Thread(target=self.run, args=(self.__heap, self.__condition),
+                                          name='DeadlineWatchdog')
+                thread.daemon = True
+                thread.start()
+            (heap, condition) = (self.__heap, self.__condition)
+        with condition:
+            heapq.heappush(heap, (deadline.expires_at, next(self.__counter), deadline))
+            condition.notify()
+
+    @staticmethod
+    def run(heap, condition):
+        while True:
+            with condition:
+                while True:
+                    if heap and heap[0][2].cancelled:
+                        heapq.heappop(heap)
+                    elif not heap:
+                        condition.wait()
+                    elif heap[0][0] > _now():
+                        condition.wait(heap[0][0] - _now())
+                    else:
+                        deadline = heapq.heappop(heap)[2]
+                        break
+            deadline.expire()
+
+
+_watchdog_lock = threading.Lock()
+
+
+def _reset_watchdog_lock():
+    # a thread holding the lock at fork time doesn't exist in the child to release it
+    global _watchdog_lock  # pylint: disable=global-statement
+    _watchdog_lock = threading.Lock()
+
+
+# Python 3.7+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_watchdog_lock)  # pylint: disable=no-member
+
+_watchdog = DeadlineWatchdog()
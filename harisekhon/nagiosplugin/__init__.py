@@ -22,22 +22,49 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
-# enables 'from harisekhon.nagiosplugin import NagiosPlugin'
-from harisekhon.nagiosplugin.nagiosplugin import NagiosPlugin
-from harisekhon.nagiosplugin.docker_nagiosplugin import DockerNagiosPlugin
-from harisekhon.nagiosplugin.keycheck_nagiosplugin import KeyCheckNagiosPlugin
-from harisekhon.nagiosplugin.keywrite_nagiosplugin import KeyWriteNagiosPlugin
-from harisekhon.nagiosplugin.livenodes_nagiosplugin import LiveNodesNagiosPlugin
-from harisekhon.nagiosplugin.deadnodes_nagiosplugin import DeadNodesNagiosPlugin
-from harisekhon.nagiosplugin.pubsub_nagiosplugin import PubSubNagiosPlugin
-from harisekhon.nagiosplugin.rest_nagiosplugin import RestNagiosPlugin
-from harisekhon.nagiosplugin.rest_version_nagiosplugin import RestVersionNagiosPlugin
-from harisekhon.nagiosplugin.status_nagiosplugin import StatusNagiosPlugin
-from harisekhon.nagiosplugin.version_nagiosplugin import VersionNagiosPlugin
-
-# enables 'from harisekhon.nagiosplugin import Threshold'
-from harisekhon.nagiosplugin.threshold import Threshold
-from harisekhon.nagiosplugin.threshold import InvalidThresholdException
-
-# pulls submodules in to 'from harisekhon import *'
-# __all__ = [ 'submodule1', 'submodule2' ]
+import importlib
+import sys
+
+# enables 'from harisekhon.nagiosplugin import NagiosPlugin' and 'from harisekhon.nagiosplugin import Threshold'
+#
+# PEP 562 - each class is only imported on first access, see harisekhon/__init__.py
+_exports = {
+    'NagiosPlugin': 'harisekhon.nagiosplugin.nagiosplugin',
+    'DockerNagiosPlugin': 'harisekhon.nagiosplugin.docker_nagiosplugin',
+    'KeyCheckNagiosPlugin': 'harisekhon.nagiosplugin.keycheck_nagiosplugin',
+    'KeyWriteNagiosPlugin': 'harisekhon.nagiosplugin.keywrite_nagiosplugin',
+    'LiveNodesNagiosPlugin': 'harisekhon.nagiosplugin.livenodes_nagiosplugin',
+    'DeadNodesNagiosPlugin': 'harisekhon.nagiosplugin.deadnodes_nagiosplugin',
+    'PubSubNagiosPlugin': 'harisekhon.nagiosplugin.pubsub_nagiosplugin',
+    'RestNagiosPlugin': 'harisekhon.nagiosplugin.rest_nagiosplugin',
+    'RestVersionNagiosPlugin': 'harisekhon.nagiosplugin.rest_version_nagiosplugin',
+    'StatusNagiosPlugin': 'harisekhon.nagiosplugin.status_nagiosplugin',
+    'VersionNagiosPlugin': 'harisekhon.nagiosplugin.version_nagiosplugin',
+    'CheckDaemon': 'harisekhon.nagiosplugin.check_daemon',
+    'BatchRunner': 'harisekhon.nagiosplugin.batch_runner',
+    'Threshold': 'harisekhon.nagiosplugin.threshold',
+    'InvalidThresholdException': 'harisekhon.nagiosplugin.threshold',
+    'Perfdata': 'harisekhon.nagiosplugin.perfdata',
+    'LatencyRecorder': 'harisekhon.nagiosplugin.latency',
+    'ResultCache': 'harisekhon.nagiosplugin.result_cache',
+}
+
+# pulls the classes in to 'from harisekhon.nagiosplugin import *'
+__all__ = [str(_) for _ in _exports]
+
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module(_exports[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError("module '{0}' has no attribute '{1}'".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_exports))
+
+# Python < 3.7 doesn't support module __getattr__ so fall back to importing everything up front
+if sys.version_info < (3, 7):
+    for _ in _exports:
+        __getattr__(_)
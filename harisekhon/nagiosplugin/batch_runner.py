@@ -0,0 +1,360 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 22:41:26 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn
+#  and optionally send me feedback to help steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Batch Runner - runs many NagiosPlugin checks concurrently in one process, collecting the status, message and perfdata
+               of each check followed by an aggregate summary of statuses, throughput and latency
+
+Checks are defined in a YAML or JSON file as a list of checks, or a dict with a 'checks' list:
+
+    checks:
+      - name: hbase master         # optional, defaults to the plugin script name
+        plugin: check_hbase_master.py      # relative to the file's directory, optionally suffixed with :ClassName
+        args: [--host, myhost, --port, 16010]      # or a string to split shell-style
+        timeout: 20                # optional, overrides --check-timeout
+
+Checks run in a bounded pool of --workers, each in its own thread by default. Threads share the process global state
+such as the environment, use --processes to run each check in its own forked process instead. Checks passing verbose
+or debug switches are always run in a forked process as they set the process global log level. The batch's log level
+and stdout / stderr are restored after the checks run
+
+Checks run with the plugin script they were loaded from as their topfile so that their usage, --version, User-Agent
+and key names describe the plugin rather than the batch runner
+
+YAML checks files require PyYAML, JSON checks files don't
+
+A check that exceeds its timeout returns UNKNOWN: self timed out, in thread mode the check thread is abandoned to
+finish in the background as threads can't be killed, stopping at its plugin's own --timeout deadline
+
+Exits with the worst status of all the checks, with the summary as the final line and aggregate stats as perfdata
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+#from __future__ import unicode_literals
+
+import inspect
+import json
+import math
+import multiprocessing
+import os
+import re
+import shlex
+import sys
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, log_option, qquit, json_loads, plural, set_topfile, isDict, isFloat, isList, \
+                             isStr, validate_file, validate_float, validate_int
+from harisekhon import CLI, Result
+from harisekhon.nagiosplugin.nagiosplugin import NagiosPlugin
+from harisekhon.nagiosplugin.check_daemon import load_plugin_class, get_plugin_script
+from harisekhon.nagiosplugin.perfdata import Perfdata
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.2.1'
+
+# least to most severe, the batch exits with the most severe status of its checks
+SEVERITY = ('OK', 'WARNING', 'UNKNOWN', 'CRITICAL')
+
+PERCENTILES = (50, 95, 99)
+
+# check args which change the process global log level, matches bundled short switches such as -vvv
+VERBOSE_ARGS_REGEX = re.compile(r'^(?:-[vD]|--verbose\b|--debug\b)')
+
+
+class BatchRunner(CLI):
+
+    def __init__(self):
+        # Python 2.x
+        super(BatchRunner, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        self.file = None
+        self.workers = None
+        self.processes = False
+        self.default_check_timeout = None
+        self.json = False
+        # each check is given its own timeout instead
+        self.timeout_default = None
+
+    def add_options(self):
+        self.add_opt('-f', '--file', help='YAML or JSON file of checks to run')
+        self.add_opt('-w', '--workers', default=10, help='Number of checks to run concurrently (default: 10)')
+        self.add_opt('-T', '--check-timeout', default=10,
+                     help="Timeout in secs for each check unless set in the check's definition, 0 for no timeout " +
+                     "(default: 10)")
+        self.add_opt('--processes', action='store_true', help='Run each check in a forked process instead of a thread')
+        self.add_opt('-j', '--json', action='store_true', help='Output the check results and summary as JSON')
+
+    def process_options(self):
+        self.no_args()
+        self.file = self.get_opt('file')
+        validate_file(self.file, 'checks')
+        self.workers = self.get_opt('workers')
+        validate_int(self.workers, 'workers', 1, 1000)
+        self.workers = int(self.workers)
+        self.default_check_timeout = self.get_opt('check_timeout')
+        validate_float(self.default_check_timeout, 'check timeout', 0, self.timeout_max)
+        self.default_check_timeout = float(self.default_check_timeout)
+        self.processes = self.get_opt('processes')
+        log_option('processes', self.processes)
+        self.json = self.get_opt('json')
+
+    def run(self):
+        try:
+            checks = load_checks(self.file)
+        except ValueError as _:
+            self.usage(_)
+        start_time = time.time()
+        results = run_checks(checks, workers=self.workers, processes=self.processes, timeout=self.default_check_timeout)
+        stats = batch_stats(results, time.time() - start_time)
+        if self.json:
+            print(json.dumps({'results': [OrderedDict([('name', name),
+                                                       ('status', result.status),
+                                                       ('exit_code', result.exit_code),
+                                                       ('msg', result.msg),
+                                                       ('perfdata', result.perfdata),
+                                                       ('run_time', result.run_time)])
+                                          for (name, result) in results],
+                              'stats': stats}, indent=4))
+        else:
+            for (name, result) in results:
+                print('{0}: {1}'.format(name, result.output))
+        status = worst_status([result.status for (_, result) in results])
+        qquit(status, batch_summary(stats))
+
+
+# returns a list of check dicts with the plugin classes loaded, raises ValueError for invalid check definitions
+def load_checks(path):
+    with open(path) as filehandle:
+        content = filehandle.read()
+    if path.endswith('.json'):
+        data = json_loads(content)
+    else:
+        try:
+            import yaml
+        except ImportError:
+            raise ValueError("PyYAML is required for YAML checks file '{0}', or use a .json checks file".format(path))
+        try:
+            data = yaml.safe_load(content)
+        except yaml.YAMLError as _:
+            raise ValueError("invalid YAML in checks file '{0}': {1}".format(path, _))
+    if isDict(data):
+        data = data.get('checks')
+    if not isList(data) or not data:
+        raise ValueError("no checks found in '{0}', expected a list of checks or a dict with a 'checks' list"
+                         .format(path))
+    basedir = os.path.dirname(os.path.abspath(path))
+    plugin_classes = {}
+    checks = []
+    for (index, check) in enumerate(data, 1):
+        if not isDict(check) or not isStr(check.get('plugin')):
+            raise ValueError("check {0} in '{1}' is not a dict with a 'plugin' key".format(index, path))
+        args = check.get('args')
+        if args is None:
+            args = []
+        elif isStr(args):
+            args = shlex.split(args)
+        if not isList(args) or [_ for _ in args if isDict(_) or isList(_)]:
+            raise ValueError("check {0} in '{1}' args must be a string or list of strings".format(index, path))
+        timeout = check.get('timeout')
+        if timeout is not None and not isFloat(timeout):
+            raise ValueError("check {0} in '{1}' timeout must be a number of secs".format(index, path))
+        spec = check['plugin']
+        if spec not in plugin_classes:
+            (plugin_path, _, class_name) = spec.partition(':')
+            plugin_classes[spec] = load_plugin_class(os.path.join(basedir, plugin_path), class_name)
+        checks.append({'name': str(check.get('name') or os.path.basename(spec.partition(':')[0])),
+                       'plugin': plugin_classes[spec],
+                       'args': [str(_) for _ in args],
+                       'timeout': timeout})
+    return checks
+
+
+# runs each check dict's plugin class with its args concurrently, returning a list of (name, Result) in check order
+#
+# timeout is the default in secs for checks without their own, None or 0 for no timeout
+def run_checks(checks, workers=10, processes=False, timeout=None):
+    for check in checks:
+        if not inspect.isclass(check.get('plugin')) or not issubclass(check['plugin'], NagiosPlugin):
+            raise ValueError('check {0} plugin is not a NagiosPlugin class'.format(check.get('name')))
+    if not checks:
+        return []
+
+    def supervise(check):
+        check_timeout = check.get('timeout')
+        if check_timeout is None:
+            check_timeout = timeout
+        check_timeout = float(check_timeout) if check_timeout else None
+        name = check.get('name') or check['plugin'].__name__
+        args = check.get('args') or []
+        run_check = run_check_thread
+        if processes:
+            run_check = run_check_process
+        elif is_verbose(args):
+            log.info("running check '%s' in a process as its verbose switches would change the log level of all " +
+                     "the checks running in threads", name)
+            run_check = run_check_process
+        start_time = time.time()
+        result = run_check(check['plugin'], args, check_timeout)
+        if result is None:
+            log.debug("check '%s' timed out after %s secs", name, check_timeout)
+            result = Result('UNKNOWN', 'self timed out after {0:g} second{1}'.format(check_timeout,
+                                                                                      plural(check_timeout)),
+                            start_time=start_time, run_time=time.time() - start_time)
+        return (name, result)
+
+    # plugins redirect stderr to stdout and set the log level in __init__() and main()
+    saved_stdout = sys.stdout
+    saved_stderr = sys.stderr
+    saved_log_level = log.level
+    pool = ThreadPool(min(int(workers), len(checks)))
+    try:
+        return pool.map(supervise, checks)
+    finally:
+        pool.close()
+        pool.join()
+        sys.stdout = saved_stdout
+        sys.stderr = saved_stderr
+        log.setLevel(saved_log_level)
+
+
+def is_verbose(args):
+    return bool([_ for _ in args if VERBOSE_ARGS_REGEX.match(_)])
+
+
+# runs in the check's own thread or process
+def execute_check(plugin_class, args):
+    start_time = time.time()
+    set_topfile(get_plugin_script(plugin_class))
+    try:
+        return plugin_class().execute(args)
+    except Exception as _:  # pylint: disable=broad-except
+        # exceptions outside of NagiosPlugin.main()'s handling eg. in the plugin's __init__()
+        return Result('UNKNOWN', 'batch runner plugin exception: {0}: {1}'.format(type(_).__name__, _),
+                      start_time=start_time, run_time=time.time() - start_time)
+    finally:
+        set_topfile(None)
+
+
+# returns the Result or None if the check timed out
+def run_check_thread(plugin_class, args, timeout):
+    results = []
+    thread = threading.Thread(target=lambda: results.append(execute_check(plugin_class, args)))
+    # don't block the program exiting on an abandoned timed out check
+    thread.daemon = True
+    thread.start()
+    thread.join(timeout)
+    if results:
+        return results[0]
+    return None
+
+
+# returns the Result or None if the check timed out, in which case its process is killed
+def run_check_process(plugin_class, args, timeout):
+    # forked so the plugin class doesn't need to be picklable, only the Result
+    context = multiprocessing.get_context('fork') if hasattr(multiprocessing, 'get_context') else multiprocessing
+    (reader, writer) = context.Pipe(duplex=False)
+
+    def child():
+        reader.close()
+        writer.send(execute_check(plugin_class, args))
+        writer.close()
+
+    start_time = time.time()
+    process = context.Process(target=child)
+    process.daemon = True
+    process.start()
+    writer.close()
+    try:
+        if not reader.poll(timeout):
+            return None
+        return reader.recv()
+    except EOFError:
+        process.join()
+        return Result('UNKNOWN', 'batch runner check process exited with code {0} without a result'
+                      .format(process.exitcode), start_time=start_time, run_time=time.time() - start_time)
+    finally:
+        if process.is_alive():
+            process.terminate()
+        process.join()
+        reader.close()
+
+
+def worst_status(statuses):
+    worst = 'OK'
+    for status in statuses:
+        if status not in SEVERITY:
+            status = 'UNKNOWN'
+        if SEVERITY.index(status) > SEVERITY.index(worst):
+            worst = status
+    return worst
+
+
+# nearest rank percentile of a sorted list
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    return sorted_values[max(0, int(math.ceil(pct / 100.0 * len(sorted_values))) - 1)]
+
+
+def batch_stats(results, elapsed):
+    latencies = sorted([result.run_time for (_, result) in results if result.run_time is not None])
+    stats = OrderedDict()
+    stats['checks'] = len(results)
+    stats['elapsed_secs'] = elapsed
+    stats['checks_per_sec'] = len(results) / elapsed if elapsed > 0 else None
+    for status in SEVERITY:
+        stats[status.lower()] = len([_ for (_, result) in results if result.status == status])
+    stats['latency_min_secs'] = latencies[0] if latencies else None
+    stats['latency_avg_secs'] = sum(latencies) / len(latencies) if latencies else None
+    for pct in PERCENTILES:
+        stats['latency_p{0}_secs'.format(pct)] = percentile(latencies, pct)
+    stats['latency_max_secs'] = latencies[-1] if latencies else None
+    return stats
+
+
+def batch_summary(stats):
+    msg = '{checks} check{plural} in {elapsed_secs:.3f} secs'.format(plural=plural(stats['checks']), **stats)
+    if stats['checks_per_sec'] is not None:
+        msg += ' ({checks_per_sec:.1f} checks/sec)'.format(**stats)
+    msg += ', ' + ', '.join(['{0} {1}'.format(stats[status.lower()], status) for status in SEVERITY])
+    if stats['latency_avg_secs'] is not None:
+        msg += ', latency min/avg/p95/max = {latency_min_secs:.3f}/{latency_avg_secs:.3f}/' \
+               '{latency_p95_secs:.3f}/{latency_max_secs:.3f} secs'.format(**stats)
+    perfdata = Perfdata()
+    for (key, value) in stats.items():
+        if value is None:
+            continue
+        if key.endswith('_secs'):
+            perfdata.add(key[:-5], value, 's', precision=6)
+        elif isinstance(value, float):
+            perfdata.add(key, value, precision=2)
+        else:
+            perfdata.add(key, value)
+    return '{0} | {1}'.format(msg, perfdata)
+
+
+if __name__ == '__main__':
+    BatchRunner().main()
@@ -0,0 +1,429 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 21:05:43 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn
+#  and optionally send me feedback to help steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Persistent Check Daemon - runs NagiosPlugin checks in-process without paying for Python start up and library imports
+                          on every check, similar to Nagios embedded Perl
+
+Loads the given plugin scripts once and then serves check requests on a local Unix socket, running the plugin's
+execute() with the requested argv and returning its output and exit code instead of exiting
+
+Protocol is one JSON object per line in each direction, multiple requests per connection are allowed:
+
+    request:   {"argv": ["check_foo.py", "--host", "myhost"]}
+    response:  {"exit_code": 0, "status": "OK", "output": "OK: foo is fine | ..."}
+
+argv[0] selects the plugin by script basename with or without the .py extension. Use request_check() as the client
+
+Checks are run one at a time per worker, use --workers to pre-fork more worker processes sharing the socket
+
+Each check runs in a thread of its worker, which returns UNKNOWN if the check is still running a grace period after
+its own --timeout deadline, or after --max-check-secs if it has no timeout, eg. when blocked in socket I/O that never
+reaches check_timeout(). The worker then exits and is replaced so the abandoned check can't hold it
+
+The default socket is in a per user directory created with mode 0700, under $XDG_RUNTIME_DIR if set, otherwise under
+the system temp dir
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+#from __future__ import unicode_literals
+
+import inspect
+import json
+import logging
+import os
+import re
+import signal
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+import traceback
+try:
+    # Python 2
+    from StringIO import StringIO
+except ImportError:
+    # Python 3
+    from io import StringIO
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, log_option, ERRORS, CodingError, isList, isStr, plural, set_topfile, \
+                             validate_float, validate_int
+from harisekhon import CLI, Result
+from harisekhon.nagiosplugin.nagiosplugin import NagiosPlugin
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.3.1'
+
+DEFAULT_SOCKET_DIR = os.path.join(os.getenv('XDG_RUNTIME_DIR') or tempfile.gettempdir(),
+                                  'harisekhon-check-daemon-{uid}'.format(uid=os.getuid()))
+
+DEFAULT_SOCKET = os.getenv('CHECK_DAEMON_SOCKET', os.path.join(DEFAULT_SOCKET_DIR, 'check_daemon.sock'))
+
+# secs past a check's deadline before its worker abandons it
+CHECK_TIMEOUT_GRACE_SECS = 5
+
+STATUSES = dict([(code, status) for (status, code) in ERRORS.items() if status != 'DEPENDENT'])
+
+
+class CheckDaemon(CLI):
+
+    def __init__(self, plugins=None):
+        # Python 2.x
+        super(CheckDaemon, self).__init__()
+        # Python 3.x
+        # super().__init__()
+        # name => NagiosPlugin subclass, loaded from the plugin script args in addition to any passed in here
+        self.plugins = {}
+        if plugins:
+            for (name, plugin_class) in plugins.items():
+                self.add_plugin(name, plugin_class)
+        self.socket_path = None
+        self.workers = None
+        # limit for checks without a timeout of their own
+        self.max_check_secs = 300
+        # set when a check is abandoned so the worker exits to be replaced
+        self.abandoned = False
+        # runs until killed, each check applies its own timeout
+        self.timeout_default = None
+
+    def add_options(self):
+        self.add_opt('-s', '--socket', default=DEFAULT_SOCKET,
+                     help='Unix socket path to listen on ($CHECK_DAEMON_SOCKET, default: {0})'.format(DEFAULT_SOCKET))
+        self.add_opt('-w', '--workers', default=1, help='Number of worker processes (default: 1)')
+        self.add_opt('-m', '--max-check-secs', default=self.max_check_secs,
+                     help='Secs to allow checks without a timeout of their own before returning UNKNOWN and ' +
+                     'replacing the worker (default: {0})'.format(self.max_check_secs))
+
+    def process_options(self):
+        self.socket_path = self.get_opt('socket')
+        if not self.socket_path:
+            self.usage('--socket not defined')
+        log_option('socket', self.socket_path)
+        self.workers = self.get_opt('workers')
+        validate_int(self.workers, 'workers', 1, 1000)
+        self.workers = int(self.workers)
+        self.max_check_secs = self.get_opt('max_check_secs')
+        validate_float(self.max_check_secs, 'max check secs', 1, 86400)
+        self.max_check_secs = float(self.max_check_secs)
+
+    def process_args(self):
+        for arg in self.args:
+            self.load_plugin(arg)
+        if not self.plugins:
+            self.usage('no plugin scripts given as arguments')
+
+    def add_plugin(self, name, plugin_class):
+        if not inspect.isclass(plugin_class) or not issubclass(plugin_class, NagiosPlugin):
+            raise CodingError('non-NagiosPlugin class passed to CheckDaemon.add_plugin()')
+        name = os.path.basename(name)
+        self.plugins[name] = plugin_class
+        self.plugins[re.sub(r'\.py$', '', name)] = plugin_class
+
+    # loads a plugin script, optionally suffixed with :ClassName if it defines more than one NagiosPlugin subclass
+    def load_plugin(self, arg):
+        (path, _, class_name) = arg.partition(':')
+        try:
+            plugin_class = load_plugin_class(path, class_name)
+        except ValueError as _:
+            self.usage(_)
+        self.add_plugin(path, plugin_class)
+
+    def run(self):
+        listener = self.listen()
+        try:
+            # always in worker processes so that a worker which abandons a stuck check can be replaced
+            self.prefork(listener)
+        finally:
+            listener.close()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+
+    def listen(self):
+        socket_dir = os.path.dirname(os.path.abspath(self.socket_path))
+        if socket_dir == DEFAULT_SOCKET_DIR:
+            try:
+                make_private_dir(socket_dir)
+            except (OSError, ValueError) as _:
+                self.usage(_)
+        if os.path.exists(self.socket_path):
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.socket_path)
+                self.usage("check daemon already listening on socket '{0}'".format(self.socket_path))
+            except socket.error:
+                log.info("removing stale socket '%s'", self.socket_path)
+                os.unlink(self.socket_path)
+            finally:
+                probe.close()
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        # only the daemon's user may submit checks
+        umask = os.umask(0o177)
+        try:
+            listener.bind(self.socket_path)
+        finally:
+            os.umask(umask)
+        listener.listen(128)
+        log.info("listening on socket '%s' for plugins: %s", self.socket_path, ', '.join(sorted(self.plugins)))
+        return listener
+
+    def prefork(self, listener):
+        children = set()
+
+        def spawn():
+            pid = os.fork()
+            if pid == 0:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                try:
+                    self.serve(listener)
+                finally:
+                    os._exit(0)  # pylint: disable=protected-access
+            children.add(pid)
+
+        # exit via SystemExit so the finally below stops the workers and run() removes the socket
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        try:
+            for _ in range(self.workers):
+                spawn()
+            while True:
+                (pid, status) = os.wait()
+                if pid in children:
+                    children.remove(pid)
+                    log.warning('worker %s exited with status %s, respawning', pid, status)
+                    spawn()
+        finally:
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except OSError:
+                    pass
+
+    # serves checks until one is abandoned, returning for the worker to exit and be replaced
+    def serve(self, listener):
+        while not self.abandoned:
+            (conn, _) = listener.accept()
+            try:
+                self.handle(conn)
+            except socket.error as _:
+                log.warning('client connection error: %s', _)
+            finally:
+                conn.close()
+        log.warning('exiting worker %s to replace it after abandoning a timed out check', os.getpid())
+
+    def handle(self, conn):
+        filehandle = conn.makefile('rwb')
+        try:
+            for line in filehandle:
+                if not line.strip():
+                    continue
+                try:
+                    argv = json.loads(line.decode('utf-8'))['argv']
+                except (KeyError, TypeError, ValueError):
+                    (exit_code, output) = (ERRORS['UNKNOWN'], "UNKNOWN: invalid check daemon request, expected " +
+                                           "JSON object with 'argv' list\n")
+                else:
+                    (exit_code, output) = self.run_check(argv)
+                response = {'exit_code': exit_code, 'status': STATUSES.get(exit_code, 'UNKNOWN'), 'output': output}
+                filehandle.write(json.dumps(response).encode('utf-8') + b'\n')
+                filehandle.flush()
+                if self.abandoned:
+                    break
+        finally:
+            filehandle.close()
+
+    # runs a check in this process and returns (exit_code, output), restoring the global state plugins change
+    #
+    # runs in result mode so that a timed out check doesn't exit the daemon
+    def run_check(self, argv):
+        if not isList(argv) or not argv or [_ for _ in argv if not isStr(_)]:
+            return (ERRORS['UNKNOWN'], 'UNKNOWN: invalid check argv, must be a non-empty list of strings\n')
+        name = os.path.basename(argv[0])
+        plugin_class = self.plugins.get(name)
+        if plugin_class is None:
+            return (ERRORS['UNKNOWN'], "UNKNOWN: plugin '{0}' not loaded in check daemon\n".format(name))
+        saved_argv = sys.argv
+        saved_stdout = sys.stdout
+        saved_stderr = sys.stderr
+        saved_log_level = log.level
+        saved_environ = dict(os.environ)
+        output = StringIO()
+        exit_code = ERRORS['UNKNOWN']
+        sys.argv = list(argv)
+        sys.stdout = output
+        sys.stderr = output
+        try:
+            result = self.execute_check(plugin_class, argv[1:])
+            if result.output:
+                print(result.output)
+            exit_code = result.exit_code
+        except SystemExit as _:
+            # sys.exit() outside of the plugin's main()
+            exit_code = _.code
+            if exit_code is None:
+                exit_code = 0
+            elif not isinstance(exit_code, int):
+                print(exit_code)
+                exit_code = 1
+        except Exception as _:  # pylint: disable=broad-except
+            # exceptions outside of NagiosPlugin.main()'s handling eg. in the plugin's __init__()
+            print('UNKNOWN: check daemon plugin exception: {0}: {1}'.format(type(_).__name__, _))
+            if log.isEnabledFor(logging.DEBUG):
+                print(traceback.format_exc())
+        finally:
+            sys.argv = saved_argv
+            sys.stdout = saved_stdout
+            sys.stderr = saved_stderr
+            log.setLevel(saved_log_level)
+            if os.environ != saved_environ:
+                os.environ.clear()
+                os.environ.update(saved_environ)
+        return (exit_code, output.getvalue())
+
+    # returns the plugin's Result, or an UNKNOWN Result if the check is still running CHECK_TIMEOUT_GRACE_SECS after
+    # its deadline, or after max_check_secs if it doesn't have one, in which case the check thread is abandoned and
+    # self.abandoned set for the worker to be replaced. Exceptions in the check are re-raised
+    def execute_check(self, plugin_class, args):
+        plugins = []
+        outcome = []
+
+        def target():
+            set_topfile(get_plugin_script(plugin_class))
+            try:
+                plugins.append(plugin_class())
+                outcome.append(plugins[0].execute(args))
+            except BaseException as _:  # pylint: disable=broad-except
+                outcome.append(_)
+
+        start = time.time()
+        thread = threading.Thread(target=target, name='check')
+        # don't block the worker exiting on an abandoned check
+        thread.daemon = True
+        thread.start()
+        expired_at = None
+        while True:
+            thread.join(0.1)
+            if not thread.is_alive():
+                break
+            deadline = plugins[0].deadline if plugins else None
+            if deadline is not None and deadline.secs:
+                if expired_at is None and deadline.expired():
+                    expired_at = time.time()
+                if expired_at is not None and time.time() - expired_at >= CHECK_TIMEOUT_GRACE_SECS:
+                    return self.abandon(deadline.secs)
+            elif time.time() - start >= self.max_check_secs:
+                return self.abandon(self.max_check_secs)
+        if isinstance(outcome[0], BaseException):
+            raise outcome[0]
+        return outcome[0]
+
+    def abandon(self, secs):
+        log.warning('abandoning check still running after its %s sec timeout', secs)
+        self.abandoned = True
+        return Result('UNKNOWN', 'self timed out after {0:g} second{1}'.format(secs, plural(secs)))
+
+
+# creates a directory only accessible to this user if it doesn't exist, raises ValueError if it's not private
+def make_private_dir(path):
+    if not os.path.isdir(path):
+        try:
+            os.makedirs(path, 0o700)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+    dir_stat = os.lstat(path)
+    if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid != os.getuid() or dir_stat.st_mode & 0o077:
+        raise ValueError("directory '{0}' is not a directory private to this user (mode 0700)".format(path))
+
+
+# returns the NagiosPlugin subclass defined in the given plugin script, raises ValueError if it can't be loaded
+def load_plugin_class(path, class_name=''):
+    if not os.path.isfile(path):
+        raise ValueError("plugin script '{0}' not found".format(path))
+    module_name = 'check_daemon_plugin_' + re.sub(r'\W', '_', os.path.basename(path))
+    log.info("loading plugin script '%s'", path)
+    try:
+        module = load_source(module_name, path)
+    except SystemExit:
+        raise ValueError("plugin script '{0}' exited on import, check its dependencies are installed".format(path))
+    classes = [_ for _ in vars(module).values()
+               if inspect.isclass(_) and issubclass(_, NagiosPlugin) and _.__module__ == module.__name__]
+    if class_name:
+        classes = [_ for _ in classes if _.__name__ == class_name]
+    else:
+        # only the leaf classes in case the script subclasses its own plugin
+        classes = [_ for _ in classes if not [sub for sub in classes if sub is not _ and issubclass(sub, _)]]
+    if len(classes) != 1:
+        raise ValueError("expected 1 NagiosPlugin subclass in plugin script '{0}', found {1}{2}"\
+                         .format(path, len(classes), ', specify path:ClassName' if not class_name else ''))
+    log.info("loaded plugin class '%s' from '%s'", classes[0].__name__, path)
+    _plugin_scripts[classes[0]] = os.path.abspath(path)
+    return classes[0]
+
+
+# plugin class => path of the script it was loaded from by load_plugin_class()
+_plugin_scripts = {}
+
+
+# returns the script the plugin class was loaded from, for use as its topfile via set_topfile() so that it describes
+# itself rather than the program running it, or None if it wasn't loaded from a script
+def get_plugin_script(plugin_class):
+    return _plugin_scripts.get(plugin_class)
+
+
+def load_source(module_name, path):
+    try:
+        # Python 3.5+
+        import importlib.util
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except ImportError:
+        # Python 2
+        import imp
+        module = imp.load_source(module_name, path)
+    return module
+
+
+# client for the check daemon - returns (exit_code, output) for the given check argv
+def request_check(argv, socket_path=DEFAULT_SOCKET, timeout=None):
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+        filehandle = sock.makefile('rwb')
+        try:
+            filehandle.write(json.dumps({'argv': list(argv)}).encode('utf-8') + b'\n')
+            filehandle.flush()
+            line = filehandle.readline()
+        finally:
+            filehandle.close()
+    finally:
+        sock.close()
+    if not line:
+        raise socket.error('check daemon closed connection without a response')
+    response = json.loads(line.decode('utf-8'))
+    return (response['exit_code'], response['output'])
+
+
+if __name__ == '__main__':
+    CheckDaemon().main()
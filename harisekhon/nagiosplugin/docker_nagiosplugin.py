@@ -27,7 +27,6 @@ from __future__ import print_function
 
 import os
 import sys
-import time
 import traceback
 # Python 2.6+ only
 from abc import ABCMeta, abstractmethod
@@ -44,14 +43,16 @@ sys.path.append(libdir)
 try:
     # pylint: disable=wrong-import-position
     from harisekhon.utils import log, log_option, CriticalError, UnknownError
-    from harisekhon.utils import validate_chars, validate_file, prog
+    from harisekhon.utils import validate_chars, validate_file, get_topfile
     from harisekhon.nagiosplugin import NagiosPlugin
+    from harisekhon.nagiosplugin.perfdata import Perfdata
+    from harisekhon.nagiosplugin.latency import timer
 except ImportError as _:
     print(traceback.format_exc(), end='')
     sys.exit(4)
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.4.1'
+__version__ = '0.7.1'
 
 
 class DockerNagiosPlugin(NagiosPlugin):
@@ -126,32 +127,46 @@ class DockerNagiosPlugin(NagiosPlugin):
                                                    client_cert=(cert_file, key_file))
 
     def run(self):
-        start_time = time.time()
+        start_time = timer()
+        # docker-py only takes a per request timeout so also close the client at the deadline to abort in-flight calls
+        timeout = 60
+        if self.deadline is not None and self.deadline.secs:
+            timeout = max(int(self.deadline.timeout()) - 1, 1)
+        close_client = None
         try:
             if self.base_url:
                 log.info('connecting to Docker via base url: %s', self.base_url)
                 client = docker.DockerClient(base_url=self.base_url,
-                                             timeout=max(self.timeout - 1, 1),
+                                             timeout=timeout,
                                              tls=self.tls_config,
-                                             user_agent='Hari Sekhon {}'.format(prog)
+                                             user_agent='Hari Sekhon {}'.format(os.path.basename(get_topfile()))
                                             )
             else:
                 log.info('connecting to Docker via environment')
-                client = docker.from_env()
+                client = docker.from_env(timeout=timeout)
+            if self.deadline is not None:
+                close_client = self.deadline.add_callback(lambda deadline: client.close())
             # exception happens here
             self.check(client)
+        # errors from closing the client at the deadline are reported as 'self timed out' by check_timeout()
         except docker.errors.APIError as _:
+            self.check_timeout()
             raise CriticalError('Docker API call FAILED: {}'.format(_))
         except requests.ConnectionError as _:
+            self.check_timeout()
             raise CriticalError('Docker connection failed: {}'.format(_))
         except docker.errors.DockerException as _:
+            self.check_timeout()
             raise UnknownError(_)
-        query_time = time.time() - start_time
+        finally:
+            if close_client is not None:
+                self.deadline.remove_callback(close_client)
+        query_time = timer() - start_time
 
         if '|' not in self.msg:
             self.msg += ' |'
         if ' query_time=' not in self.msg:
-            self.msg += ' query_time={0:.4f}s'.format(query_time)
+            self.msg += ' {0}'.format(Perfdata().add('query_time', query_time, 's', precision=4))
 
     @abstractmethod
     def check(self, client):
@@ -18,6 +18,13 @@
 
 NoSQL Key Checker Specialization of NagiosPlugin
 
+--key takes a comma separated list of keys, or --key-prefix all keys under a prefix if the subclass implements
+list_keys(prefix), to check them all in one result with a line per key in the long output
+
+Keys are read via read_many(keys), which defaults to read_key(key) for each key from a pool of --concurrency workers.
+Override read_many() to fetch all the keys in one round trip, or read_key() with a thread safe read to read them
+concurrently
+
 """
 
 from __future__ import absolute_import
@@ -28,18 +35,26 @@ from __future__ import print_function
 import os
 import re
 import sys
-import time
+import threading
 # Python 2.6+ only
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
 from harisekhon.nagiosplugin.nagiosplugin import NagiosPlugin
-from harisekhon.utils import qquit, log, CodingError, UnknownError
-from harisekhon.utils import validate_host, validate_port, validate_regex, validate_chars, isFloat
+from harisekhon.nagiosplugin.perfdata import Perfdata
+from harisekhon.nagiosplugin.latency import timer
+from harisekhon.deadline import DeadlineExceeded
+from harisekhon.utils import qquit, log, plural, CodingError, UnknownError, NagiosException
+from harisekhon.utils import validate_host, validate_port, validate_regex, validate_chars, validate_int, isFloat
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.2'
+__version__ = '0.7.2'
+
+# least to most severe for the multi-key summary
+SEVERITY = ('OK', 'WARNING', 'UNKNOWN', 'CRITICAL')
 
 
 class KeyCheckNagiosPlugin(NagiosPlugin):
@@ -62,17 +77,28 @@ class KeyCheckNagiosPlugin(NagiosPlugin):
         self.host = None
         self.port = None
         self.key = None
+        self.keys = []
+        self.key_prefix = None
+        self.concurrency = 1
         self.regex = None
+        self._regex = None
         self._read_value = None
         self._read_timing = None
+        # OrderedDict of key => value or NagiosException when checking many keys
+        self._read_values = None
+        # serializes the default read_key() etc. which go through the single self.key
+        self._key_lock = threading.RLock()
         self.status = 'OK'
 
     def add_options(self):
         if not self.name:
             raise CodingError("didn't name check, please set self.name in __init__()")
         self.add_hostoption(self.name, default_host=self.default_host, default_port=self.default_port)
-        self.add_opt('-k', '--key', help='Key to query from %s' % self.name)
+        self.add_opt('-k', '--key', help='Key to query from %s, or a comma separated list of keys' % self.name)
+        self.add_opt('--key-prefix', help='Check all keys starting with this prefix instead of --key')
         self.add_opt('-r', '--regex', help="Regex to compare the key's value against (optional)")
+        self.add_opt('--concurrency', metavar='N', default=1,
+                     help='Number of keys to read concurrently when checking many keys (default: 1)')
         self.add_thresholds()
 
     def process_args(self):
@@ -84,19 +110,48 @@ class KeyCheckNagiosPlugin(NagiosPlugin):
         validate_host(self.host)
         validate_port(self.port)
         self.key = self.get_opt('key')
+        self.key_prefix = self.get_opt('key_prefix')
         self.regex = self.get_opt('regex')
-        if not self.key:
+        if self.key and self.key_prefix:
+            self.usage('--key and --key-prefix are mutually exclusive')
+        if self.key_prefix:
+            self.key_prefix = self.key_prefix.lstrip('/')
+            validate_chars(self.key_prefix, 'key prefix', r'\w\/-')
+        elif not self.key:
             self.usage('--key not defined')
-        self.key = self.key.lstrip('/')
-        validate_chars(self.key, 'key', r'\w\/-')
+        else:
+            # de-duplicated in order
+            self.keys = list(OrderedDict.fromkeys([_.strip().lstrip('/') for _ in self.key.split(',')
+                                                   if _.strip()]))
+            if not self.keys:
+                self.usage('--key not defined')
+            for key in self.keys:
+                validate_chars(key, 'key', r'\w\/-')
+            self.key = self.keys[0]
         if self.regex:
             validate_regex(self.regex, 'key')
+        self.concurrency = self.get_opt('concurrency')
+        validate_int(self.concurrency, 'concurrency', 1, 1000)
+        self.concurrency = int(self.concurrency)
         self.validate_thresholds(optional=True)
 
+    def is_multi_key(self):
+        return bool(self.key_prefix) or len(self.keys) > 1
+
+    # compiled once for all of the keys, recompiled if self.regex is changed
+    def get_regex(self):
+        if self._regex is None or self._regex.pattern != self.regex:
+            self._regex = re.compile(self.regex)
+        return self._regex
+
     def run(self):
-        start = time.time()
+        if self.is_multi_key():
+            self.run_many()
+            return
+        start = timer()
         self._read_value = self.read()
-        stop = time.time()
+        self.check_timeout()
+        stop = timer()
         self._read_timing = stop - start
         log.info('read in %s secs', self._read_timing)
         log.info("value = '%s'", self._read_value)
@@ -107,10 +162,120 @@ class KeyCheckNagiosPlugin(NagiosPlugin):
     def read(self):
         pass
 
+    # returns the value of the given key via read(), override with a thread safe read of the key to read concurrently
+    def read_key(self, key):
+        with self._key_lock:
+            original_key = self.key
+            self.key = key
+            try:
+                return self.read()
+            finally:
+                self.key = original_key
+
+    # returns a list of the keys starting with prefix for --key-prefix, override to support it
+    def list_keys(self, prefix):
+        raise UnknownError('--key-prefix is not supported by the {0} check'.format(self.name))
+
+    # returns a dict of key => value, override to fetch all the keys in one round trip
+    #
+    # values may be None for keys not found or a CriticalError / WarningError / UnknownError for that key, so that one
+    # key failing doesn't fail the check of the others
+    def read_many(self, keys):
+        def read(key):
+            # outside of the try so that running out of time stops the check instead of failing each remaining key
+            self.check_timeout()
+            try:
+                return self.read_key(key)
+            except DeadlineExceeded:
+                raise
+            except NagiosException as _:
+                return _
+        pool = ThreadPool(min(self.concurrency, len(keys)))
+        try:
+            return dict(zip(keys, pool.map(read, keys)))
+        finally:
+            pool.close()
+            pool.join()
+
+    def run_many(self):
+        if self.key_prefix:
+            self.keys = sorted(self.list_keys(self.key_prefix))
+            log.info("found %s key%s with prefix '%s'", len(self.keys), plural(self.keys), self.key_prefix)
+            if not self.keys:
+                raise UnknownError("no keys found with prefix '{0}'".format(self.key_prefix))
+            self.key = self.keys[0]
+        start = timer()
+        values = self.read_many(self.keys)
+        self.check_timeout()
+        self._read_timing = timer() - start
+        log.info('read %s keys in %s secs', len(self.keys), self._read_timing)
+        self._read_values = OrderedDict([(key, values.get(key)) for key in self.keys])
+
+    # returns a list of (status, msg) per key in key order
+    def check_keys(self):
+        regex = self.get_regex() if self.regex else None
+        results = []
+        numbers = []
+        for (key, value) in self._read_values.items():
+            status = 'OK'
+            msg = "key '{0}' value = '{1}'".format(key, value)
+            if isinstance(value, NagiosException):
+                status = type(value).__name__.replace('Error', '').upper()
+                if status not in SEVERITY:
+                    status = 'UNKNOWN'
+                msg = "key '{0}' {1}".format(key, value)
+            elif value is None:
+                status = 'CRITICAL'
+                msg = "key '{0}' not found".format(key)
+            elif regex is not None and not regex.search(str(value)):
+                status = 'CRITICAL'
+                msg += " (did not match expected regex '{0}')".format(self.regex)
+            elif isFloat(value):
+                numbers.append((len(results), float(value)))
+            results.append([status, msg])
+        # all numeric values against the thresholds in one pass
+        breaches = self.check_thresholds_many([value for (_, value) in numbers])
+        for (index, status) in breaches:
+            (result_index, value) = numbers[index]
+            results[result_index][0] = status
+            results[result_index][1] += ' ' + self.get_threshold(status.lower(), optional=True).check(value)
+        return [tuple(_) for _ in results]
+
+    def create_output_many(self):
+        results = self.check_keys()
+        counts = OrderedDict([(status, 0) for status in SEVERITY])
+        for (status, _) in results:
+            counts[status] += 1
+        worst = [status for status in SEVERITY if counts[status]][-1]
+        if worst == 'CRITICAL':
+            self.critical()
+        elif worst == 'WARNING':
+            self.warning()
+        elif worst == 'UNKNOWN':
+            self.unknown()
+        self.msg = '{0} {1} key{2} read in {3:.3f} secs'.format(self.name, len(results), plural(results),
+                                                                self._read_timing)
+        self.msg += ', ' + ', '.join(['{0} {1}'.format(count, status) for (status, count) in counts.items()])
+        problems = [msg for (status, msg) in results if status != 'OK']
+        if problems:
+            self.msg += ': ' + ', '.join(problems)
+        perfdata = Perfdata().add('keys', len(results))
+        for (status, count) in counts.items():
+            perfdata.add(status.lower(), count)
+        perfdata.add('query_time', self._read_timing, 's', precision=7)
+        thresholds = self.get_perf_threshold_args()
+        for (key, value) in self._read_values.items():
+            if isFloat(value):
+                perfdata.add(key, value, **thresholds)
+        self.msg += ' | {0}'.format(perfdata)
+        # per key status in the long output
+        self.msg += ''.join(['\n{0}: {1}'.format(status, msg) for (status, msg) in results])
+        return self.msg
+
     def create_msg(self):
         msg = "%s key '%s' value = '%s'" % (self.name, self.key, self._read_value)
         if self.regex:
-            if not re.search(self.regex, self._read_value):
+            if not self.get_regex().search(self._read_value):
                 self.critical()
                 msg += " (did not match expected regex '%(regex)s')" % self.__dict__
             #elif self.verbose:
@@ -120,8 +285,8 @@ class KeyCheckNagiosPlugin(NagiosPlugin):
     def create_perfdata(self):
         perfdata = ''
         if isFloat(self._read_value):
-            perfdata = " | '{0}'={1}{2} query_time={3:.7f}s".format(
-                self.key, self._read_value, self.get_perf_thresholds(), self._read_timing)
+            perfdata = str(Perfdata().add(self.key, self._read_value, **self.get_perf_threshold_args())
+                           .add('query_time', self._read_timing, 's', precision=7))
         return perfdata
 
     # not really referentially transparent yet like I'd like but better than it all being in end()
@@ -134,6 +299,9 @@ class KeyCheckNagiosPlugin(NagiosPlugin):
         return self.msg
 
     def end(self):
+        if self.is_multi_key():
+            self.create_output_many()
+            qquit(self.status, self.msg)
         if self._read_value is None:
             raise UnknownError('read value is not set!')
         #self.msg = self.create_output()
@@ -18,6 +18,13 @@
 
 NoSQL Key Write Check Specialization of NagiosPlugin
 
+--iterations performs many write-read-delete cycles, optionally from a pool of --concurrency workers each using unique
+keys, reporting the throughput and latency percentiles of each operation type and failing on any value mismatch
+
+Subclasses write, read and delete self.key in write(), read() and delete(), so the cycles are serialized through them
+by default - override write_key(key, value), read_key(key) and delete_key(key) with thread safe versions taking the key
+to run them concurrently
+
 """
 
 from __future__ import absolute_import
@@ -27,18 +34,22 @@ from __future__ import print_function
 
 import os
 import sys
-import time
 # Python 2.6+ only
 from abc import ABCMeta, abstractmethod
+from multiprocessing.pool import ThreadPool
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
 from harisekhon.utils import CriticalError, UnknownError, CodingError, qquit
-from harisekhon.utils import log, get_topfile, random_alnum, validate_host, validate_port
+from harisekhon.utils import log, get_topfile, random_alnum, validate_host, validate_port, validate_int, plural
 from harisekhon.nagiosplugin import KeyCheckNagiosPlugin
+from harisekhon.nagiosplugin.perfdata import Perfdata
+from harisekhon.nagiosplugin.latency import LatencyRecorder, timer
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.3'
+__version__ = '0.7.1'
+
+OPERATIONS = ('write', 'read', 'delete')
 
 
 class KeyWriteNagiosPlugin(KeyCheckNagiosPlugin):
@@ -59,12 +70,21 @@ class KeyWriteNagiosPlugin(KeyCheckNagiosPlugin):
         self._write_value = random_alnum(20)
         self._write_timing = None
         self._delete_timing = None
+        self.iterations = 1
+        self.concurrency = 1
+        # set by run_cycles()
+        self._cycle_stats = None
 
     def add_options(self):
         if not self.name:
             raise CodingError("didn't name check, please set self.name in __init__()")
         self.add_hostoption(self.name, default_host=self.default_host, default_port=self.default_port)
         self.add_thresholds(default_warning=1, default_critical=2)
+        self.add_opt('--iterations', metavar='N', default=1,
+                     help='Number of write-read-delete cycles, reporting throughput and latency percentiles ' +
+                     'per operation (default: 1)')
+        self.add_opt('--concurrency', metavar='N', default=1,
+                     help='Number of workers running the cycles concurrently, each with unique keys (default: 1)')
 
     def process_args(self):
         if not self.name:
@@ -75,15 +95,28 @@ class KeyWriteNagiosPlugin(KeyCheckNagiosPlugin):
         validate_host(self.host)
         validate_port(self.port)
         self.validate_thresholds()
+        self.iterations = self.get_opt('iterations')
+        validate_int(self.iterations, 'iterations', 1, 100000000)
+        self.iterations = int(self.iterations)
+        self.concurrency = self.get_opt('concurrency')
+        validate_int(self.concurrency, 'concurrency', 1, 1000)
+        self.concurrency = int(self.concurrency)
+
+    def is_multi(self):
+        return self.iterations > 1 or self.concurrency > 1
 
     def run(self):
+        if self.is_multi():
+            self.run_cycles()
+            return
         ###############
         # == Write == #
-        start = time.time()
+        start = timer()
         self.write()
-        end = time.time()
+        self.check_timeout()
+        end = timer()
         self._write_timing = end - start
-        log.info('read in %s secs', self._read_timing)
+        log.info('written in %s secs', self._write_timing)
         ##############
         # == Read == #
         # Python 2.x
@@ -95,11 +128,12 @@ class KeyWriteNagiosPlugin(KeyCheckNagiosPlugin):
                                 % (self._read_value, self._write_value))
         ################
         # == Delete == #
-        start = time.time()
+        start = timer()
         self.delete()
-        end = time.time()
+        self.check_timeout()
+        end = timer()
         self._delete_timing = end - start
-        log.info('read in %s secs', self._read_timing)
+        log.info('deleted in %s secs', self._delete_timing)
 
     @abstractmethod
     def write(self):
@@ -109,7 +143,102 @@ class KeyWriteNagiosPlugin(KeyCheckNagiosPlugin):
     def delete(self):
         pass
 
+    # writes the value to the given key via write(), override with a thread safe version to write concurrently
+    def write_key(self, key, value):
+        with self._key_lock:
+            (original_key, original_value) = (self.key, self._write_value)
+            (self.key, self._write_value) = (key, value)
+            try:
+                self.write()
+            finally:
+                (self.key, self._write_value) = (original_key, original_value)
+
+    # deletes the given key via delete(), override with a thread safe version to delete concurrently
+    def delete_key(self, key):
+        with self._key_lock:
+            original_key = self.key
+            self.key = key
+            try:
+                self.delete()
+            finally:
+                self.key = original_key
+
+    def run_cycles(self):
+        log.info('running %s write-read-delete cycle%s from %s worker%s', self.iterations, plural(self.iterations),
+                 self.concurrency, plural(self.concurrency))
+        # spread the cycles over the workers, the first ones taking the remainder
+        cycles = [self.iterations // self.concurrency + (1 if worker < self.iterations % self.concurrency else 0)
+                  for worker in range(self.concurrency)]
+        start = timer()
+        pool = ThreadPool(self.concurrency)
+        try:
+            results = pool.map(lambda worker: self.run_worker_cycles(worker, cycles[worker]), range(self.concurrency))
+        finally:
+            pool.close()
+            pool.join()
+        elapsed = timer() - start
+        latencies = dict([(operation, LatencyRecorder()) for operation in OPERATIONS])
+        mismatches = []
+        for (worker_latencies, worker_mismatches) in results:
+            for operation in OPERATIONS:
+                latencies[operation].merge(worker_latencies[operation])
+            mismatches += worker_mismatches
+        self._cycle_stats = (elapsed, latencies, mismatches)
+
+    # returns ({operation: LatencyRecorder}, [mismatch messages]) for the worker's cycles, each on a unique key
+    def run_worker_cycles(self, worker, cycles):
+        latencies = dict([(operation, LatencyRecorder()) for operation in OPERATIONS])
+        mismatches = []
+        for cycle in range(cycles):
+            self.check_timeout()
+            key = '{0}-{1}-{2}'.format(self.key, worker, cycle)
+            value = '{0}-{1}-{2}'.format(self._write_value, worker, cycle)
+            with latencies['write'].time():
+                self.write_key(key, value)
+            with latencies['read'].time():
+                read_value = self.read_key(key)
+            if read_value != value:
+                mismatches.append("key '{0}' wrote '{1}' but got back '{2}' instead".format(key, value, read_value))
+            with latencies['delete'].time():
+                self.delete_key(key)
+        return (latencies, mismatches)
+
+    def end_cycles(self):
+        (elapsed, latencies, mismatches) = self._cycle_stats
+        count = latencies['write'].count
+        self.msg = '{0} {1} key write-read-delete cycle{2} from {3} worker{4} in {5:.3f} secs'\
+                   .format(self.name, count, plural(count), self.concurrency, plural(self.concurrency), elapsed)
+        if mismatches:
+            self.critical()
+            self.msg += ', {0} MISMATCH{1}: {2}'.format(len(mismatches), 'ES' if len(mismatches) != 1 else '',
+                                                         mismatches[0])
+        else:
+            self.msg += ', all values read back successfully'
+        metrics = [('ops_per_sec', round(count * len(OPERATIONS) / elapsed, 1) if elapsed > 0 else None),
+                   ('mismatches', len(mismatches))]
+        units = {}
+        warning = self.get_threshold('warning', optional=True)
+        critical = self.get_threshold('critical', optional=True)
+        for operation in OPERATIONS:
+            recorder = latencies[operation]
+            # the rate for each operation type on its own, ie. operations / (time spent in them / concurrency)
+            metrics.append(('{0}_ops_per_sec'.format(operation),
+                            round(recorder.count * self.concurrency / recorder.total, 1) if recorder.total else None))
+            for (stat, value) in recorder.stats().items():
+                if stat == 'count':
+                    continue
+                name = '{0}_{1}'.format(operation, stat)
+                metrics.append((name, value))
+                units[name] = 's'
+            # every operation must be within the -w / -c thresholds, as for the single cycle check
+            self.add_metric_thresholds('{0}_max'.format(operation), warning=warning, critical=critical)
+        self.msg += ', ' + self.check_metrics([(name, value) for (name, value) in metrics if value is not None],
+                                              units=units)
+        qquit(self.status, self.msg)
+
     def end(self):
+        if self.is_multi():
+            self.end_cycles()
         # don't inherit read check's end as we want a different output format
         if self._read_value is None:
             raise UnknownError('read value is not set!')
@@ -123,8 +252,9 @@ class KeyWriteNagiosPlugin(KeyCheckNagiosPlugin):
         self.check_thresholds(self._read_timing)
         self.msg += ', deleted in {0:.7f} secs'.format(self._delete_timing)
         self.check_thresholds(self._delete_timing)
-        self.msg += ' | write_time={0:.7f}s{1} read_time={2:.7f}s{3} delete_time={4:.7f}s{5}'.format(
-            self._write_timing, self.get_perf_thresholds(),
-            self._read_timing, self.get_perf_thresholds(),
-            self._delete_timing, self.get_perf_thresholds())
+        thresholds = self.get_perf_threshold_args()
+        self.msg += ' | {0}'.format(Perfdata()
+                                    .add('write_time', self._write_timing, 's', precision=7, **thresholds)
+                                    .add('read_time', self._read_timing, 's', precision=7, **thresholds)
+                                    .add('delete_time', self._delete_timing, 's', precision=7, **thresholds))
         qquit(self.status, self.msg)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 05:02:47 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+LatencyRecorder - memory bounded latency histogram for timing many operations, giving percentiles, mean and max as
+                  perfdata
+
+HDR histogram style - a fixed array of counts in log linear buckets, exponentially sized ranges each split into
+linear sub-buckets, so that any recorded value from the resolution (default 1 microsecond) up to the highest trackable
+value (default 1 hour) is accurate to the given significant digits (default 2, ie. 1%) in a few thousand counters
+however many samples are recorded. Values above the highest trackable value are counted at it, the true max is kept
+
+Recorders with the same settings merge by adding their counts, so that each worker thread can record to its own
+recorder without locking and then combine them at the end
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+#from __future__ import unicode_literals
+
+import math
+import os
+import sys
+import time
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import CodingError, isFloat, isInt
+from harisekhon.nagiosplugin.perfdata import Perfdata
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+try:
+    # Python 3.3+, higher resolution than time.time() and unaffected by system clock changes, use to time operations
+    timer = time.perf_counter
+except AttributeError:
+    timer = time.time
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyRecorder(object):
+
+    def __init__(self, highest=3600, resolution=0.000001, significant_digits=2):
+        if not isFloat(resolution) or not float(resolution) > 0:
+            raise CodingError('invalid resolution passed to LatencyRecorder(), must be secs > 0')
+        if not isFloat(highest) or not float(highest) > float(resolution):
+            raise CodingError('invalid highest passed to LatencyRecorder(), must be secs > resolution')
+        if not isInt(significant_digits) or not 1 <= int(significant_digits) <= 5:
+            raise CodingError('invalid significant_digits passed to LatencyRecorder(), must be between 1 and 5')
+        self.resolution = float(resolution)
+        self.highest = float(highest)
+        self.significant_digits = int(significant_digits)
+        # sub-buckets per bucket, the smallest power of 2 giving the significant digits over the top half of a bucket
+        sub_bucket_count = 2 ** int(math.ceil(math.log(2 * 10 ** self.significant_digits, 2)))
+        self.__sub_bucket_half_magnitude = int(math.log(sub_bucket_count, 2)) - 1
+        self.__highest_units = int(math.ceil(self.highest / self.resolution))
+        self.__units_per_sec = 1 / self.resolution
+        self.__counts = array('L', [0]) * (self.__index(self.__highest_units) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    # the first bucket is linear with a sub-bucket per unit, each subsequent bucket covers double the range of values
+    # at half the resolution, with only its upper half of sub-buckets used as the lower half overlaps the bucket before
+    def __index(self, units):
+        bucket = max(0, units.bit_length() - self.__sub_bucket_half_magnitude - 1)
+        return (bucket << self.__sub_bucket_half_magnitude) + (units >> bucket)
+
+    # the highest value in units that shares the index
+    def __value(self, index):
+        half_magnitude = self.__sub_bucket_half_magnitude
+        bucket = max(0, (index >> half_magnitude) - 1)
+        sub_bucket = index - (bucket << half_magnitude)
+        return ((sub_bucket + 1) << bucket) - 1
+
+    def record(self, secs, count=1):
+        units = int(secs * self.__units_per_sec + 0.5)
+        if units > self.__highest_units:
+            units = self.__highest_units
+        elif units < 0:
+            raise ValueError('negative latency {0} passed to LatencyRecorder.record()'.format(secs))
+        # inlined __index()
+        bucket = units.bit_length() - self.__sub_bucket_half_magnitude - 1
+        if bucket > 0:
+            self.__counts[(bucket << self.__sub_bucket_half_magnitude) + (units >> bucket)] += count
+        else:
+            self.__counts[units] += count
+        self.count += count
+        self.total += secs * count
+        if self.max is None:
+            self.min = self.max = secs
+        elif secs > self.max:
+            self.max = secs
+        elif secs < self.min:
+            self.min = secs
+
+    # records the time taken by the with block, eg.
+    #
+    #   with recorder.time():
+    #       self.write()
+    @contextmanager
+    def time(self):
+        start = timer()
+        yield
+        self.record(timer() - start)
+
+    # adds the counts of another recorder with the same settings, returning self
+    def merge(self, other):
+        if not isinstance(other, LatencyRecorder) or \
+           (other.resolution, other.highest, other.significant_digits) != \
+           (self.resolution, self.highest, self.significant_digits):
+            raise CodingError('LatencyRecorder.merge() requires a LatencyRecorder with the same settings')
+        if not other.count:
+            return self
+        counts = self.__counts
+        for (index, count) in enumerate(other.__counts):  # pylint: disable=protected-access
+            if count:
+                counts[index] += count
+        self.count += other.count
+        self.total += other.total
+        if self.min is None or other.min < self.min:
+            self.min = other.min
+        if self.max is None or other.max > self.max:
+            self.max = other.max
+        return self
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return self.total / self.count
+
+    def percentile(self, pct):
+        return self.percentiles([pct])[pct]
+
+    # returns an OrderedDict of percentile => secs, nearest rank to within the significant digits, in one pass
+    def percentiles(self, pcts=PERCENTILES):
+        for pct in pcts:
+            if not isFloat(pct) or not 0 < float(pct) <= 100:
+                raise CodingError('invalid percentile {0} passed to LatencyRecorder, must be > 0 and <= 100'
+                                  .format(pct))
+        result = OrderedDict([(pct, None) for pct in pcts])
+        if not self.count:
+            return result
+        ranks = sorted([(max(1, int(math.ceil(float(pct) / 100 * self.count))), pct) for pct in pcts])
+        rank_index = 0
+        cumulative = 0
+        for (index, count) in enumerate(self.__counts):
+            if not count:
+                continue
+            cumulative += count
+            while rank_index < len(ranks) and cumulative >= ranks[rank_index][0]:
+                # bucket values are approximate so keep them within the exact min and max
+                value = max(self.min, min(self.max, self.__value(index) * self.resolution))
+                result[ranks[rank_index][1]] = value
+                rank_index += 1
+            if rank_index == len(ranks):
+                break
+        return result
+
+    # returns an OrderedDict of the count, mean, percentiles and max
+    def stats(self, pcts=PERCENTILES):
+        stats = OrderedDict()
+        stats['count'] = self.count
+        stats['mean'] = self.mean
+        for (pct, value) in self.percentiles(pcts).items():
+            stats['p{0:g}'.format(pct)] = value
+        stats['max'] = self.max
+        return stats
+
+    # adds the mean, percentiles and max as name_mean, name_p50 ... name_max in secs to a new or given Perfdata, which
+    # is returned, the warning and critical thresholds apply to each of them
+    # pylint: disable=too-many-arguments
+    def perfdata(self, name, perfdata=None, warning=None, critical=None, pcts=PERCENTILES, precision=6):
+        if perfdata is None:
+            perfdata = Perfdata()
+        for (stat, value) in self.stats(pcts).items():
+            if stat == 'count' or value is None:
+                continue
+            perfdata.add('{0}_{1}'.format(name, stat), value, 's', warning=warning, critical=critical,
+                         precision=precision)
+        return perfdata
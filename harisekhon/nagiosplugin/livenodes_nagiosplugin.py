@@ -35,9 +35,10 @@ sys.path.append(libdir)
 from harisekhon.utils import UnknownError, CodingError, qquit, plural
 from harisekhon.utils import get_topfile, validate_host, validate_port
 from harisekhon.nagiosplugin import NagiosPlugin
+from harisekhon.nagiosplugin.perfdata import Perfdata
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.3.1'
+__version__ = '0.4.0'
 
 
 class LiveNodesNagiosPlugin(NagiosPlugin):
@@ -109,8 +110,8 @@ class LiveNodesNagiosPlugin(NagiosPlugin):
         self.check_thresholds(name=self.agent_name, result=self.node_count)
         if self.additional_info:
             self.msg += ', {0}'.format(self.additional_info)
-        self.msg += ' | {0}s_{1}={2:d}{3}'.format(self.agent_name, self.state,
-                                                  self.node_count, self.get_perf_thresholds())
+        self.msg += ' | {0}'.format(Perfdata().add('{0}s_{1}'.format(self.agent_name, self.state), self.node_count,
+                                                   **self.get_perf_threshold_args()))
         if self.additional_perfdata:
             self.msg += ' {0}'.format(self.additional_perfdata)
         qquit(self.status, self.msg)
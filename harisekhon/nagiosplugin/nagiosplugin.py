@@ -24,6 +24,7 @@ import os
 import re
 import sys
 import traceback
+from fnmatch import fnmatchcase
 #import time
 # import traceback
 # import logging
@@ -32,14 +33,17 @@ from abc import ABCMeta, abstractmethod
 libdir = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
-from harisekhon.utils import ERRORS, qquit, CodingError, log, isStr, log_option, support_msg
+from harisekhon.utils import ERRORS, qquit, CodingError, log, isStr, isDict, log_option, support_msg, validate_float
 from harisekhon.utils import WarningError, CriticalError, UnknownError
+from harisekhon.utils import QuitException, is_result_mode, set_result_mode
 from harisekhon import CLI
 from harisekhon.nagiosplugin.threshold import Threshold
 from harisekhon.nagiosplugin.threshold import InvalidThresholdException
+from harisekhon.nagiosplugin.perfdata import Perfdata, perf_number
+from harisekhon.nagiosplugin.result_cache import ResultCache
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.9.6'
+__version__ = '0.12.1'
 
 
 class NagiosPlugin(CLI):
@@ -60,6 +64,15 @@ class NagiosPlugin(CLI):
         # self.__msg = 'MESSAGE NOT DEFINED'
         self.msg = 'MESSAGE NOT DEFINED'
         self.__thresholds = {'warning': None, 'critical': None}
+        # [(name or wildcard pattern, critical threshold, warning threshold)]
+        self.__metric_thresholds = []
+        # metric name => (critical threshold, warning threshold) resolved from the above
+        self.__metric_thresholds_cache = {}
+        # None prevents the --cache-ttl and --cache-stale switches becoming exposed, whereas 0 will allow with the
+        # result cache disabled by default - set in checks which are safe to share between invocations
+        self.result_cache_ttl_default = None
+        self.result_cache = None
+        self.__result_cache_key = None
         sys.stderr = sys.stdout
 
     # ============================================================================ #
@@ -221,6 +234,122 @@ class NagiosPlugin(CLI):
             return threshold_breach_msg2
         return ''
 
+    # checks a list of results against the critical and warning thresholds at once, eg. per partition or per node
+    #
+    # returns a list of (index, status) for the results which breach a threshold, in index order, and sets the
+    # plugin status to critical or warning for the worst of them but leaves self.msg to the caller to describe them
+    def check_thresholds_many(self, results, name=''):
+        if not isStr(name):
+            raise CodingError('non-string passed to check_thresholds_many()')
+        if name:
+            name += '_'
+        breaches = {}
+        for status in ('warning', 'critical'):
+            for index in self.get_threshold('{0}{1}'.format(name, status), optional=True).check_many(results):
+                breaches[index] = status.upper()
+        if 'CRITICAL' in breaches.values():
+            self.critical()
+        elif breaches:
+            self.warning()
+        return sorted(breaches.items())
+
+    # ============================================================================ #
+    #                                Multiple Metrics
+    # ============================================================================ #
+
+    # sets the warning and critical thresholds, as threshold strings or Threshold objects, for the metrics passed to
+    # check_metrics() matching name, which may be a wildcard pattern eg. 'queue_*'
+    #
+    # an exact name takes precedence over patterns, then the first pattern added that matches
+    def add_metric_thresholds(self, name, warning=None, critical=None, **kwargs):
+        if not isStr(name) or not name:
+            raise CodingError('non-string or blank name passed to add_metric_thresholds()')
+        thresholds = {'warning': warning, 'critical': critical}
+        for (status, threshold) in thresholds.items():
+            if threshold is None or isinstance(threshold, Threshold):
+                continue
+            try:
+                thresholds[status] = Threshold(threshold, name='{0} {1}'.format(name, status), **kwargs)
+            except InvalidThresholdException as _:
+                self.usage(_)
+            log_option('{0} {1}'.format(name, status), threshold)
+        self.__metric_thresholds.append((name, thresholds['critical'], thresholds['warning']))
+        self.__metric_thresholds_cache.clear()
+
+    # returns the (critical, warning) thresholds for a metric name, either of which may be None
+    def get_metric_thresholds(self, name):
+        try:
+            return self.__metric_thresholds_cache[name]
+        except KeyError:
+            pass
+        thresholds = (None, None)
+        for (pattern, critical, warning) in self.__metric_thresholds:
+            if pattern == name:
+                thresholds = (critical, warning)
+                break
+            if thresholds == (None, None) and fnmatchcase(name, pattern):
+                thresholds = (critical, warning)
+        self.__metric_thresholds_cache[name] = thresholds
+        return thresholds
+
+    # checks many named metric values in one pass against their metric thresholds, escalating the plugin status to
+    # the worst breach, and returns them rendered for the end of self.msg as:
+    #
+    #   name = value, name2 = value2 (value2 > critical) | name=value;warning;critical name2=value2;warning;critical
+    #
+    # metrics is a dict or a list of (name, value) pairs, units is a string for all of the metrics or a dict of metric
+    # name to units. Values which aren't numbers are left out of the perfdata
+    def check_metrics(self, metrics, units=''):
+        if isDict(metrics):
+            metrics = metrics.items()
+        units_by_name = units if isDict(units) else None
+        get_metric_thresholds = self.get_metric_thresholds
+        msgs = []
+        perfdata = Perfdata()
+        worst = None
+        for (name, value) in metrics:
+            (critical, warning) = get_metric_thresholds(name)
+            breach = ''
+            if critical is not None:
+                breach = critical.compiled.check(value)
+                if breach:
+                    worst = 'CRITICAL'
+            if not breach and warning is not None:
+                breach = warning.compiled.check(value)
+                if breach and worst is None:
+                    worst = 'WARNING'
+            shown = value
+            if isinstance(value, float) and abs(value) < float('inf'):
+                # without the exponent str() gives small latencies
+                shown = perf_number(value)
+            if breach:
+                msgs.append('{0} = {1} {2}'.format(name, shown, breach))
+            else:
+                msgs.append('{0} = {1}'.format(name, shown))
+            if value is None:
+                continue
+            try:
+                perfdata.add(name, value, units_by_name.get(name, '') if units_by_name is not None else units,
+                             warning=warning, critical=critical)
+            except (TypeError, ValueError):
+                pass
+        if worst == 'CRITICAL':
+            self.critical()
+        elif worst == 'WARNING':
+            self.warning()
+        if perfdata:
+            return '{0} | {1}'.format(', '.join(msgs), perfdata)
+        return ', '.join(msgs)
+
+    # the warning and critical thresholds as keyword args for Perfdata.add(), eg.
+    #
+    #   Perfdata().add('query_time', query_time, 's', **self.get_perf_threshold_args())
+    def get_perf_threshold_args(self, name=''):
+        if name:
+            name += '_'
+        return {'warning': self.get_threshold('{0}warning'.format(name), optional=True),
+                'critical': self.get_threshold('{0}critical'.format(name), optional=True)}
+
     def get_perf_thresholds(self, boundary='upper'):
         if boundary not in ('lower', 'upper'):
             raise CodingError('invalid boundary passed to get_perf_thresholds()')
@@ -229,15 +358,116 @@ class NagiosPlugin(CLI):
         warning_msg = ''
         critical_msg = ''
         if not warning or warning.thresholds[boundary] is not None:
-            # results in exponential format
-            #warning_msg = '{0:g}'.format(warning.thresholds[boundary])
-            warning_msg = '{0:f}'.format(warning.thresholds[boundary])
+            # '{0:g}' results in exponential format
+            warning_msg = perf_number(warning.thresholds[boundary])
         if not critical or critical.thresholds[boundary] is not None:
-            # results in exponential format
-            #critical_msg = '{0:g}'.format(critical.thresholds[boundary])
-            critical_msg = '{0:f}'.format(critical.thresholds[boundary])
+            critical_msg = perf_number(critical.thresholds[boundary])
         return ';{0};{1}'.format(warning_msg, critical_msg)
 
+    # ============================================================================ #
+    #                                  Result Cache
+    # ============================================================================ #
+
+    # options which don't change the result of the check, left out of the result cache key
+    result_cache_ignored_options = ('verbose', 'debug', 'help', 'version', 'timeout', 'cache_ttl', 'cache_stale')
+
+    def add_default_opts(self):
+        # Python 2.x
+        super(NagiosPlugin, self).add_default_opts()
+        # Python 3.x
+        # super().add_default_opts()
+        if self.result_cache_ttl_default is not None:
+            self.add_opt('--cache-ttl', metavar='secs',
+                         default=os.getenv('HARISEKHON_RESULT_CACHE_TTL', self.result_cache_ttl_default),
+                         help='Return the cached result of the same check with the same options run within this ' +
+                         'many secs instead of querying again, shared between invocations on this host ' +
+                         '($HARISEKHON_RESULT_CACHE_TTL, default: {0}, 0 = disabled)'
+                         .format(self.result_cache_ttl_default))
+            self.add_opt('--cache-stale', metavar='secs', default=os.getenv('HARISEKHON_RESULT_CACHE_STALE', 0),
+                         help='Continue returning the cached result for this many secs past the --cache-ttl while ' +
+                         'one invocation refreshes it ($HARISEKHON_RESULT_CACHE_STALE, default: 0)')
+
+    # identifies the check's results by the plugin class and the options and args which affect the result
+    def result_cache_key(self):
+        cls = type(self)
+        module_file = getattr(sys.modules.get(cls.__module__), '__file__', None)
+        options = dict([(key, value) for (key, value) in vars(self.options).items()
+                        if key not in self.result_cache_ignored_options])
+        return ResultCache.make_key(cls.__module__, cls.__name__,
+                                    os.path.realpath(module_file) if module_file else None,
+                                    options, self.args)
+
+    def __run__(self):
+        if self.result_cache_ttl_default is None:
+            # Python 2.x
+            return super(NagiosPlugin, self).__run__()
+            # Python 3.x
+            # return super().__run__()
+        ttl = self.get_opt('cache_ttl')
+        stale = self.get_opt('cache_stale')
+        validate_float(ttl, 'cache ttl', 0, 86400)
+        validate_float(stale, 'cache stale', 0, 86400)
+        if float(ttl) <= 0:
+            return super(NagiosPlugin, self).__run__()
+        # a refresh lock older than the timeout was abandoned by a killed check
+        self.result_cache = ResultCache(ttl, stale, lock_secs=(self.timeout or 60) + 1)
+        key = self.result_cache_key()
+        cached = self.result_cache.get(key)
+        if cached is not None:
+            (status, msg, age) = cached
+            if self.result_cache.is_fresh(age):
+                log.info('returning cached result from %.1f secs ago', age)
+                qquit(status, msg)
+            if not self.result_cache.lock(key):
+                log.info('returning stale cached result from %.1f secs ago while another check refreshes it', age)
+                qquit(status, msg)
+            log.info('refreshing stale cached result from %.1f secs ago', age)
+        self.__result_cache_key = key
+        try:
+            # Python 2.x
+            self.__quit_cached(super(NagiosPlugin, self).__run__)
+            # Python 3.x
+            # self.__quit_cached(super().__run__)
+        except CriticalError as _:
+            self.__cache_result('CRITICAL', _)
+            raise
+        except WarningError as _:
+            self.__cache_result('WARNING', _)
+            raise
+        except BaseException:
+            self.__cache_result('UNKNOWN')
+            raise
+        return None
+
+    # UNKNOWN results such as timeouts aren't cached so that the next invocation tries again
+    def __cache_result(self, status, msg=None):
+        key = self.__result_cache_key
+        if key is None:
+            return
+        self.__result_cache_key = None
+        if status != 'UNKNOWN':
+            self.result_cache.set(key, status, msg)
+        self.result_cache.unlock(key)
+
+    # runs func in result mode while a result is being cached, so that a qquit() from within run() or end() is
+    # cached before quitting the same as it otherwise would have
+    def __quit_cached(self, func):
+        if self.__result_cache_key is None:
+            func()
+            return
+        quit_exception = None
+        previous_result_mode = is_result_mode()
+        set_result_mode(True)
+        try:
+            func()
+        except QuitException as _:
+            quit_exception = _
+        finally:
+            set_result_mode(previous_result_mode)
+        if quit_exception is not None:
+            self.__cache_result(quit_exception.status, quit_exception.msg)
+            qquit(quit_exception.status, quit_exception.msg)
+
     # Generic exception handler for Nagios to rewrite any unhandled exceptions as UNKNOWN rather than allowing
     # the default python exit code of 1 which would equate to WARNING in Nagios compatible systems
     def main(self):
@@ -288,10 +518,18 @@ class NagiosPlugin(CLI):
         pass
 
     def __end__(self):
-        super(NagiosPlugin, self).__end__()
-        # enabling this would break existing PNP4Nagios data due to the change in num perfdata fields
-        #if '|' not in self.msg:
-        #    self.msg += ' |'
-        #self.msg += ' check_time={0:.2f}s'.format(CLI.__total_plugin_time)
-        log.info('end\n%s\n', '='*80)
+        try:
+            # Python 2.x
+            self.__quit_cached(super(NagiosPlugin, self).__end__)
+            # Python 3.x
+            # self.__quit_cached(super().__end__)
+            # enabling this would break existing PNP4Nagios data due to the change in num perfdata fields
+            #if '|' not in self.msg:
+            #    self.msg += ' |'
+            #self.msg += ' check_time={0:.2f}s'.format(CLI.__total_plugin_time)
+            log.info('end\n%s\n', '='*80)
+            self.__cache_result(self.status, self.msg)
+        finally:
+            # releases the refresh lock without caching if end() raised an exception
+            self.__cache_result('UNKNOWN')
         qquit(self.status, self.msg)
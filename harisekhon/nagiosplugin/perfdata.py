@@ -0,0 +1,323 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 02:47:13 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+Perfdata - builds and parses Nagios perfdata:
+
+    'label'=value[units];[warning];[critical];[min];[max] ...
+
+Values are stored in an array of doubles alongside the labels, with the units and warning / critical / min / max
+fields each stored once and referenced by index, so large numbers of metrics stay compact. Units are validated against
+valid_nagios_units once each rather than for every value
+
+str() renders all of the perfdata in one join, Perfdata.parse() reads it back eg. for aggregation or testing
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+#from __future__ import unicode_literals
+
+import math
+import os
+import re
+import sys
+from array import array
+from collections import namedtuple
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import CodingError, isNagiosUnit, isStr, valid_nagios_units
+from harisekhon.nagiosplugin.threshold import Threshold
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1.1'
+
+PerfdataValue = namedtuple('PerfdataValue', 'label, value, units, warning, critical, min, max')
+
+_INFINITY = float('inf')
+
+# value precision meaning format the shortest way without an exponent
+AUTO_PRECISION = -1
+
+# label=value[units];[warning];[critical];[min];[max] with labels single quoted if they contain spaces, equals or quotes
+_perfdata_regex = re.compile(r"""\s*('(?:[^']|'')+'|[^\s'=]+)=(U|[-+]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][-+]?\d+)?)""" +
+                             r"""([^\d\s;.+-][^\s;]*)?(?:;([^\s;]*)(?:;([^\s;]*)(?:;([^\s;]*)(?:;([^\s;]*))?)?)?)?""" +
+                             r"""(?=\s|$)""")
+_needs_quoting = re.compile(r"[\s'=]").search
+
+
+class Perfdata(object):
+
+    __slots__ = ('__labels', '__values', '__precisions', '__units', '__unit_ids', '__unit_index', '__fields',
+                 '__field_ids', '__field_index', '__add_cache')
+
+    def __init__(self):
+        self.__labels = []
+        self.__values = array('d')
+        self.__precisions = array('b')
+        # distinct units and (warning, critical, min, max) rendered field strings, referenced by index per value
+        self.__units = ['']
+        self.__unit_ids = array('H')
+        self.__unit_index = {'': 0}
+        self.__fields = [('', '', '', '')]
+        self.__field_index = {('', '', '', ''): 0}
+        self.__field_ids = array('I')
+        # (units, warning, critical, min, max) as passed to add() => (unit id, field id), so that each distinct
+        # units and threshold combination is only validated and rendered once
+        self.__add_cache = {}
+
+    # adds a value, returning self to chain adds
+    #
+    # value may be None or NaN for the unknown value 'U'
+    # warning and critical may be Thresholds, numbers or Nagios range strings
+    # precision is the number of decimal places to render the value with, otherwise the shortest without an exponent
+    def add(self, label, value, units='', warning=None, critical=None, minimum=None, maximum=None, precision=None):
+        if not label or not isStr(label):
+            raise CodingError('non-string or blank label passed to Perfdata.add()')
+        if precision is None:
+            precision = AUTO_PRECISION
+        elif not 0 <= precision <= 20:
+            raise CodingError('invalid precision passed to Perfdata.add(), must be between 0 and 20')
+        # Thresholds are keyed by their compiled snapshot, which is replaced if the Threshold is recompiled
+        key = (units,
+               warning.compiled if isinstance(warning, Threshold) else warning,
+               critical.compiled if isinstance(critical, Threshold) else critical,
+               minimum, maximum)
+        try:
+            (unit_id, field_id) = self.__add_cache[key]
+        except (KeyError, TypeError):
+            try:
+                unit_id = self.__unit_index[units]
+            except KeyError:
+                if not isNagiosUnit(units):
+                    raise CodingError("invalid units '{0}' passed to Perfdata.add(), must be one of: {1}"
+                                      .format(units, ', '.join(valid_nagios_units)))
+                unit_id = self.__add_units(units)
+            field_id = self.__field_id((perf_range(warning), perf_range(critical),
+                                        perf_range(minimum), perf_range(maximum)))
+            try:
+                self.__add_cache[key] = (unit_id, field_id)
+            except TypeError:
+                # unhashable
+                pass
+        self.__add(label, value, unit_id, field_id, precision)
+        return self
+
+    def __add_units(self, units):
+        self.__unit_index[units] = len(self.__units)
+        self.__units.append(units)
+        return self.__unit_index[units]
+
+    def __field_id(self, fields):
+        try:
+            return self.__field_index[fields]
+        except KeyError:
+            self.__field_index[fields] = len(self.__fields)
+            self.__fields.append(fields)
+            return self.__field_index[fields]
+
+    def __add(self, label, value, unit_id, field_id, precision):
+        value = float('nan') if value is None else float(value)
+        if value in (_INFINITY, -_INFINITY):
+            raise ValueError('infinite perfdata value for {0}'.format(label))
+        self.__labels.append(label)
+        self.__values.append(value)
+        self.__precisions.append(precision)
+        self.__unit_ids.append(unit_id)
+        self.__field_ids.append(field_id)
+
+    # appends the values of another Perfdata, returning self
+    def extend(self, other):
+        if not isinstance(other, Perfdata):
+            raise CodingError('non-Perfdata passed to Perfdata.extend()')
+        # pylint: disable=protected-access
+        for (index, label) in enumerate(other.__labels):
+            units = other.__units[other.__unit_ids[index]]
+            try:
+                unit_id = self.__unit_index[units]
+            except KeyError:
+                unit_id = self.__add_units(units)
+            field_id = self.__field_id(other.__fields[other.__field_ids[index]])
+            self.__add(label, other.__values[index], unit_id, field_id, other.__precisions[index])
+        return self
+
+    def __len__(self):
+        return len(self.__labels)
+
+    def __iter__(self):
+        units = self.__units
+        fields = self.__fields
+        for (index, label) in enumerate(self.__labels):
+            value = self.__values[index]
+            yield PerfdataValue(label, None if value != value else value, units[self.__unit_ids[index]],
+                                *fields[self.__field_ids[index]])
+
+    def labels(self):
+        return list(self.__labels)
+
+    # returns the first value for the label, None for the unknown value 'U'
+    def get(self, label, default=None):
+        try:
+            value = self.__values[self.__labels.index(label)]
+        except ValueError:
+            return default
+        return None if value != value else value
+
+    def to_dict(self):
+        return dict([(item.label, item.value) for item in self])
+
+    def __str__(self):
+        return self.render()
+
+    def __repr__(self):
+        return "Perfdata('{0}')".format(self.render())
+
+    def __eq__(self, other):
+        return isinstance(other, Perfdata) and list(self) == list(other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def render(self):
+        labels = self.__labels
+        precisions = self.__precisions
+        unit_ids = self.__unit_ids
+        field_ids = self.__field_ids
+        # units;warning;critical;min;max rendered once per distinct combination, trailing semicolons trimmed
+        suffixes = {}
+        parts = []
+        append = parts.append
+        for (index, value) in enumerate(self.__values):
+            label = labels[index]
+            if _needs_quoting(label):
+                label = "'{0}'".format(label.replace("'", "''"))
+            precision = precisions[index]
+            if value != value:
+                value = 'U'
+            elif precision != AUTO_PRECISION:
+                value = '{0:.{1}f}'.format(value, precision)
+            elif value.is_integer():
+                value = '{0:d}'.format(int(value))
+            else:
+                value = perf_number(value)
+            key = (unit_ids[index], field_ids[index])
+            try:
+                suffix = suffixes[key]
+            except KeyError:
+                suffix = suffixes[key] = ';'.join((self.__units[key[0]],) + self.__fields[key[1]]).rstrip(';')
+            append(label + '=' + value + suffix)
+        return ' '.join(parts)
+
+    # parses a perfdata string in to a Perfdata, raises ValueError if it's not valid perfdata
+    #
+    # units aren't validated as other plugins' perfdata may use units outside of valid_nagios_units
+    @classmethod
+    def parse(cls, perfdata):
+        if not isStr(perfdata):
+            raise ValueError('non-string passed to Perfdata.parse()')
+        result = cls()
+        # pylint: disable=protected-access
+        unit_index = result.__unit_index
+        add = result.__add
+        field_id = result.__field_id
+        match = _perfdata_regex.match
+        pos = 0
+        end = len(perfdata.rstrip())
+        while pos < end:
+            _ = match(perfdata, pos)
+            if _ is None:
+                raise ValueError("invalid perfdata at position {0}: '{1}'".format(pos, perfdata[pos:pos + 50]))
+            (label, value, units, warning, critical, minimum, maximum) = _.groups()
+            if label[0] == "'":
+                label = label[1:-1].replace("''", "'")
+            units = units or ''
+            try:
+                unit_id = unit_index[units]
+            except KeyError:
+                unit_id = result.__add_units(units)
+            add(label, None if value == 'U' else value, unit_id,
+                field_id((warning or '', critical or '', minimum or '', maximum or '')), _parse_precision(value))
+            pos = _.end()
+        return result
+
+
+def _parse_precision(value):
+    # keep the number of decimal places so that parsed perfdata renders back the same
+    (_, dot, decimals) = value.partition('.')
+    if not dot or 'e' in value.lower():
+        return AUTO_PRECISION
+    return min(len(decimals), 20)
+
+
+# numbers without the exponents that '{0:g}' would give for large or small values, which Nagios doesn't accept,
+# to 6 decimal places or 6 significant digits for values below 1 so that eg. sub-microsecond latencies aren't 0
+def perf_number(value):
+    if isinstance(value, bool):
+        value = int(value)
+    if isinstance(value, int):
+        return str(value)
+    value = float(value)
+    if value != value or value in (_INFINITY, -_INFINITY):
+        raise ValueError('non-finite perfdata value')
+    if value.is_integer():
+        return str(int(value))
+    precision = 6
+    if abs(value) < 1:
+        precision = max(precision, 5 - int(math.floor(math.log10(abs(value)))))
+    # always has a fractional part to strip the trailing zeros from given the precision
+    return '{0:.{1}f}'.format(value, precision).rstrip('0').rstrip('.')
+
+
+# the Nagios range format for the warning / critical / min / max perfdata fields, blank if not set
+def perf_range(threshold):
+    if threshold is None:
+        return ''
+    if isStr(threshold):
+        return threshold
+    if not isinstance(threshold, Threshold):
+        return perf_number(threshold)
+    (lower, upper) = (threshold.get_lower(), threshold.get_upper())
+    if lower is None and upper is None:
+        return ''
+    if lower is None:
+        return perf_number(upper)
+    if upper is None:
+        return '{0}:'.format(perf_number(lower))
+    return '{0}{1}:{2}'.format('@' if threshold.opts['invert'] else '', perf_number(lower), perf_number(upper))
+
+
+# splits plugin output in to the message and the perfdata string, including perfdata in the long output
+# on subsequent lines as per the Nagios plugin API
+def split_output(output):
+    lines = output.split('\n')
+    (msg, _, perfdata) = lines[0].partition('|')
+    perfdata = [perfdata.strip()]
+    long_output = []
+    for (index, line) in enumerate(lines[1:], 1):
+        if '|' in line:
+            (text, _, rest) = line.partition('|')
+            long_output.append(text)
+            perfdata.append(rest.strip())
+            perfdata.extend([_.strip() for _ in lines[index + 1:]])
+            break
+        long_output.append(line)
+    msg = '\n'.join([msg.rstrip()] + long_output).rstrip()
+    return (msg, ' '.join([_ for _ in perfdata if _]))
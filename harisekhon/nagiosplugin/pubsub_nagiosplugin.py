@@ -18,6 +18,16 @@
 
 Publish Subscribe Checker Specialization of NagiosPlugin
 
+Benchmark mode, --bench-messages / --bench-secs, publishes many messages of --message-size bytes from --concurrency
+publisher threads while consuming them back, checking for lost, duplicate, corrupt and out of order messages, and
+reports throughput and publish / end-to-end latency percentiles with --bench-warning / --bench-critical thresholds
+applicable to any of them
+
+Subclasses publish self.publish_message in publish() and consume() from a client written for one thread, so in
+benchmark mode the publisher threads and the consumer thread are serialized through one client lock by default -
+override publish_msg(message) and consume_msg() with thread safe versions to publish and consume concurrently.
+Override unsubscribe() to interrupt a consume() blocked waiting for messages so the consumer thread stops at the end
+
 """
 
 from __future__ import absolute_import
@@ -25,21 +35,38 @@ from __future__ import division
 from __future__ import print_function
 #from __future__ import unicode_literals
 
+import itertools
 import os
 import socket
 import sys
+import threading
 import time
 # Python 2.6+ only
 from abc import ABCMeta, abstractmethod
+from collections import OrderedDict
+from fnmatch import fnmatchcase
+from multiprocessing.pool import ThreadPool
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
 from harisekhon.nagiosplugin.nagiosplugin import NagiosPlugin
+from harisekhon.nagiosplugin.perfdata import Perfdata
+from harisekhon.nagiosplugin.latency import LatencyRecorder, timer, PERCENTILES
 from harisekhon.utils import qquit, log, CodingError, CriticalError, UnknownError
-from harisekhon.utils import validate_host, validate_port, validate_float, get_topfile, random_alnum
+from harisekhon.utils import validate_host, validate_port, validate_float, validate_int, get_topfile, random_alnum
+from harisekhon.utils import plural
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.3.1'
+__version__ = '0.7.1'
+
+# max secs to wait for the consumer thread to stop at the end of the benchmark
+CONSUMER_STOP_SECS = 5
+
+BENCH_METRICS = ('messages', 'consumed', 'lost', 'duplicates', 'corrupt', 'out_of_order', 'publish_msgs_per_sec',
+                 'msgs_per_sec', 'bytes_per_sec') + \
+                tuple(['{0}_{1}'.format(prefix, stat)
+                       for prefix in ('publish_latency', 'latency')
+                       for stat in ['p{0}'.format(_) for _ in PERCENTILES] + ['max']])
 
 
 class PubSubNagiosPlugin(NagiosPlugin):
@@ -82,8 +109,17 @@ class PubSubNagiosPlugin(NagiosPlugin):
         self.default_sleep_secs = 1.0
         self.__sleep_secs = 0
         self.sleep_usage = 'Sleep time in seconds before publishing and subscribing ' + \
-                           'to give message a chance to appear ' + \
+                           'to give message a chance to appear, in benchmark mode the max secs to wait after ' + \
+                           'publishing for the remaining messages to be consumed ' + \
                            '(optional, default: {} secs)'.format(self.default_sleep_secs)
+        self.bench_messages = 0
+        self.bench_secs = 0
+        self.message_size = None
+        self.concurrency = 1
+        self.unordered = False
+        self._bench_stats = None
+        # serializes the default publish_msg() and consume_msg() as subclasses' clients aren't thread safe
+        self.__client_lock = threading.Lock()
 
     def add_options(self):
         if not self.name:
@@ -92,6 +128,22 @@ class PubSubNagiosPlugin(NagiosPlugin):
         self.add_thresholds(default_warning=self.warning_threshold_default,
                             default_critical=self.critical_threshold_default)
         self.add_opt('-s', '--sleep', type=float, default=1.0, metavar='secs', help=self.sleep_usage)
+        self.add_opt('--bench-messages', metavar='N', default=0,
+                     help='Benchmark mode, publish and consume back N messages (default: 0 = single message check)')
+        self.add_opt('--bench-secs', metavar='secs', default=0,
+                     help='Benchmark mode, publish messages for this many secs, up to --bench-messages if also set')
+        self.add_opt('--message-size', metavar='bytes',
+                     help='Benchmark message size in bytes (default: the size of the single check message)')
+        self.add_opt('--concurrency', metavar='N', default=1, help='Benchmark publisher threads (default: 1)')
+        self.add_opt('--unordered', action='store_true',
+                     help="Don't fail the benchmark for messages consumed out of order, " +
+                     'eg. for brokers spreading messages over partitions')
+        self.add_opt('--bench-warning', metavar='metric=threshold', action='append',
+                     help='Benchmark warning threshold for any metric in the output, eg. latency_p99=0.5 or ' +
+                     'msgs_per_sec=1000 for a lower bound on throughput, can be given multiple times. ' +
+                     'The -w / -c thresholds apply to latency_max')
+        self.add_opt('--bench-critical', metavar='metric=threshold', action='append',
+                     help='Benchmark critical threshold for any metric in the output, as per --bench-warning')
 
     def process_args(self):
         if not self.name:
@@ -106,6 +158,47 @@ class PubSubNagiosPlugin(NagiosPlugin):
         if sleep_secs:
             # validation done through property wrapper
             self.sleep_secs = sleep_secs
+        self.process_bench_options()
+
+    def process_bench_options(self):
+        self.bench_messages = self.get_opt('bench_messages')
+        validate_int(self.bench_messages, 'bench messages', 0, 100000000)
+        self.bench_messages = int(self.bench_messages)
+        self.bench_secs = self.get_opt('bench_secs')
+        validate_float(self.bench_secs, 'bench secs', 0, self.timeout_max)
+        self.bench_secs = float(self.bench_secs)
+        self.concurrency = self.get_opt('concurrency')
+        validate_int(self.concurrency, 'concurrency', 1, 1000)
+        self.concurrency = int(self.concurrency)
+        self.message_size = self.get_opt('message_size')
+        if self.message_size is not None:
+            validate_int(self.message_size, 'message size', len(self.bench_message(0, 0, 0)), 100 * 1024 * 1024)
+            self.message_size = int(self.message_size)
+        self.unordered = self.get_opt('unordered')
+        thresholds = {'warning': {}, 'critical': {}}
+        for status in thresholds:
+            for arg in self.get_opt('bench_{0}'.format(status)) or []:
+                (metric, _, threshold) = arg.partition('=')
+                metric = metric.strip()
+                if not metric or not threshold:
+                    self.usage("invalid --bench-{0} '{1}', must be in the form metric=threshold".format(status, arg))
+                if not [_ for _ in BENCH_METRICS if fnmatchcase(_, metric)]:
+                    self.usage("invalid --bench-{0} metric '{1}', must be one of: {2}"
+                               .format(status, metric, ', '.join(BENCH_METRICS)))
+                thresholds[status][metric] = threshold
+        for metric in sorted(set(thresholds['warning']) | set(thresholds['critical'])):
+            # throughput thresholds are minimums
+            self.add_metric_thresholds(metric,
+                                       warning=thresholds['warning'].get(metric),
+                                       critical=thresholds['critical'].get(metric),
+                                       simple='lower' if metric.endswith('per_sec') else 'upper',
+                                       integer=False)
+        self.add_metric_thresholds('latency_max',
+                                   warning=self.get_threshold('warning', optional=True),
+                                   critical=self.get_threshold('critical', optional=True))
+
+    def is_bench(self):
+        return bool(self.bench_messages or self.bench_secs)
 
     @property
     def sleep_secs(self):
@@ -118,30 +211,228 @@ class PubSubNagiosPlugin(NagiosPlugin):
         self.__sleep_secs = float(secs)
 
     def run(self):
-        start = time.time()
+        if self.is_bench():
+            self.run_bench()
+            return
+        start = timer()
         log.info('subscribing')
         self.subscribe()
+        self.check_timeout()
         log.info('publishing message "%s"', self.publish_message)
-        start_publish = time.time()
+        start_publish = timer()
         self.publish()
-        stop_publish = time.time()
+        stop_publish = timer()
         self._publish_time = round(stop_publish - start_publish, self._precision)
         log.info('published in %s secs', self._publish_time)
+        self.check_timeout()
         if self.sleep_secs:
             log.info('sleeping for %s secs', self.sleep_secs)
-            time.sleep(self.sleep_secs)
-        start_consume = time.time()
+            self.sleep(self.sleep_secs)
+        start_consume = timer()
         log.info('consuming message')
         self._consumed_message = self.consume()
-        stop_consume = time.time()
+        stop_consume = timer()
         self._consume_time = round(stop_consume - start_consume, self._precision)
         log.info('consumed in %s secs', self._consume_time)
         log.info('consumed message = "%s"', self._consumed_message)
         # resetting to ok is bad - would break inheritance logic
         #self.ok()
-        stop = time.time()
+        stop = timer()
         self._total_time = round(stop - start, self._precision)
 
+    # publishes the given message, override with a thread safe version to publish concurrently in benchmark mode
+    def publish_msg(self, message):
+        with self.__client_lock:
+            self.publish_message = message
+            self.publish()
+
+    # returns the next message consumed or None if there isn't one yet, called from a single consumer thread,
+    # override with a thread safe version to consume concurrently with publishing in benchmark mode
+    def consume_msg(self):
+        with self.__client_lock:
+            return self.consume()
+
+    # called at the end of the benchmark, override to interrupt a consume() blocked waiting for messages
+    def unsubscribe(self):
+        pass
+
+    # stops the benchmark consumer thread, waiting up to CONSUMER_STOP_SECS for it to finish
+    def stop_consumer(self, consumer_thread, stop):
+        stop.set()
+        self.unsubscribe()
+        remaining = self.deadline.remaining() if self.deadline else None
+        consumer_thread.join(CONSUMER_STOP_SECS if remaining is None else min(CONSUMER_STOP_SECS, remaining))
+        if consumer_thread.is_alive():
+            log.warning('benchmark consumer thread still blocked in consume() after %s secs, abandoning it',
+                        CONSUMER_STOP_SECS)
+
+    def bench_message(self, worker, seq, size=None):
+        message = '{0} {1} {2} '.format(self.key, worker, seq)
+        if size:
+            message += 'x' * (size - len(message))
+        return message
+
+    def parse_bench_message(self, message):
+        try:
+            (key, worker, seq, _) = message.split(' ', 3)
+            if key != self.key:
+                return None
+            return (int(worker), int(seq))
+        except (AttributeError, TypeError, ValueError):
+            return None
+
+    def run_bench(self):
+        size = self.message_size or len(self.publish_message)
+        log.info('subscribing')
+        self.subscribe()
+        self.check_timeout()
+        # (worker, seq) => timer at publish
+        published = {}
+        consumed = set()
+        # end-to-end latency recorded by the single consumer thread, publish latency by each publisher then merged
+        latency = LatencyRecorder()
+        counts = {'duplicates': 0, 'corrupt': 0, 'out_of_order': 0, 'last_received': None}
+        publishing_done = threading.Event()
+        stop = threading.Event()
+        # held by the consumer while recording a message so that the results can be taken if it's abandoned
+        consumer_lock = threading.Lock()
+        errors = []
+        counter = itertools.count()
+        start = timer()
+        end_publish = start + self.bench_secs if self.bench_secs else None
+
+        def publisher(worker):
+            publish_latency = LatencyRecorder()
+            for seq in itertools.count():
+                if self.bench_messages and next(counter) >= self.bench_messages:
+                    break
+                if end_publish is not None and timer() >= end_publish:
+                    break
+                self.check_timeout()
+                message = self.bench_message(worker, seq, size)
+                published[(worker, seq)] = sent = timer()
+                self.publish_msg(message)
+                publish_latency.record(timer() - sent)
+            return publish_latency
+
+        def consumer():
+            last_seqs = {}
+            try:
+                while not stop.is_set():
+                    if publishing_done.is_set() and len(consumed) >= len(published):
+                        break
+                    message = self.consume_msg()
+                    received = timer()
+                    _ = self.parse_bench_message(message)
+                    if _ is None:
+                        if message is not None:
+                            log.debug('ignoring message from another publisher: %s', message)
+                        continue
+                    with consumer_lock:
+                        if stop.is_set():
+                            break
+                        self.__record_consumed(_, message == self.bench_message(_[0], _[1], size), received,
+                                               published.get(_), consumed, last_seqs, counts, latency)
+            except Exception as _:  # pylint: disable=broad-except
+                errors.append(_)
+
+        consumer_thread = threading.Thread(target=consumer, name='consumer')
+        consumer_thread.daemon = True
+        consumer_thread.start()
+        try:
+            log.info('publishing %s messages of %s bytes from %s publisher%s', self.bench_messages or 'timed',
+                     size, self.concurrency, plural(self.concurrency))
+            publish_latency = LatencyRecorder()
+            pool = ThreadPool(self.concurrency)
+            try:
+                for _ in pool.map(publisher, range(self.concurrency)):
+                    publish_latency.merge(_)
+            finally:
+                pool.close()
+                pool.join()
+                publishing_done.set()
+            publish_elapsed = timer() - start
+            log.info('published %s messages in %.3f secs, waiting up to %s secs for them to be consumed',
+                     len(published), publish_elapsed, self.sleep_secs)
+            consumer_thread.join(self.deadline.timeout(self.sleep_secs) if self.deadline else self.sleep_secs)
+            with consumer_lock:
+                stop.set()
+        finally:
+            # don't leave the consumer thread blocked in consume() eg. when run many times by BatchRunner
+            self.stop_consumer(consumer_thread, stop)
+        if errors:
+            raise errors[0]
+        self.check_timeout()
+        elapsed = (counts['last_received'] or timer()) - start
+        self._bench_stats = self.bench_stats(size, len(published), len(consumed),
+                                             len([_ for _ in published if _ not in consumed]), counts,
+                                             publish_elapsed, elapsed, publish_latency, latency)
+
+    # pylint: disable=too-many-arguments
+    @staticmethod
+    def __record_consumed(message_id, valid, received, sent, consumed, last_seqs, counts, latency):
+        if message_id in consumed:
+            counts['duplicates'] += 1
+            return
+        consumed.add(message_id)
+        counts['last_received'] = received
+        if sent is not None:
+            latency.record(received - sent)
+        if not valid:
+            counts['corrupt'] += 1
+        (worker, seq) = message_id
+        if seq < last_seqs.get(worker, -1):
+            counts['out_of_order'] += 1
+        else:
+            last_seqs[worker] = seq
+
+    # pylint: disable=too-many-arguments
+    @staticmethod
+    def bench_stats(size, num_published, num_consumed, lost, counts, publish_elapsed, elapsed, publish_latency,
+                    latency):
+        stats = OrderedDict()
+        stats['messages'] = num_published
+        stats['consumed'] = num_consumed
+        stats['lost'] = lost
+        stats['duplicates'] = counts['duplicates']
+        stats['corrupt'] = counts['corrupt']
+        stats['out_of_order'] = counts['out_of_order']
+        stats['publish_msgs_per_sec'] = round(num_published / publish_elapsed, 1) if publish_elapsed > 0 else None
+        stats['msgs_per_sec'] = round(num_consumed / elapsed, 1) if elapsed > 0 else None
+        stats['bytes_per_sec'] = int(num_consumed * size / elapsed) if elapsed > 0 else None
+        for (prefix, recorder) in (('publish_latency', publish_latency), ('latency', latency)):
+            for (pct, value) in recorder.percentiles(PERCENTILES).items():
+                stats['{0}_p{1}'.format(prefix, pct)] = None if value is None else round(value, 6)
+            stats['{0}_max'.format(prefix)] = None if recorder.max is None else round(recorder.max, 6)
+        return stats
+
+    def end_bench(self):
+        stats = self._bench_stats
+        if stats is None:
+            raise UnknownError('benchmark stats are not set!')
+        problems = []
+        for key in ('lost', 'corrupt', 'out_of_order', 'duplicates'):
+            if stats[key]:
+                problems.append('{0} {1}'.format(stats[key], key.replace('_', ' ').upper()))
+                if key == 'duplicates' or (key == 'out_of_order' and self.unordered):
+                    self.warning()
+                else:
+                    self.critical()
+        if not stats['messages']:
+            self.critical()
+            problems.append('NO MESSAGES PUBLISHED')
+        self.msg = '{0} benchmark published {1} message{2} of {3} bytes from {4} publisher{5}'\
+                   .format(self.name, stats['messages'], plural(stats['messages']),
+                           self.message_size or len(self.publish_message), self.concurrency, plural(self.concurrency))
+        if problems:
+            self.msg += ', ' + ', '.join(problems)
+        else:
+            self.msg += ' and consumed them back successfully'
+        units = dict([(key, 's') for key in stats if 'latency' in key])
+        self.msg += ', ' + self.check_metrics([(key, value) for (key, value) in stats.items() if value is not None],
+                                              units=units)
+        qquit(self.status, self.msg)
+
     @abstractmethod
     def subscribe(self):
         pass
@@ -155,6 +446,8 @@ class PubSubNagiosPlugin(NagiosPlugin):
         pass
 
     def end(self):
+        if self.is_bench():
+            self.end_bench()
         if self._consumed_message is None:
             raise UnknownError('read value is not set!')
         log.info('checking consumed message "%s" == published message "%s"',
@@ -168,9 +461,11 @@ class PubSubNagiosPlugin(NagiosPlugin):
         self.msg += ', consumed in {0:.{1}f} secs'.format(self._consume_time, self._precision)
         self.check_thresholds(self._consume_time)
         self.msg += ', total time = {0:.{1}f} secs'.format(self._total_time, self._precision)
-        self.msg += ' | publish_time={0:.{5}f}s{1} consume_time={2:.{5}f}s{3} total_time={4:.{5}f}s'.format(
-            self._publish_time, self.get_perf_thresholds(),
-            self._consume_time, self.get_perf_thresholds(),
-            self._total_time,
-            self._precision)
+        thresholds = self.get_perf_threshold_args()
+        self.msg += ' | {0}'.format(Perfdata()
+                                    .add('publish_time', self._publish_time, 's', precision=self._precision,
+                                         **thresholds)
+                                    .add('consume_time', self._consume_time, 's', precision=self._precision,
+                                         **thresholds)
+                                    .add('total_time', self._total_time, 's', precision=self._precision))
         qquit(self.status, self.msg)
@@ -26,10 +26,8 @@ from __future__ import print_function
 #from __future__ import unicode_literals
 
 import logging
-import json
 import os
 import sys
-import time
 import traceback
 # Python 2.6+ only
 from abc import ABCMeta #, abstractmethod
@@ -40,16 +38,19 @@ libdir = os.path.join(srcdir, 'pylib')
 sys.path.append(libdir)
 try:
     # pylint: disable=wrong-import-position
-    from harisekhon.utils import log, log_option, UnknownError, support_msg_api, jsonpp, prog
+    from harisekhon.utils import log, log_option, UnknownError, support_msg_api, jsonpp, json_loads, prog
+    from harisekhon.utils import json_extract_paths
     from harisekhon.utils import validate_host, validate_port, validate_user, validate_password
     from harisekhon.nagiosplugin import NagiosPlugin
+    from harisekhon.nagiosplugin.perfdata import Perfdata
+    from harisekhon.nagiosplugin.latency import timer
     from harisekhon import RequestHandler
 except ImportError as _:
     print(traceback.format_exc(), end='')
     sys.exit(4)
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.6.2'
+__version__ = '0.10.1'
 
 
 class RestNagiosPlugin(NagiosPlugin):
@@ -80,8 +81,13 @@ class RestNagiosPlugin(NagiosPlugin):
         self.json_data = None
         self.path = None
         self.json = False
+        # set to a list of JSON paths to stream parse only these out of large responses instead of loading the full
+        # json, see harisekhon.utils.json_extract_paths(). parse_json() then gets a dict of path => list of values
+        self.json_paths = None
         self.headers = {}
         self.auth = True
+        # exposes --cache-ttl to optionally share results between invocations, see NagiosPlugin
+        self.result_cache_ttl_default = 0
         self.ok()
 
     def add_options(self):
@@ -143,10 +149,17 @@ class RestNagiosPlugin(NagiosPlugin):
             self.headers['Content-Type'] = 'application/json'
 
     def run(self):
-        start_time = time.time()
+        if self.json and self.json_paths:
+            self.request.stream = True
+        start_time = timer()
         self.req = self.query()
-        query_time = time.time() - start_time
-        if self.json:
+        query_time = timer() - start_time
+        if self.json and self.json_paths:
+            log.info('stream parsing json response for paths: %s', ', '.join(self.json_paths))
+            self.process_json_paths(self.req)
+            # the query only returns the headers when streaming, so include reading the body to be comparable
+            query_time = timer() - start_time
+        elif self.json:
             log.info('parsing json response')
             self.process_json(self.req.content)
         else:
@@ -155,7 +168,7 @@ class RestNagiosPlugin(NagiosPlugin):
         if '|' not in self.msg:
             self.msg += ' |'
         if ' query_time=' not in self.msg:
-            self.msg += ' query_time={0:.4f}s'.format(query_time)
+            self.msg += ' {0}'.format(Perfdata().add('query_time', query_time, 's', precision=4))
 
     def query(self):
         url = '{proto}://{host}:{port}/'.format(proto=self.protocol,
@@ -173,7 +186,16 @@ class RestNagiosPlugin(NagiosPlugin):
         kwargs = {}
         if os.getenv('SSL_NO_VERIFY'):
             kwargs['verify'] = False
-        req = self.request.req(self.request_method, url, auth=auth, headers=self.headers, **kwargs)
+        if self.request.stream:
+            # leave the body unread for process_json_paths() to stream, only reading it for error details
+            req = self.request.send(self.request_method, url, auth=auth, headers=self.headers, **kwargs)
+            try:
+                self.request.check_response_code(req)
+            except Exception:
+                self.request.release(req)
+                raise
+        else:
+            req = self.request.req(self.request_method, url, auth=auth, headers=self.headers, **kwargs)
         return req
 
     #@abstractmethod
@@ -184,9 +206,23 @@ class RestNagiosPlugin(NagiosPlugin):
     def parse_json(self, json_data):
         pass
 
+    def process_json_paths(self, req):
+        try:
+            # decode any gzip / deflate content encoding while streaming
+            req.raw.decode_content = True
+            self.json_data = json_extract_paths(req.raw, self.json_paths)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug('JSON paths extracted:\n\n%s\n%s', jsonpp(self.json_data), '='*80)
+            return self.parse_json(self.json_data)
+        # IndexError for paths not found as their value lists are empty
+        except (IndexError, KeyError, ValueError):
+            raise UnknownError('{0}. {1}'.format(self.exception_msg(), support_msg_api()))
+        finally:
+            self.request.release(req)
+
     def process_json(self, content):
         try:
-            self.json_data = json.loads(content)
+            self.json_data = json_loads(content)
             if log.isEnabledFor(logging.DEBUG):
                 log.debug('JSON prettified:\n\n%s\n%s', jsonpp(self.json_data), '='*80)
             return self.parse_json(self.json_data)
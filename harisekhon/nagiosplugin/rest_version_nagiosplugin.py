@@ -28,7 +28,6 @@ from __future__ import print_function
 import os
 import re
 import sys
-import time
 import traceback
 # Python 2.6+ only
 from abc import ABCMeta #, abstractmethod
@@ -40,12 +39,14 @@ try:
     from harisekhon.utils import log, qquit, support_msg_api, isList, CodingError
     from harisekhon.utils import validate_regex, isVersion, isVersionLax
     from harisekhon.nagiosplugin import RestNagiosPlugin
+    from harisekhon.nagiosplugin.perfdata import Perfdata
+    from harisekhon.nagiosplugin.latency import timer
 except ImportError as _:
     print(traceback.format_exc(), end='')
     sys.exit(4)
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.5.1'
+__version__ = '0.7.0'
 
 
 class RestVersionNagiosPlugin(RestNagiosPlugin):
@@ -83,9 +84,9 @@ class RestVersionNagiosPlugin(RestNagiosPlugin):
             log.info('expected version regex: %s', self.expected)
 
     def run(self):
-        start_time = time.time()
+        start_time = timer()
         version = self.get_version()
-        query_time = time.time() - start_time
+        query_time = timer() - start_time
         log.info("got version '%s'", version)
         self.check_version(version)
         extra_info = self.extra_info()
@@ -94,7 +95,7 @@ class RestVersionNagiosPlugin(RestNagiosPlugin):
         if '|' not in self.msg:
             self.msg += ' |'
         if ' query_time=' not in self.msg:
-            self.msg += ' query_time={0:.4f}s'.format(query_time)
+            self.msg += ' {0}'.format(Perfdata().add('query_time', query_time, 's', precision=4))
 
     def check_version(self, version):
         name = self.name
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 03:36:52 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+
+ResultCache - caches check results on local disk for a TTL, shared by all invocations of the same check on the host
+              eg. from several Nagios / Icinga instances, so that they don't each query the service
+
+Each result is a small JSON file named by its key in the cache directory, $HARISEKHON_CACHE_DIR/results or a per user
+directory under the system temp dir. Point $HARISEKHON_CACHE_DIR at /dev/shm to keep it in shared memory
+
+Stale while revalidate - for 'stale' secs after the TTL the stale result continues to be returned while the first
+invocation to find it stale holds a lock file and runs the check to refresh it
+
+Files are written then renamed so readers never see a partial result, and their mtime is set to their expiry so that
+expired results and, beyond max_entries, the soonest to expire are evicted without having to read them
+
+The directory is created private to the user (0700) and the cache is not used if it is owned by another user or is
+group or other writable, so that other local users can't plant results to be returned instead of checking the service
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+#from __future__ import unicode_literals
+
+import errno
+import getpass
+import hashlib
+import json
+import os
+import stat
+import sys
+import tempfile
+import time
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, code_error, isFloat, isInt, ERRORS
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.2'
+
+
+def default_cache_dir():
+    cache_dir = os.getenv('HARISEKHON_CACHE_DIR')
+    if cache_dir:
+        return os.path.join(cache_dir, 'results')
+    return os.path.join(tempfile.gettempdir(), 'harisekhon-results-{0}'.format(getpass.getuser()))
+
+
+class ResultCache(object):
+
+    def __init__(self, ttl, stale=0, cache_dir=None, max_entries=1000, lock_secs=60):
+        for (name, value) in (('ttl', ttl), ('stale', stale), ('lock_secs', lock_secs)):
+            if not isFloat(value) or float(value) < 0:
+                code_error('invalid {0} passed to ResultCache(), must be a number of secs >= 0'.format(name))
+        if not isInt(max_entries) or int(max_entries) < 1:
+            code_error('invalid max_entries passed to ResultCache(), must be an integer >= 1')
+        self.ttl = float(ttl)
+        self.stale = float(stale)
+        self.cache_dir = cache_dir or default_cache_dir()
+        self.max_entries = int(max_entries)
+        # an abandoned refresh lock older than this is taken over, eg. after the refreshing check was killed
+        self.lock_secs = float(lock_secs)
+
+    # returns a key for the check from its identifying parts, eg. the plugin class and its options
+    @staticmethod
+    def make_key(*parts):
+        return hashlib.sha1(json.dumps(parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def __path(self, key, suffix='.json'):
+        return os.path.join(self.cache_dir, key + suffix)
+
+    # returns True if the cache directory is a directory owned by this user which only this user can write to
+    def is_safe(self):
+        try:
+            dir_stat = os.lstat(self.cache_dir)
+        except (IOError, OSError):
+            return False
+        if not stat.S_ISDIR(dir_stat.st_mode):
+            log.warning("result cache dir '%s' is not a directory, not using the cache", self.cache_dir)
+            return False
+        if hasattr(os, 'getuid') and dir_stat.st_uid != os.getuid():
+            log.warning("result cache dir '%s' is owned by another user, not using the cache", self.cache_dir)
+            return False
+        if dir_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            log.warning("result cache dir '%s' is group or other writable, not using the cache", self.cache_dir)
+            return False
+        return True
+
+    # creates the cache directory if needed, returns False if it isn't safe to use
+    def __make_dir(self):
+        if not os.path.isdir(self.cache_dir):
+            try:
+                os.makedirs(self.cache_dir, 0o700)
+            except (IOError, OSError) as _:
+                if _.errno != errno.EEXIST:
+                    log.debug("failed to create result cache dir '%s': %s", self.cache_dir, _)
+                    return False
+        return self.is_safe()
+
+    # returns (status, msg, age secs) of the cached result or None if there isn't one within the TTL + stale period
+    def get(self, key):
+        if not self.is_safe():
+            return None
+        path = self.__path(key)
+        try:
+            with open(path) as filehandle:
+                entry = json.load(filehandle)
+            (status, msg, timestamp) = (entry['status'], entry['msg'], float(entry['time']))
+        except (IOError, OSError) as _:
+            if _.errno != errno.ENOENT:
+                log.debug("failed to read result cache file '%s': %s", path, _)
+            return None
+        except (ValueError, KeyError, TypeError) as _:
+            log.debug("invalid result cache file '%s': %s", path, _)
+            return None
+        if status not in ERRORS:
+            return None
+        age = time.time() - timestamp
+        if age > self.ttl + self.stale or age < 0:
+            return None
+        return (status, msg, age)
+
+    def is_fresh(self, age):
+        return age <= self.ttl
+
+    def set(self, key, status, msg):
+        if status not in ERRORS:
+            code_error("invalid status '{0}' passed to ResultCache.set()".format(status))
+        if not self.__make_dir():
+            return
+        path = self.__path(key)
+        now = time.time()
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        try:
+            # results may contain details of the service checked, only readable by the user running the checks
+            filehandle = os.fdopen(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w')
+            with filehandle:
+                json.dump({'status': status, 'msg': '' if msg is None else str(msg), 'time': now}, filehandle)
+            expires = now + self.ttl + self.stale
+            os.utime(tmp_path, (expires, expires))
+            os.rename(tmp_path, path)
+        except (IOError, OSError) as _:
+            log.debug("failed to write result cache file '%s': %s", path, _)
+            try:
+                os.remove(tmp_path)
+            except (IOError, OSError):
+                pass
+            return
+        self.evict()
+
+    # takes the refresh lock for the key, returns False if another invocation already holds it
+    def lock(self, key):
+        if not self.__make_dir():
+            # can't coordinate the refresh, so refresh anyway rather than serve stale results indefinitely
+            return True
+        path = self.__path(key, '.lock')
+        for _ in range(2):
+            try:
+                os.close(os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600))
+                return True
+            except (IOError, OSError) as _:
+                if _.errno != errno.EEXIST:
+                    log.debug("failed to create result cache lock file '%s': %s", path, _)
+                    # can't coordinate the refresh, so refresh anyway rather than serve stale results indefinitely
+                    return True
+            try:
+                if time.time() - os.stat(path).st_mtime <= self.lock_secs:
+                    return False
+                log.debug("taking over abandoned result cache lock file '%s'", path)
+                os.remove(path)
+            except (IOError, OSError):
+                pass
+        return False
+
+    def unlock(self, key):
+        try:
+            os.remove(self.__path(key, '.lock'))
+        except (IOError, OSError):
+            pass
+
+    # removes expired results and then the soonest to expire beyond max_entries
+    def evict(self):
+        if not self.is_safe():
+            return
+        now = time.time()
+        entries = []
+        try:
+            filenames = os.listdir(self.cache_dir)
+        except (IOError, OSError):
+            return
+        for filename in filenames:
+            if not filename.endswith('.json'):
+                continue
+            path = os.path.join(self.cache_dir, filename)
+            try:
+                expires = os.stat(path).st_mtime
+                if expires <= now:
+                    os.remove(path)
+                else:
+                    entries.append((expires, path))
+            except (IOError, OSError):
+                pass
+        if len(entries) > self.max_entries:
+            entries.sort()
+            for (_, path) in entries[:len(entries) - self.max_entries]:
+                try:
+                    os.remove(path)
+                except (IOError, OSError):
+                    pass
@@ -20,10 +20,10 @@ import sys
 libdir = os.path.join(os.path.dirname(__file__), '..', '..')
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
-from harisekhon.utils import InvalidOptionException, CodingError, isBool, isInt, isFloat, log
+from harisekhon.utils import InvalidOptionException, CodingError, isBool, isInt, log
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.2.1'
+__version__ = '0.3.0'
 
 class InvalidThresholdException(InvalidOptionException):
     pass
@@ -60,7 +60,9 @@ class Threshold(object):
         if not isBool(self.opts['integer']):
             raise CodingError('integer option must be set to either True or False')
 
+        self.compiled = None
         self.__parse_threshold__(arg, kwargs.get('optional'))
+        self.compile()
 
     def __parse_threshold__(self, arg, optional=False):
         if arg is None:
@@ -126,22 +128,17 @@ class Threshold(object):
                 raise InvalidThresholdException('{0}{1} threshold cannot be greater than than maximum {2}'
                                                 .format(self.name, boundary, self.thresholds['max']))
 
+    # snapshots the parsed boundaries in to a CompiledThreshold for check() and check_many(),
+    # call again if changing self.thresholds or self.opts after instantiation
+    def compile(self):
+        self.compiled = CompiledThreshold(self.thresholds['lower'], self.thresholds['upper'], self.opts['invert'])
+        return self.compiled
+
     def check(self, result):
-        if self.thresholds['upper'] is None and self.thresholds['lower'] is None:
-            return ''
-        if not isFloat(result):
-            return '(not a float!)'
-        result = float(result)
-        if self.opts['invert']:
-            if self.thresholds['lower'] is not None and self.thresholds['upper'] is not None and \
-               result >= self.thresholds['lower'] and result <= self.thresholds['upper']:
-                return '({0:g} <= {1:g} <= {2:g})'.format(self.thresholds['lower'], result, self.thresholds['upper'])
-        else:
-            if self.thresholds['lower'] is not None and result < self.thresholds['lower']:
-                return '({0:g} < {1:g})'.format(result, self.thresholds['lower'])
-            if self.thresholds['upper'] is not None and result > self.thresholds['upper']:
-                return '({0:g} > {1:g})'.format(result, self.thresholds['upper'])
-        return ''
+        return self.compiled.check(result)
+
+    def check_many(self, results):
+        return self.compiled.check_many(results)
 
     def get_upper(self):
         return self.thresholds['upper']
@@ -153,3 +150,114 @@ class Threshold(object):
         if self.opts['simple'] == 'lower':
             return self.get_lower()
         return self.get_upper()
+
+
+class CompiledThreshold(object):
+    """
+    Slot based snapshot of a Threshold's boundaries for checking many results quickly
+    """
+
+    __slots__ = ('lower', 'upper', 'invert', 'active')
+
+    def __init__(self, lower=None, upper=None, invert=False):
+        self.lower = None if lower is None else float(lower)
+        self.upper = None if upper is None else float(upper)
+        self.invert = bool(invert)
+        self.active = self.lower is not None or self.upper is not None
+
+    # returns whether a float result is outside the threshold, same as check() but without the message
+    def breached(self, result):
+        if not self.active:
+            return False
+        # negatives and NaN are not valid results, same as isFloat()
+        if not result >= 0:
+            return True
+        if self.invert:
+            # inverted ranges only breach with both boundaries
+            return self.lower is not None and self.upper is not None and self.lower <= result <= self.upper
+        if self.lower is not None and result < self.lower:
+            return True
+        if self.upper is not None and result > self.upper:
+            return True
+        return False
+
+    # returns a message describing the breach, or a blank string if the result is within the threshold
+    def check(self, result):
+        if not self.active:
+            return ''
+        try:
+            result = float(result)
+        except (TypeError, ValueError):
+            return '(not a float!)'
+        if not self.breached(result):
+            return ''
+        if not result >= 0:
+            return '(not a float!)'
+        if self.invert:
+            return '({0:g} <= {1:g} <= {2:g})'.format(self.lower, result, self.upper)
+        if self.lower is not None and result < self.lower:
+            return '({0:g} < {1:g})'.format(result, self.lower)
+        return '({0:g} > {1:g})'.format(result, self.upper)
+
+    # returns the list of indexes of the results which breach the threshold, including non-floats as check() does
+    #
+    # uses NumPy if available for larger numbers of results
+    def check_many(self, results):
+        if not self.active:
+            return []
+        if not isinstance(results, (list, tuple)):
+            results = list(results)
+        if len(results) >= NUMPY_MIN_RESULTS:
+            numpy = _get_numpy()
+            if numpy is not None:
+                try:
+                    values = numpy.asarray(results, dtype=float)
+                except (TypeError, ValueError):
+                    # non-numeric results, fall through to check each one individually
+                    pass
+                else:
+                    if values.ndim == 1:
+                        return self.__check_many_numpy(numpy, values)
+        breached = self.breached
+        indexes = []
+        for (index, result) in enumerate(results):
+            try:
+                result = float(result)
+            except (TypeError, ValueError):
+                indexes.append(index)
+                continue
+            if breached(result):
+                indexes.append(index)
+        return indexes
+
+    def __check_many_numpy(self, numpy, values):
+        with numpy.errstate(invalid='ignore'):
+            # negatives and NaN
+            breaches = ~(values >= 0)
+            if self.invert:
+                if self.lower is not None and self.upper is not None:
+                    breaches |= (values >= self.lower) & (values <= self.upper)
+            else:
+                if self.lower is not None:
+                    breaches |= values < self.lower
+                if self.upper is not None:
+                    breaches |= values > self.upper
+        return numpy.flatnonzero(breaches).tolist()
+
+
+# below this the per-result loop is as quick as converting to a NumPy array
+NUMPY_MIN_RESULTS = 100
+
+_numpy = []
+
+
+# NumPy is optional and takes a while to import so is only imported the first time it would be used
+def _get_numpy():
+    if not _numpy:
+        try:
+            import numpy  # pylint: disable=import-error
+        except ImportError:
+            numpy = None
+        log.debug('numpy available for threshold check_many(): %s', numpy is not None)
+        _numpy.append(numpy)
+    return _numpy[0]
@@ -44,7 +44,7 @@ except ImportError as _:
     sys.exit(4)
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.2.4'
+__version__ = '0.3.0'
 
 
 class VersionNagiosPlugin(NagiosPlugin):
@@ -65,6 +65,8 @@ class VersionNagiosPlugin(NagiosPlugin):
         self.port = None
         self.expected = None
         self.msg = 'version unknown - no message defined'
+        # exposes --cache-ttl to optionally share results between invocations, see NagiosPlugin
+        self.result_cache_ttl_default = 0
         self.ok()
 
     def add_options(self):
@@ -18,6 +18,14 @@
 Request BeautifulSoup Handler Class - Designed to contain various override-able and extendable tests
                                       for handling 'requests' module error handling HTTP scenarios
 
+Set parse_only in a subclass to a SoupStrainer or tag name(s) to only build the tree of those elements, eg.
+parse_only = ('th', 'td') for the status table lookups of the uptime / version, instead of the whole page, which is
+much faster and smaller on large status pages such as the HDFS NameNode or Spark UI. Matched elements keep their
+descendants and become siblings in document order, so th.find_next_sibling() still finds the td value
+
+Uses the lxml parser if installed as it is several times faster than the default html.parser, set parser in a subclass
+to pin a specific parser
+
 """
 
 from __future__ import absolute_import
@@ -32,7 +40,7 @@ import traceback
 # Python 2.6+ only
 from abc import ABCMeta, abstractmethod
 try:
-    from bs4 import BeautifulSoup
+    from bs4 import BeautifulSoup, SoupStrainer
     # import requests
 except ImportError:
     print(traceback.format_exc(), end='')
@@ -41,14 +49,29 @@ libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'pylib'))
 sys.path.append(libdir)
 try:
     # pylint: disable=wrong-import-position
-    from harisekhon.utils import log
+    from harisekhon.utils import log, isStr, CodingError
     from harisekhon import RequestHandler
 except ImportError as _:
     print(traceback.format_exc(), end='')
     sys.exit(4)
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.1'
+__version__ = '0.2'
+
+_bs4_parser = None
+
+
+# lxml if installed, otherwise the Python standard library's html.parser
+def get_bs4_parser():
+    global _bs4_parser  # pylint: disable=global-statement
+    if _bs4_parser is None:
+        try:
+            import lxml  # pylint: disable=unused-variable
+            _bs4_parser = 'lxml'
+        except ImportError:
+            _bs4_parser = 'html.parser'
+        log.debug('using BeautifulSoup parser %s', _bs4_parser)
+    return _bs4_parser
 
 
 class RequestBS4Handler(RequestHandler):
@@ -56,6 +79,11 @@ class RequestBS4Handler(RequestHandler):
     # abstract class
     __metaclass__ = ABCMeta
 
+    # BeautifulSoup parser, None for the fastest installed
+    parser = None
+    # SoupStrainer, tag name or tuple of tag names to only parse those elements, None parses the whole document
+    parse_only = None
+
 #     def __init__(self):
 #         Python 2.x
 #        super(RequestHandler, self).__init__()
@@ -64,10 +92,22 @@ class RequestBS4Handler(RequestHandler):
 #         pass
 
     def __parse__(self, req):
-        soup = BeautifulSoup(req.content, 'html.parser')
+        soup = BeautifulSoup(req.content, self.parser or get_bs4_parser(), parse_only=self.get_parse_only())
         self.soup_print(soup)
         return self.parse(soup)
 
+    def get_parse_only(self):
+        parse_only = self.parse_only
+        if parse_only is None or isinstance(parse_only, SoupStrainer):
+            return parse_only
+        if isStr(parse_only):
+            parse_only = [parse_only]
+        if not isinstance(parse_only, (list, tuple)) or not parse_only or \
+           [_ for _ in parse_only if not isStr(_)]:
+            raise CodingError('invalid parse_only in {0}, must be a SoupStrainer, tag name or tuple of tag names'
+                              .format(type(self).__name__))
+        return SoupStrainer(list(parse_only))
+
     def soup_print(self, soup):  # pylint: disable=no-self-use
         if log.isEnabledFor(logging.DEBUG):
             log.debug("BeautifulSoup prettified:\n%s\n%s", soup.prettify(), '=' * 80)
@@ -25,13 +25,24 @@ from __future__ import division
 from __future__ import print_function
 #from __future__ import unicode_literals
 
+import copy
 import json
-# import logging
+import logging
 import os
 import sys
+import threading
 import traceback
+from collections import OrderedDict
+from multiprocessing.pool import ThreadPool
+try:
+    # Python 3
+    from http.cookiejar import DefaultCookiePolicy
+except ImportError:
+    # Python 2
+    from cookielib import DefaultCookiePolicy
 try:
     import requests
+    from requests.adapters import HTTPAdapter
 except ImportError:
     print(traceback.format_exc(), end='')
     sys.exit(4)
@@ -39,38 +50,114 @@ libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), 'pylib'))
 sys.path.append(libdir)
 try:
     # pylint: disable=wrong-import-position
-    from harisekhon.utils import log, CriticalError, prog, prog_version, code_error
+    from harisekhon.utils import log, CriticalError, get_topfile, get_file_version, code_error, isInt, \
+                                 CodingError
+    from harisekhon.deadline import Deadline, DeadlineExceeded
 except ImportError as _:
     print(traceback.format_exc(), end='')
     sys.exit(4)
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.6.3'
+__version__ = '0.8.1'
 
 
 class RequestHandler(object):
 
-    def __init__(self, req=None):
+    # pooled keep-alive sessions shared across calls and handler instances in this process, keyed by pool settings
+    _sessions = {}
+    _sessions_lock = threading.Lock()
+
+    def __init__(self, req=None, keep_alive=True, pool_connections=10, pool_maxsize=10, max_retries=0, stream=False):
         self.url = None
+        # stream=True defers downloading the body until parse() reads it, so parse() can consume req.iter_content()
+        # or req.raw incrementally instead of holding the whole body in req.content
+        self.stream = bool(stream)
+        # truncate content logged in debug mode to this many bytes, None for no limit
+        self.log_content_max_bytes = 10240
+        # caps request timeouts to the time remaining, defaults to the deadline of the check running in this thread
+        self.deadline = None
+        for (name, value, min_value) in (('pool_connections', pool_connections, 1),
+                                         ('pool_maxsize', pool_maxsize, 1),
+                                         ('max_retries', max_retries, 0)):
+            if not isInt(value) or int(value) < min_value:
+                code_error('invalid {0} passed to RequestHandler, must be an integer >= {1}'.format(name, min_value))
+        # keep_alive=False reverts to a new connection per request via requests.<method>()
+        self.keep_alive = bool(keep_alive)
+        self.pool_connections = int(pool_connections)
+        self.pool_maxsize = int(pool_maxsize)
+        self.max_retries = int(max_retries)
         if req:
             self.process_req(req)
 
+    @classmethod
+    def get_session(cls, pool_connections=10, pool_maxsize=10, max_retries=0):
+        # connection pools must not be shared with forked child processes so key on pid too
+        key = (os.getpid(), int(pool_connections), int(pool_maxsize), int(max_retries))
+        session = cls._sessions.get(key)
+        if session is None:
+            with cls._sessions_lock:
+                session = cls._sessions.get(key)
+                if session is None:
+                    log.debug('creating pooled session: pool_connections=%s, pool_maxsize=%s, max_retries=%s',
+                              *key[1:])
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=key[1], pool_maxsize=key[2], max_retries=key[3])
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    # don't carry cookies between requests so that sharing the session keeps the same semantics as
+                    # the one-shot requests.<method>() calls, eg. between different plugins in the same process
+                    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+                    cls._sessions[key] = session
+        return session
+
+    @classmethod
+    def close_sessions(cls):
+        with cls._sessions_lock:
+            for session in cls._sessions.values():
+                session.close()
+            cls._sessions.clear()
+
+    @property
+    def session(self):
+        if not self.keep_alive:
+            return None
+        return self.get_session(pool_connections=self.pool_connections,
+                                pool_maxsize=self.pool_maxsize,
+                                max_retries=self.max_retries)
+
     def req(self, method, url, *args, **kwargs):
+        req = self.send(method, url, *args, **kwargs)
+        try:
+            self.process_req(req)
+        finally:
+            self.release(req)
+        return req
+
+    def send(self, method, url, *args, **kwargs):
         if '://' not in url:
             url = 'http://' + url
         self.url = url
         log.debug('%s %s', str(method).upper(), url)
         req = None
-        user_agent = 'Hari Sekhon {prog} version {version}'.format(prog=prog, version=prog_version)
+        topfile = get_topfile()
+        user_agent = 'Hari Sekhon {prog} version {version}'.format(prog=os.path.basename(topfile),
+                                                                  version=get_file_version(topfile))
         if 'headers' not in kwargs:
             kwargs['headers'] = {}
         kwargs['headers']['User-Agent'] = user_agent
+        if self.stream:
+            kwargs['stream'] = True
+        deadline = self.deadline or Deadline.current()
+        if deadline is not None and not isinstance(kwargs.get('timeout'), tuple):
+            kwargs['timeout'] = deadline.timeout(kwargs.get('timeout'))
+        session = self.session
         try:
-            req = getattr(requests, method)(url, *args, **kwargs)
+            req = getattr(session if session is not None else requests, method)(url, *args, **kwargs)
         except requests.exceptions.RequestException as _:
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded(deadline.msg)
             self.exception_handler(_)
         self.log_output(req)
-        self.process_req(req)
         return req
 
     def get(self, url, *args, **kwargs):
@@ -88,6 +175,59 @@ class RequestHandler(object):
     def delete(self, url, *args, **kwargs):
         return self.req('delete', url, *args, **kwargs)
 
+    def get_many(self, urls, max_workers=10, timeout=10, **kwargs):
+        # fetches urls concurrently, eg. the same REST endpoint across all the nodes of a cluster, returning a tuple of
+        # (results, errors) OrderedDicts in url order, mapping each url to its parse() result or to the exception
+        # raised for it, instead of raising CriticalError on the first failure
+        if not isInt(max_workers) or int(max_workers) < 1:
+            code_error('invalid max_workers passed to RequestHandler.get_many(), must be an integer >= 1')
+        urls = list(OrderedDict.fromkeys(urls))
+        results = OrderedDict()
+        errors = OrderedDict()
+        if not urls:
+            return (results, errors)
+        max_workers = min(int(max_workers), len(urls))
+        # each worker gets its own copy of this handler as send() and exception_handler() keep state in self.url,
+        # with a connection pool big enough not to discard connections at this concurrency
+        handler = copy.copy(self)
+        handler.pool_maxsize = max(self.pool_maxsize, max_workers)
+        # the pool threads don't inherit this thread's current deadline
+        handler.deadline = self.deadline or Deadline.current()
+
+        def fetch(url):
+            url_handler = copy.copy(handler)
+            url_kwargs = dict(kwargs)
+            url_kwargs['headers'] = dict(kwargs.get('headers') or {})
+            url_kwargs['timeout'] = timeout
+            try:
+                req = url_handler.send('get', url, **url_kwargs)
+                try:
+                    return (url, url_handler.check_response(req), None)
+                finally:
+                    url_handler.release(req)
+            except (CodingError, DeadlineExceeded):
+                raise
+            except Exception as _:  # pylint: disable=broad-except
+                log.debug('%s failed: %s', url, _)
+                return (url, None, _)
+
+        pool = ThreadPool(max_workers)
+        try:
+            for (url, result, error) in pool.map(fetch, urls):
+                if error is None:
+                    results[url] = result
+                else:
+                    errors[url] = error
+        finally:
+            pool.close()
+            pool.join()
+        return (results, errors)
+
+    def release(self, req):
+        # in stream mode returns the connection to the pool if parse() didn't read the whole body
+        if self.stream and req is not None:
+            req.close()
+
     def process_req(self, req):
         self.check_response(req)
         return req
@@ -96,6 +236,7 @@ class RequestHandler(object):
         self.check_response_code(req)
         content = self.__parse__(req)
         self.check_content(content)
+        return content
 
     def exception_handler(self, arg):  # pylint: disable=no-self-use
         if not issubclass(type(arg), Exception):
@@ -118,9 +259,20 @@ class RequestHandler(object):
                                                                   exception=msg,
                                                                   errhint=errhint))
 
-    def log_output(self, req):  # pylint: disable=no-self-use
+    def log_output(self, req):
+        # only touch the body if it'll actually be logged and never download a streamed body just to log it
+        if not log.isEnabledFor(logging.DEBUG):
+            return
         log.debug("response: %s %s", req.status_code, req.reason)
-        log.debug("content:\n%s\n%s\n%s", '=' * 80, req.content.strip(), '=' * 80)
+        if self.stream:
+            log.debug('content: not logged in stream mode')
+            return
+        content = req.content
+        truncated = ''
+        if self.log_content_max_bytes is not None and len(content) > self.log_content_max_bytes:
+            truncated = '\n... (truncated to {0} of {1} bytes)'.format(self.log_content_max_bytes, len(content))
+            content = content[:self.log_content_max_bytes]
+        log.debug("content:\n%s\n%s%s\n%s", '=' * 80, content.strip(), truncated, '=' * 80)
 
     def check_response_code(self, req):  # pylint: disable=no-self-use
         if req.status_code != 200:
@@ -0,0 +1,77 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 22:14:07 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+# =========================================================================== #
+#                           HariSekhon.Result
+# =========================================================================== #
+
+Result of a CLI / NagiosPlugin run returned by CLI.execute() instead of printing and exiting
+
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+# from __future__ import unicode_literals
+
+import os
+import sys
+libdir = os.path.join(os.path.dirname(__file__), '..')
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import ERRORS, CodingError
+
+__author__ = 'Hari Sekhon'
+__version__ = '0.1'
+
+
+class Result(object):
+
+    def __init__(self, status, msg='', start_time=None, run_time=None):
+        if status not in ERRORS:
+            raise CodingError("invalid status '{0}' passed to Result()".format(status))
+        self.status = status
+        self.exit_code = ERRORS[status]
+        # full message as it would be printed, including any perfdata
+        self.output_msg = '' if msg is None else str(msg)
+        (msg, _, perfdata) = self.output_msg.partition('|')
+        self.msg = msg.strip()
+        self.perfdata = perfdata.strip()
+        # epoch secs the run started and how long it took in secs
+        self.start_time = start_time
+        self.run_time = run_time
+
+    @property
+    def output(self):
+        if not self.output_msg:
+            return ''
+        return '{0}: {1}'.format(self.status, self.output_msg)
+
+    def __str__(self):
+        return self.output
+
+    def __repr__(self):
+        return '{0}(status={1!r}, msg={2!r}, perfdata={3!r}, run_time={4!r})'\
+               .format(type(self).__name__, self.status, self.msg, self.perfdata, self.run_time)
+
+    def is_ok(self):
+        return self.status == 'OK'
+
+    # for the thin script entry point, prints and exits the same as qquit() would have done
+    def quit(self):
+        if self.output:
+            print(self.output)
+        sys.exit(self.exit_code)
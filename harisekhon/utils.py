@@ -27,7 +27,10 @@ from __future__ import print_function
 import ast
 import collections
 import glob
+import hashlib
+import importlib
 import inspect
+import io
 # import itertools
 import json
 import os
@@ -40,13 +43,17 @@ import signal
 #import six
 import string
 import sys
+import threading
+import tokenize
 import traceback
 from types import CodeType
+# collections.Iterable moved to collections.abc in Python 3.3 and removed from collections in 3.10
+try:
+    from collections.abc import Iterable
+except ImportError:  # pragma: no cover
+    from collections import Iterable
 import warnings
-import yaml
-# vulnerable to amplification exploit
-#import xml.etree.ElementTree as ET
-import defusedxml.ElementTree as ET
+# yaml and defusedxml.ElementTree are imported on first use via _lazy_module(), see _lazy_modules further down
 # not available Python < 2.7
 # try:
 #     from xml.etree.ElementTree import ParseError
@@ -56,7 +63,7 @@ import defusedxml.ElementTree as ET
 # from xml.parsers.expat import ExpatError
 
 __author__ = 'Hari Sekhon'
-__version__ = '0.14.0'
+__version__ = '0.14.1'
 
 # Standard Nagios return codes
 ERRORS = {
@@ -72,12 +79,57 @@ sys.path.append(libdir)
 import harisekhon  # pylint: disable=wrong-import-position
 
 
-def get_caller():
-    # return inspect.currentframe().f_back.f_back
-    # try:
-    return inspect.stack()[2][3]
-    # except Exception:
-    #     return '<failed to get caller function>'
+# frame introspection - walks frame.f_back lazily instead of inspect.stack(), which builds a FrameInfo for every frame
+# in the stack and reads their source lines from disk, far too expensive for the error paths this is used on
+try:
+    _getframe = sys._getframe  # pylint: disable=protected-access
+except AttributeError:  # pragma: no cover
+    # Python implementations without sys._getframe(), +1 for this function's own frame
+    def _getframe(depth=0):
+        frame = inspect.currentframe()
+        if frame is None:
+            raise ValueError('call stack is not available')
+        for _ in range(depth + 1):
+            frame = frame.f_back
+            if frame is None:
+                raise ValueError('call stack is not deep enough')
+        return frame
+
+
+def get_frame(depth=0):
+    """ Returns the frame depth levels above the caller, 0 being the caller's own frame, or None if not that deep """
+    try:
+        return _getframe(depth + 1)
+    except ValueError:
+        return None
+
+
+def iter_frames(depth=0):
+    """ Yields frames outwards starting from depth levels above the caller, 0 being the caller's own frame """
+    # starting frame found here rather than in the generator, which runs in the frame of whoever iterates it
+    return _walk_frames(get_frame(depth + 1))
+
+
+def _walk_frames(frame):
+    while frame is not None:
+        yield frame
+        frame = frame.f_back
+
+
+def get_bottom_frame():
+    """ Returns the outermost frame of the call stack, ie. the top level script or module being run """
+    frame = _getframe(1)
+    while frame.f_back is not None:
+        frame = frame.f_back
+    return frame
+
+
+def get_caller(depth=1):
+    """ Returns the name of the function that called the function calling get_caller(), or further up by depth """
+    frame = get_frame(depth + 1)
+    if frame is None:
+        return None
+    return frame.f_code.co_name
 
 # using get_topfile further down instead now
 # prog = os.path.basename(inspect.getfile(inspect.currentframe().f_back))
@@ -203,6 +255,8 @@ def qquit(status, msg=''):
         log.warning("invalid status '%s' passed to qquit() by caller '%s', defaulting to critical\n%s",
                     status, get_caller(), traceback.format_exc())
         status = 'CRITICAL'
+    if is_result_mode():
+        raise QuitException(status, msg)
     # log.error('%s: %s', status, msg)
     if msg:
         print('{0}: {1}'.format(status, msg))
@@ -215,6 +269,19 @@ def qquit(status, msg=''):
     sys.exit(ERRORS[status])
 
 
+# result mode makes qquit() raise QuitException instead of printing and exiting, so that CLI.execute() can return the
+# status and message as a Result - thread local so that checks running in other threads are unaffected
+_result_mode = threading.local()
+
+
+def set_result_mode(enabled=True):
+    _result_mode.enabled = bool(enabled)
+
+
+def is_result_mode():
+    return getattr(_result_mode, 'enabled', False)
+
+
 # use CLI's self.usage() mostly instead which doesn't require passing in the parser
 # and also gets the file docstring at the top of the stack, as well as the version
 def usage(parser, msg='', status='UNKNOWN'):
@@ -230,12 +297,33 @@ def usage(parser, msg='', status='UNKNOWN'):
     qquit(status)
 
 
+# the top level script doesn't change within a process so cache it for every CLI instantiation
+_topfile = None
+
+
+# overrides the topfile in this thread, for running a plugin script's check within another program such as the check
+# daemon so that its usage, --version and User-Agent describe the plugin script rather than the program running it
+_topfile_override = threading.local()
+
+
+def set_topfile(filename):
+    _topfile_override.filename = filename
+
+
 def get_topfile():
+    global _topfile  # pylint: disable=global-statement
+    filename = getattr(_topfile_override, 'filename', None)
+    if filename is not None:
+        return filename
+    if _topfile is None:
+        _topfile = _find_topfile()
+    return _topfile
+
+
+def _find_topfile():
     # this gets 'python -m unittest' as filename
     # filename = sys.argv[0]
-    frame = inspect.stack()[-1][0]
-    # filename = inspect.stack()[-1][1]
-    filename = inspect.getfile(frame)
+    filename = get_bottom_frame().f_code.co_filename
     # filename = os.path.splitext(filename)[0] + '.py'
     filename = re.sub(r'\.py[co]$', '.py', filename)
     if not isStr(filename):
@@ -255,24 +343,161 @@ def get_topfile():
     return filename
 
 
-def get_file_docstring(filename):
+# filename => ((mtime, size), metadata)
+_file_metadata = {}
+
+_version_assignment_regex = re.compile(r'''^__version__\s*=\s*[uU]?(['"])([^'"\\\r\n]*)\1\s*(?:#.*)?$''', re.M)
+
+
+def get_file_metadata(filename):
+    """
+    Returns a dict of the docstring, version and github_repo of a script from a single read of the file,
+    cached in memory and optionally on disk under $HARISEKHON_CACHE_DIR, invalidated by the file's mtime and size
+    """
     if not isStr(filename):
-        code_error('invalid non-string filename {} passed to get_file_docstring()'.format(filename))
+        code_error('non-string filename {} passed to get_file_metadata()'.format(filename))
     if not isFilename(filename):
-        code_error('invalid filename {} passed to get_file_docstring()'.format(filename))
+        code_error('invalid filename {} passed to get_file_metadata()'.format(filename))
     # .pyc files cause the following error:
     # TypeError: compile() expected string without null bytes
     filename = re.sub('.pyc$', '.py', filename)
-    file_contents = open(filename).read()
+    stat = os.stat(filename)
+    key = (stat.st_mtime, stat.st_size)
+    cached = _file_metadata.get(filename)
+    if cached is None or cached[0] != key:
+        metadata = _read_file_metadata_cache(filename, key)
+        if metadata is None:
+            with open(filename) as filehandle:
+                metadata = _scan_file_metadata(filename, filehandle.read())
+            _write_file_metadata_cache(filename, key, metadata)
+        cached = (key, metadata)
+        _file_metadata[filename] = cached
+    return dict(cached[1])
+
+
+def _scan_file_metadata(filename, content):
+    metadata = {'docstring': None, 'version': None, 'github_repo': ''}
+    index = content.find('https://github.com/HariSekhon')
+    if index != -1:
+        line = content[content.rfind('\n', 0, index) + 1:].split('\n', 1)[0]
+        metadata['github_repo'] = line.lstrip('#').strip()
     # binary, maybe started with python command
-    if '\0' in file_contents:
-        #file_contents = ''
-        return ''
+    if '\0' in content:
+        metadata['docstring'] = ''
+        return metadata
+    # only tokenizes up to the first statement and regex matches the version, falling back to a full parse of the
+    # file for anything unusual that these cheap scans can't be sure of
+    tree = None
     try:
-        _ = ast.parse(file_contents, filename=filename, mode='exec')
-    except TypeError:
-        return ''
-    return ast.get_docstring(_)
+        metadata['docstring'] = _scan_docstring(content)
+    except ValueError:
+        tree = ast.parse(content, filename=filename, mode='exec')
+        metadata['docstring'] = ast.get_docstring(tree)
+    if re.search(r'\.py$', filename):
+        match = _version_assignment_regex.search(content)
+        if match:
+            metadata['version'] = match.group(2)
+        elif '__version__' in content:
+            if tree is None:
+                tree = ast.parse(content, filename=filename, mode='exec')
+            metadata['version'] = _ast_version(tree)
+    return metadata
+
+
+# raises ValueError if the docstring can't be determined without parsing the whole file
+def _scan_docstring(content):
+    lines = iter(content.splitlines(True))
+    strings = []
+    try:
+        for token in tokenize.generate_tokens(lambda: next(lines, '')):
+            (token_type, token_string) = (token[0], token[1])
+            if token_type in (tokenize.COMMENT, tokenize.NL) or \
+               (token_type == tokenize.NEWLINE and not strings):
+                continue
+            elif token_type == tokenize.STRING:
+                strings.append(token_string)
+            elif not strings:
+                # first statement isn't a string so there is no docstring, unless it's a parenthesized string
+                if token_type == tokenize.OP and token_string == '(':
+                    raise ValueError('parenthesized first statement')
+                return None
+            elif token_type in (tokenize.NEWLINE, tokenize.ENDMARKER) or \
+                 (token_type == tokenize.OP and token_string == ';'):
+                break
+            else:
+                raise ValueError('first statement is an expression using a string')
+    except (tokenize.TokenError, SyntaxError) as _:
+        raise ValueError(_)
+    if not strings:
+        return None
+    try:
+        docstring = ast.literal_eval(' '.join(strings))
+    except SyntaxError as _:
+        # f-strings aren't literals
+        raise ValueError(_)
+    if not isStr(docstring):
+        return None
+    return inspect.cleandoc(docstring)
+
+
+def _ast_version(tree):
+    # print(ast.dump(tree))
+    # print(dir(tree._fields))
+    for node in (n for n in tree.body if isinstance(n, ast.Assign)):
+        if len(node.targets) == 1:
+            name = node.targets[0]
+            if isinstance(name, ast.Name) and name.id == '__version__':
+                _ = node.value
+                if isinstance(_, ast.Str):
+                    return _.s
+    return None
+
+
+def _file_metadata_cache_path(filename):
+    cache_dir = os.getenv('HARISEKHON_CACHE_DIR')
+    if not cache_dir:
+        return None
+    filename = os.path.realpath(filename)
+    return os.path.join(cache_dir, 'metadata-' + hashlib.sha1(filename.encode('utf-8')).hexdigest() + '.json')
+
+
+def _read_file_metadata_cache(filename, key):
+    path = _file_metadata_cache_path(filename)
+    if path is None or not os.path.isfile(path):
+        return None
+    try:
+        with open(path) as filehandle:
+            cache = json.load(filehandle)
+    except (IOError, OSError, ValueError) as _:
+        log.debug("failed to read metadata cache file '%s': %s", path, _)
+        return None
+    if cache.get('file') != os.path.realpath(filename) or cache.get('key') != list(key):
+        return None
+    return cache.get('metadata')
+
+
+def _write_file_metadata_cache(filename, key, metadata):
+    path = _file_metadata_cache_path(filename)
+    if path is None:
+        return
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        # write and rename so that concurrently starting programs never read a partial cache file
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'w') as filehandle:
+            json.dump({'file': os.path.realpath(filename), 'key': list(key), 'metadata': metadata}, filehandle)
+        os.rename(tmp_path, path)
+    except (IOError, OSError) as _:
+        log.debug("failed to write metadata cache file '%s': %s", path, _)
+
+
+def get_file_docstring(filename):
+    if not isStr(filename):
+        code_error('invalid non-string filename {} passed to get_file_docstring()'.format(filename))
+    if not isFilename(filename):
+        code_error('invalid filename {} passed to get_file_docstring()'.format(filename))
+    return get_file_metadata(filename)['docstring']
     # inspect.getdoc is another option but looks like it'll only get docstring of object, we want file/module
 ###### old way #####
 #    # returns a code object
@@ -295,21 +520,7 @@ def get_file_version(filename):
         code_error('non-string filename {} passed tp get_file_version()'.format(filename))
     if not isFilename(filename):
         code_error('invalid filename {} passed to get_file_version()'.format(filename))
-    # .pyc files cause the following error:
-    # TypeError: compile() expected string without null bytes
-    filename = re.sub('.pyc$', '.py', filename)
-    if re.search(r'\.py$', filename):
-        tree = ast.parse(open(filename).read(), filename=filename, mode='exec')
-        # print(ast.dump(tree))
-        # print(dir(tree._fields))
-        for node in (n for n in tree.body if isinstance(n, ast.Assign)):
-            if len(node.targets) == 1:
-                name = node.targets[0]
-                if isinstance(name, ast.Name) and name.id == '__version__':
-                    _ = node.value
-                    if isinstance(_, ast.Str):
-                        return _.s
-    return None
+    return get_file_metadata(filename)['version']
 
 
 def get_file_github_repo(filename):
@@ -317,16 +528,7 @@ def get_file_github_repo(filename):
         code_error('non-string filename {} passed to get_file_github_repo()'.format(filename))
     if not isFilename(filename):
         code_error('invalid filename {} passed to get_file_github_repo()'.format(filename))
-    # .pyc files cause the following error:
-    # TypeError: compile() expected string without null bytes
-    filename = re.sub('.pyc$', '.py', filename)
-    _ = open(filename)
-    for line in _:
-        if 'https://github.com/HariSekhon' in line:
-            _.close()
-            return line.lstrip('#').strip()
-    _.close()
-    return ''
+    return get_file_metadata(filename)['github_repo']
 
 
 def gen_prefixes(prefixes, names, sort_by_names=False):
@@ -496,6 +698,16 @@ class InvalidOptionException(AssertionError):
     pass
 
 
+# raised by qquit() in result mode, subclasses SystemExit with the Nagios exit code
+# so that it still exits correctly if uncaught
+class QuitException(SystemExit):
+
+    def __init__(self, status, msg=''):
+        super(QuitException, self).__init__(ERRORS[status])
+        self.status = status
+        self.msg = '' if msg is None else str(msg)
+
+
 class FileNotExecutableException(IOError):
     pass
 
@@ -643,17 +855,169 @@ def read_file_without_comments(filename):
     return [x.rstrip("\n").split("#")[0].strip() for x in open(filename).readlines()]
 
 
+# JSON decoding backend used by json_loads() and so isJson(), jsonpp() and RestNagiosPlugin.process_json()
+#
+# Uses the first installed of these faster libraries, falling back to the standard json module. Encoding is left to
+# the json module as orjson can't reproduce jsonpp()'s exact 4 space indented, ASCII escaped output
+_json_backends = ('orjson', 'json')
+_json_backend = None
+# orjson silently parses integers outside of 64 bits as floats, from 19 digits for those below -2**63, so content with
+# runs of 19+ digits uses the json module
+_json_long_int = re.compile(r'\d{19,}').search
+_json_long_int_bytes = re.compile(br'\d{19,}').search
+
+
+def get_json_backend():
+    global _json_backend
+    if _json_backend is None:
+        for name in _json_backends:
+            try:
+                _json_backend = __import__(name)
+                break
+            except ImportError:
+                pass
+        log.debug('using json backend: %s', _json_backend.__name__)
+    return _json_backend.__name__
+
+
+def set_json_backend(name):
+    global _json_backend
+    if name not in _json_backends:
+        code_error("invalid json backend '{0}' passed to set_json_backend(), must be one of: {1}"\
+                   .format(name, ', '.join(_json_backends)))
+    try:
+        _json_backend = __import__(name)
+    except ImportError:
+        code_error("json backend '{0}' passed to set_json_backend() is not installed".format(name))
+
+
+def json_loads(content):
+    if _json_backend is None:
+        get_json_backend()
+    if _json_backend is not json:
+        if (_json_long_int_bytes if isinstance(content, bytes) else _json_long_int)(content) is None:
+            try:
+                return _json_backend.loads(content)
+            except ValueError:
+                # invalid json or the json module's NaN / Infinity extensions, leave it to the json module to decide
+                pass
+    return json.loads(content)
+
+
 def jsonpp(json_data):
-    if isStr(json_data):
-        if isPythonMinVersion(3.9):
-            json_data = json.loads(json_data)
-        else:
-            # encoding parameter was removed in Python 3.9, more version specific code :-(
-            json_data = json.loads(json_data, encoding='utf-8')
+    if isStr(json_data) or isinstance(json_data, bytes):
+        json_data = json_loads(json_data)
     # default=str converts otherwise unconvertible types like datetime objects to be dumpable to strings
     return json.dumps(json_data, sort_keys=True, indent=4, separators=(',', ': '), default=str)
 
 
+# Extracts only the values at the given paths from a JSON string or file-like stream, eg. requests response.raw, for
+# large API responses such as Ambari, Cloudera Manager or Elasticsearch _nodes/stats where only a few fields are needed
+#
+# Uses the incremental ijson parser when available to avoid materializing the body or building the full object tree,
+# falling back to the json module
+#
+# Paths use ijson prefix syntax - dot separated keys with 'item' for array elements - plus '*' to match any key of an
+# object eg. 'nodes.*.jvm.mem.heap_used_percent' or 'items.item.Hosts.host_name'. An empty path is the root
+#
+# Paths sharing the same prefix up to their first wildcard, eg. all under 'nodes.*', are extracted in a single fast
+# pass - each further distinct prefix costs another, much slower, incremental parse of the stream
+#
+# Returns an OrderedDict of path => list of values at that path in document order, an empty list if not found
+#
+# Raises ValueError for invalid JSON
+def json_extract_paths(content, paths, chunk_size=65536):
+    if isStr(paths) or not isIterable(paths):
+        code_error('non-list paths passed to json_extract_paths()')
+    paths = list(paths)
+    if not paths:
+        code_error('no paths passed to json_extract_paths()')
+    for path in paths:
+        if not isStr(path):
+            code_error("non-string path '{0}' passed to json_extract_paths()".format(path))
+    results = collections.OrderedDict([(path, []) for path in paths])
+    try:
+        import ijson
+    except ImportError:
+        ijson = None
+    if ijson is None:
+        if not isStr(content) and not isinstance(content, bytes):
+            content = content.read()
+        json_data = json_loads(content)
+        for path in results:
+            _json_path_walk(json_data, path.split('.') if path else [], results[path])
+        return results
+    # ijson only matches exact prefixes so paths are grouped by the prefix up to their first wildcard, parsed out one
+    # object at a time by ijson, and the rest of the path walked in that small object
+    groups = collections.OrderedDict()
+    for path in results:
+        parts = path.split('.') if path else []
+        if '*' in parts:
+            index = parts.index('*')
+            groups.setdefault(('.'.join(parts[:index]), True), []).append((path, parts[index + 1:]))
+        else:
+            groups.setdefault((path, False), []).append((path, []))
+
+    def collect(items, wildcard, group):
+        for item in items:
+            if wildcard:
+                item = item[1]
+            for (path, rest) in group:
+                _json_path_walk(item, rest, results[path])
+
+    if isStr(content):
+        content = content.encode('utf-8')
+    if isinstance(content, bytes):
+        content = io.BytesIO(content)
+    try:
+        if len(groups) == 1:
+            # single pass with the much faster generator interface
+            ((prefix, wildcard), group) = list(groups.items())[0]
+            func = ijson.kvitems if wildcard else ijson.items
+            collect(func(content, prefix, use_float=True, buf_size=chunk_size), wildcard, group)
+            return results
+        # otherwise feed the stream to one parser coroutine per prefix as it's read, each is an extra parse
+        parsers = []
+        for ((prefix, wildcard), group) in groups.items():
+            items = ijson.sendable_list()
+            func = ijson.kvitems_coro if wildcard else ijson.items_coro
+            parsers.append((func(items, prefix, use_float=True), items, wildcard, group))
+        while True:
+            chunk = content.read(chunk_size)
+            if not chunk:
+                break
+            for (coro, items, wildcard, group) in parsers:
+                coro.send(chunk)
+                collect(items, wildcard, group)
+                del items[:]
+        for (coro, items, wildcard, group) in parsers:
+            coro.close()
+            collect(items, wildcard, group)
+    except ijson.JSONError as _:
+        raise ValueError('invalid json: {0}'.format(_))
+    return results
+
+
+def _json_path_walk(json_data, parts, values):
+    if not parts:
+        values.append(json_data)
+        return
+    part = parts[0]
+    if isinstance(json_data, dict):
+        if part == '*':
+            children = json_data.values()
+        elif part in json_data:
+            children = [json_data[part]]
+        else:
+            return
+    elif isinstance(json_data, list) and part == 'item':
+        children = json_data
+    else:
+        return
+    for child in children:
+        _json_path_walk(child, parts[1:], values)
+
+
 def list_sort_dicts_by_value(my_list, key):
     if not isList(my_list):
         raise InvalidArgumentException('non-list passed as first arg to list_sort_dicts_by_key()')
@@ -686,7 +1050,13 @@ def list_sort_dicts_by_value(my_list, key):
 # (eg .local/.intranet) but still keep things qquite tight
 # There are certain scenarios where other generic libraries don't help with these
 
+# The TLD list and every regex built on top of it are loaded lazily on first use instead of at import time
+# since most programs never validate a domain and shouldn't pay to read the TLD files and build the huge TLD
+# alternation on every start - see _get_tlds(), _get_tld_regexes() and __getattr__() further down
 _tlds = set()
+_tlds_loaded = False
+_tld_regexes = {}
+_tld_lock = threading.RLock()
 
 def _load_tlds(filename):
     _ = open(filename)
@@ -707,56 +1077,50 @@ def _load_tlds(filename):
     log.debug("loaded %s TLDs from file '%s'", tld_count, filename)
 
 _tld_file = libdir + '/resources/tlds-alpha-by-domain.txt'
-_load_tlds(_tld_file)
+_custom_tlds = libdir + '/resources/custom_tlds.txt'
 
-def _check_tldcount():
-    log.debug('%s total unique TLDs loaded', len(_tlds))
+def _check_tldcount(tlds=None):
+    if tlds is None:
+        tlds = _get_tlds()
+    log.debug('%s total unique TLDs loaded', len(tlds))
     # must be at least this many if the IANA set loaded properly
-    if len(_tlds) < 1000:
-        code_error('%s tlds loaded, expected >= 1000' % len(_tlds))
+    if len(tlds) < 1000:
+        code_error('%s tlds loaded, expected >= 1000' % len(tlds))
     # make sure we don't double load TLD list
-    if len(_tlds) > 2000:
-        code_error('%s tlds loaded, expected <= 2000' % len(_tlds))
-
-_check_tldcount()
-
-_custom_tlds = libdir + '/resources/custom_tlds.txt'
-if os.path.isfile(_custom_tlds):
-    _load_tlds(_custom_tlds)
-
-tld_regex = r'\b(?:' + '|'.join(_tlds) + r')\b'
+    if len(tlds) > 2000:
+        code_error('%s tlds loaded, expected <= 2000' % len(tlds))
+
+def _get_tlds():
+    global _tlds_loaded  # pylint: disable=global-statement
+    if not _tlds_loaded:
+        with _tld_lock:
+            if not _tlds_loaded:
+                _load_tlds(_tld_file)
+                _check_tldcount(_tlds)
+                if os.path.isfile(_custom_tlds):
+                    _load_tlds(_custom_tlds)
+                _tlds_loaded = True
+    return _tlds
 
 # pylint: disable=bad-whitespace
 domain_component_regex = r'\b[a-zA-Z0-9](?:[a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])?\b'
 # AWS regex from http://blogs.aws.amazon.com/security/blog/tag/key+rotation
 aws_access_key_regex   = r'(?<![A-Z0-9])[A-Z0-9]{20}(?![A-Z0-9])'
 aws_secret_key_regex   = r'(?<![A-Za-z0-9/+=])[A-Za-z0-9/+=]{40}(?![A-Za-z0-9/+=])'
-domain_regex           = r'(?:' + domain_component_regex + r'\.)*' + tld_regex
-domain_regex2          = r'(?:' + domain_component_regex + r'\.)+' + tld_regex
-domain_regex_strict    = domain_regex2
 # must permit numbers as valid host identifiers that are being used in the wild in FQDNs
 hostname_component     = r'\b[A-Za-z0-9](?:[A-Za-z0-9_\-]{0,61}[a-zA-Z0-9])?\b'
 #aws_host_ip_regex     = r'ip-(?:10-\d+-\d+-\d+|172-1[6-9]-\d+-\d+|172-2[0-9]-\d+-\d+|172-3[0-1]-\d+-\d+|192-168-\d+-\d+)'  # pylint: disable=line-too-long
 # the ip- prefix gives it away as an IP so can be a bit more general and let's catch all IPs not just private ranges
 aws_host_ip_regex      = r'\bip-\d+-\d+-\d+-\d+\b'
-hostname_regex         = hostname_component + r'(?:\.' + domain_regex + ')?'
-aws_hostname_regex     = aws_host_ip_regex + r'(?:\.' + domain_regex + ')?'
 dirname_regex          = r'[\/\w\s\\.,:*()=%?+-]+'
 filename_regex         = dirname_regex + r'(?<![\/])'
 rwxt_regex             = r'[r-][w-][x-][r-][w-][x-][r-][w-][xt-]'
-fqdn_regex             = hostname_component + r'\.' + domain_regex
-aws_fqdn_regex         = aws_host_ip_regex + r'\.' + domain_regex
-# SECURITY NOTE: I'm allowing single quote through as it's found in Irish email addresses.
-# This makes the email_regex non-safe without further validation.
-# This regex only tests whether it's a valid email address, nothing more.
-email_regex            = r"\b[A-Za-z0-9](?:[A-Za-z0-9\._\%\'\+-]{0,62}[A-Za-z0-9\._\%\+-])?@" + domain_regex
 # TODO: review this IP regex again
 ip_prefix_regex        = r'\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}'
 # now allowing 0 or 255 as the final octet due to CIDR
 ip_regex               = ip_prefix_regex + r'(?:25[0-5]|2[0-4][0-9]|[01]?[1-9][0-9]|[01]?0[1-9]|[12]00|[0-9])\b'
 subnet_mask_regex      = r'\b(?:(?:25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.){3}(?:25[0-5]|2[0-4][0-9]|[01]?[1-9][0-9]|[01]?0[1-9]|[12]00|[0-9])\b'  # pylint: disable=line-too-long
 mac_regex              = r'\b[0-9A-Fa-f]{1,2}[:-](?:[0-9A-Fa-f]{1,2}[:-]){4}[0-9A-Fa-f]{1,2}\b'
-host_regex             = r'\b(?:' + hostname_regex + '|' + ip_regex + r')\b'
 # I did a scan of registered running process names across several hundred linux servers of a diverse group of
 # enterprise applications with 500 unique process names (58k individual processes) to determine that there are cases
 # with spaces, slashes, dashes, underscores, chevrons (<defunct>), dots (script.p[ly], in.tftpd etc) to determine
@@ -764,11 +1128,13 @@ host_regex             = r'\b(?:' + hostname_regex + '|' + ip_regex + r')\b'
 # This is not from ps -ef etc it is the actual process registered name, hence init not [init] as it appears in ps output
 process_name_regex     = r'\s*[\w_\.\/\<\>-][\w\s_\.\/\<\>-]+'
 url_path_suffix_regex  = r'/(?:[\w.,:\/%&?#!=*|\[\]~+-]+)?'
-url_regex              = r'\bhttps?://' + host_regex + r'(?::\d{1,5})?(?:' + url_path_suffix_regex + ')?'
 user_regex             = r'\b[A-Za-z0-9][A-Za-z0-9\._-]*[A-Za-z0-9]\b'
+# SECURITY NOTE: I'm allowing single quote through as it's found in Irish email addresses.
+# This makes the email_regex non-safe without further validation.
+# This regex only tests whether it's a valid email address, nothing more.
+email_user_regex       = r"\b[A-Za-z0-9](?:[A-Za-z0-9\._\%\'\+-]{0,62}[A-Za-z0-9\._\%\+-])?"
 column_regex           = r'\b[\w\:]+\b'
 ldap_dn_regex          = r'\b\w+=[\w\s-]+(?:,\w+=[\w\s-]+)*\b'
-krb5_principal_regex   = user_regex + r'(?:\/' + hostname_regex + r')?(?:\@' + domain_regex + r')?'
 threshold_range_regex  = r'^(\@)?(-?\d+(?:\.\d+)?)(:)(-?\d+(?:\.\d+)?)?'
 threshold_simple_regex = r'^(-?\d+(?:\.\d+)?)'
 label_regex            = r'\s*[\%\(\)\/\*\w-][\%\(\)\/\*\w\s-]*'
@@ -777,6 +1143,145 @@ version_regex_short    = r'\d+(?:\.\d+)?'
 version_regex_lax      = version_regex + r'-?.+\b'
 # pylint: enable=bad-whitespace
 
+# these are all built on top of the TLD list so are only generated on first use by _get_tld_regexes()
+_tld_regex_names = (
+    'tld_regex',
+    'domain_regex',
+    'domain_regex2',
+    'domain_regex_strict',
+    'hostname_regex',
+    'aws_hostname_regex',
+    'fqdn_regex',
+    'aws_fqdn_regex',
+    'email_regex',
+    'host_regex',
+    'url_regex',
+    'krb5_principal_regex',
+)
+
+def _get_tld_regexes():
+    if not _tld_regexes:
+        with _tld_lock:
+            if not _tld_regexes:
+                # pylint: disable=bad-whitespace
+                tld_regex            = r'\b(?:' + '|'.join(_get_tlds()) + r')\b'
+                domain_regex         = r'(?:' + domain_component_regex + r'\.)*' + tld_regex
+                domain_regex2        = r'(?:' + domain_component_regex + r'\.)+' + tld_regex
+                domain_regex_strict  = domain_regex2
+                hostname_regex       = hostname_component + r'(?:\.' + domain_regex + ')?'
+                aws_hostname_regex   = aws_host_ip_regex + r'(?:\.' + domain_regex + ')?'
+                fqdn_regex           = hostname_component + r'\.' + domain_regex
+                aws_fqdn_regex       = aws_host_ip_regex + r'\.' + domain_regex
+                # SECURITY NOTE: see email_user_regex
+                email_regex          = email_user_regex + '@' + domain_regex
+                host_regex           = r'\b(?:' + hostname_regex + '|' + ip_regex + r')\b'
+                url_regex            = r'\bhttps?://' + host_regex + r'(?::\d{1,5})?(?:' + \
+                                       url_path_suffix_regex + ')?'
+                krb5_principal_regex = user_regex + r'(?:\/' + hostname_regex + r')?(?:\@' + domain_regex + r')?'
+                # pylint: enable=bad-whitespace
+                _ = locals()
+                regexes = dict((name, _[name]) for name in _tld_regex_names)
+                # promote to real module attributes so they're only computed once and 'import *' picks them up
+                globals().update(regexes)
+                _tld_regexes.update(regexes)
+    return _tld_regexes
+
+
+# third party modules only needed by a few functions, imported on first use so that every plugin doesn't pay for them
+_lazy_modules = {
+    'yaml': 'yaml',
+    # vulnerable to amplification exploit
+    #'ET': 'xml.etree.ElementTree',
+    'ET': 'defusedxml.ElementTree',
+}
+
+
+def _lazy_module(name):
+    try:
+        return globals()[name]
+    except KeyError:
+        pass
+    module = importlib.import_module(_lazy_modules[name])
+    # promote to a real module attribute so it's only imported once
+    globals()[name] = module
+    return module
+
+
+# PEP 562 - resolves tld_regex, domain_regex etc. on first access, eg. 'from harisekhon.utils import host_regex',
+# as well as the lazy modules above for code that used harisekhon.utils.yaml or harisekhon.utils.ET
+def __getattr__(name):
+    if name in _tld_regex_names:
+        return _get_tld_regexes()[name]
+    if name in _lazy_modules:
+        return _lazy_module(name)
+    raise AttributeError("module '{0}' has no attribute '{1}'".format(__name__, name))
+
+# Python < 3.7 doesn't support module __getattr__ so fall back to building these at import time
+if sys.version_info < (3, 7):
+    _get_tld_regexes()
+    for _ in _lazy_modules:
+        _lazy_module(_)
+
+# Registry of the named regexes above precompiled and anchored to match the whole string, shared by all the is*()
+# and validate_*() functions instead of each call concatenating '^' + regex + '$' and relying on the re module's
+# cache, from which an eviction would mean recompiling the multi-thousand alternative TLD based regexes
+_anchored_regexes = {}
+
+def _anchored_regex(name):
+    try:
+        return _anchored_regexes[name]
+    except KeyError:
+        pass
+    if name in _tld_regex_names:
+        regex = _get_tld_regexes()[name]
+    else:
+        regex = globals().get(name)
+        if not isinstance(regex, str) or not ('_regex' in name or name.endswith('_component')):
+            code_error("unknown regex name '{0}' passed to _anchored_regex()".format(name))
+    # \Z rather than $ which would also match before a trailing newline, same as fullmatch() in Python 3.4+
+    _ = re.compile('(?:' + regex + r')\Z')
+    _anchored_regexes[name] = _
+    return _
+
+
+# Domain validation engine used by the is*() predicates in place of the TLD regexes above, which backtrack through
+# a huge alternation of every TLD. Splits on dots and checks the last label against a set of the TLDs, each other
+# label against the component regex. Because each label is bounded by dots this gives the same results as the
+# regexes, except TLDs are matched case insensitively as per DNS
+_tld_lookup = frozenset()
+_url_split_regex = re.compile(r'\bhttps?://([^:/]*)(?::\d{1,5})?(?:' + url_path_suffix_regex + r')?\Z')
+
+def _get_tld_lookup():
+    global _tld_lookup  # pylint: disable=global-statement
+    if not _tld_lookup:
+        with _tld_lock:
+            if not _tld_lookup:
+                _tld_lookup = frozenset(tld.lower() for tld in _get_tlds())
+    return _tld_lookup
+
+
+def _is_domain_labels(labels):
+    if labels[-1].lower() not in _get_tld_lookup():
+        return False
+    domain_component = _anchored_regex('domain_component_regex')
+    for label in labels[:-1]:
+        if not domain_component.match(label):
+            return False
+    return True
+
+
+def _is_hostname_labels(labels, host_regex='hostname_component', domain_required=False):
+    if not _anchored_regex(host_regex).match(labels[0]):
+        return False
+    if len(labels) > 1:
+        return _is_domain_labels(labels[1:])
+    return not domain_required
+
+
+def _is_host(arg):
+    return _is_hostname_labels(arg.split('.')) or bool(_anchored_regex('ip_regex').match(arg))
+
+
 ##################
 #
 # see also inspect.isclass(obj)
@@ -798,7 +1303,7 @@ def isAlNum(arg):
 def isAwsAccessKey(arg):
     if arg is None:
         return False
-    if re.match('^' + aws_access_key_regex + '$', str(arg)):
+    if _anchored_regex('aws_access_key_regex').match(str(arg)):
         return True
     return False
 
@@ -806,7 +1311,7 @@ def isAwsAccessKey(arg):
 def isAwsHostname(arg):
     if arg is None:
         return False
-    if re.match('^' + aws_hostname_regex + '$', str(arg)):
+    if _is_hostname_labels(str(arg).split('.'), 'aws_host_ip_regex'):
         return True
     return False
 
@@ -814,7 +1319,7 @@ def isAwsHostname(arg):
 def isAwsFqdn(arg):
     if arg is None:
         return False
-    if re.match('^' + aws_fqdn_regex + '$', str(arg)):
+    if _is_hostname_labels(str(arg).split('.'), 'aws_host_ip_regex', domain_required=True):
         return True
     return False
 
@@ -822,7 +1327,7 @@ def isAwsFqdn(arg):
 def isAwsSecretKey(arg):
     if arg is None:
         return False
-    if re.match('^' + aws_secret_key_regex + '$', str(arg)):
+    if _anchored_regex('aws_secret_key_regex').match(str(arg)):
         return True
     return False
 
@@ -884,7 +1389,7 @@ def isDatabaseName(arg):
 def isDatabaseColumnName(arg):
     if arg is None:
         return False
-    if re.match('^' + column_regex + '$', str(arg)):
+    if _anchored_regex('column_regex').match(str(arg)):
         return True
     return False
 
@@ -926,7 +1431,7 @@ def isDirname(arg):
     arg = str(arg)
     if re.match(r'^\s*$', arg):
         return False
-    if re.match('^' + dirname_regex + '$', arg):
+    if _anchored_regex('dirname_regex').match(arg):
         return True
     return False
 
@@ -937,7 +1442,7 @@ def isDomain(arg):
     arg = str(arg)
     if len(arg) > 255:
         return False
-    if re.match('^' + domain_regex + '$', arg):
+    if _is_domain_labels(arg.split('.')):
         return True
     return False
 
@@ -948,7 +1453,8 @@ def isDomainStrict(arg):
     arg = str(arg)
     if len(arg) > 255:
         return False
-    if re.match('^' + domain_regex_strict + '$', arg):
+    labels = arg.split('.')
+    if len(labels) > 1 and _is_domain_labels(labels):
         return True
     return False
 
@@ -959,7 +1465,7 @@ def isDnsShortname(arg):
     arg = str(arg)
     if len(arg) < 3 or len(arg) > 63:
         return False
-    if re.match('^' + hostname_component + '$', arg):
+    if _anchored_regex('hostname_component').match(arg):
         return True
     return False
 
@@ -972,7 +1478,8 @@ def isEmail(arg):
     arg = str(arg)
     if len(arg) > 256:
         return False
-    if re.match('^' + email_regex + '$', arg):
+    (user, at_sign, domain) = arg.partition('@')
+    if at_sign and _anchored_regex('email_user_regex').match(user) and _is_domain_labels(domain.split('.')):
         return True
     return False
 
@@ -983,7 +1490,7 @@ def isFilename(arg):
     arg = str(arg)
     if re.match('/$', arg) or re.match(r'^\s*$', arg):
         return False
-    if re.match('^' + filename_regex + '$', arg):
+    if _anchored_regex('filename_regex').match(arg):
         return True
     return False
 
@@ -1012,7 +1519,7 @@ def isFqdn(arg):
     arg = str(arg)
     if len(arg) > 255:
         return False
-    if re.match('^' + fqdn_regex + '$', arg):
+    if _is_hostname_labels(arg.split('.'), domain_required=True):
         return True
     return False
 
@@ -1037,7 +1544,20 @@ def isHost(arg):
         return False
     if len(arg) > 255:
         return False
-    if re.match('^' + host_regex + '$', str(arg)):
+    if _is_host(arg):
+        return True
+    return False
+
+
+# predicate form of validate_hostport() for use with is_many() without per value logging
+def isHostPort(arg, port_optional=False):
+    if arg is None:
+        return False
+    parts = str(arg).split(':')
+    num_parts = len(parts)
+    if num_parts == 1 and port_optional is True:
+        return isHost(parts[0])
+    elif num_parts == 2 and isHost(parts[0]) and isPort(parts[1]):
         return True
     return False
 
@@ -1051,11 +1571,16 @@ def isHostname(arg):
         return False
     if len(arg) > 255:
         return False
-    if re.match('^' + hostname_regex + '$', arg):
+    if _is_hostname_labels(arg.split('.')):
         return True
     return False
 
 
+_int_regexes = {
+    False: re.compile(r'\d+(?:\.0+)?\Z'),
+    True: re.compile(r'-?\d+(?:\.0+)?\Z')
+}
+
 def isInt(arg, allow_negative=False):
     if arg is None:
         return False
@@ -1063,10 +1588,7 @@ def isInt(arg, allow_negative=False):
     # if type(arg) == 'int':
     # if isinstance(arg, int):
     #     return True
-    neg = ""
-    if allow_negative:
-        neg = "-?"
-    if re.match('^' + neg + r'\d+(?:\.0+)?' + '$', str(arg)):
+    if _int_regexes[bool(allow_negative)].match(str(arg)):
         return True
     return False
 
@@ -1094,7 +1616,7 @@ def isIP(arg):
     octets = arg.split('.')
     if len(octets) > 4:
         return False
-    if not re.match('^' + ip_regex + '$', str(arg)):
+    if not _anchored_regex('ip_regex').match(str(arg)):
         return False
     for octet in octets:
         octet = int(octet)
@@ -1105,12 +1627,12 @@ def isIP(arg):
 
 def isIterable(arg):
     # collections.Iterable Python 2.6+
-    return isinstance(arg, collections.Iterable)
+    return isinstance(arg, Iterable)
 
 
 def isIterableNotStr(arg):
     # collections.Iterable Python 2.6+
-    return isinstance(arg, collections.Iterable) and not isStr(arg)
+    return isinstance(arg, Iterable) and not isStr(arg)
 
 
 def isJavaException(arg):
@@ -1131,7 +1653,7 @@ def isJson(arg):
     if not isStr(arg):
         return False
     try:
-        json.loads(arg)
+        json_loads(arg)
         return True
     except ValueError:
         pass
@@ -1141,6 +1663,7 @@ def isJson(arg):
 def isYaml(arg, safe_load_all=False):
     if not isStr(arg):
         return False
+    yaml = _lazy_module('yaml')
     try:
         if safe_load_all:
             yaml.safe_load_all(arg)
@@ -1155,6 +1678,7 @@ def isYaml(arg, safe_load_all=False):
 def isXml(arg):
     if not isStr(arg):
         return False
+    ET = _lazy_module('ET')  # pylint: disable=invalid-name
     try:
         ET.fromstring(arg)
         return True
@@ -1167,15 +1691,22 @@ def isXml(arg):
 def isKrb5Princ(arg):
     if arg is None:
         return False
-    if re.match('^' + krb5_principal_regex + '$', str(arg)):
-        return True
-    return False
+    # user[/hostname][@realm]
+    (principal, at_sign, realm) = str(arg).partition('@')
+    (user, slash, host) = principal.partition('/')
+    if not _anchored_regex('user_regex').match(user):
+        return False
+    if slash and not _is_hostname_labels(host.split('.')):
+        return False
+    if at_sign and not _is_domain_labels(realm.split('.')):
+        return False
+    return True
 
 
 def isLabel(arg):
     if arg is None:
         return False
-    if re.match('^' + label_regex + '$', str(arg)):
+    if _anchored_regex('label_regex').match(str(arg)):
         return True
     return False
 
@@ -1183,7 +1714,7 @@ def isLabel(arg):
 def isLdapDn(arg):
     if arg is None:
         return False
-    if re.match('^' + ldap_dn_regex + '$', str(arg)):
+    if _anchored_regex('ldap_dn_regex').match(str(arg)):
         return True
     return False
 
@@ -1245,10 +1776,13 @@ def isPathQualified(arg):
     return False
 
 
+_port_regex = re.compile(r'\d+\Z')
+
+
 def isPort(arg):
     if arg is None:
         return False
-    if not re.match(r'^\d+$', str(arg)):
+    if not _port_regex.match(str(arg)):
         return False
     if int(arg) >= 1 and int(arg) <= 65535:
         return True
@@ -1258,7 +1792,7 @@ def isPort(arg):
 def isProcessName(arg):
     if arg is None:
         return False
-    if re.match('^' + process_name_regex + '$', str(arg)):
+    if _anchored_regex('process_name_regex').match(str(arg)):
         return True
     return False
 
@@ -1321,13 +1855,15 @@ def isSet(arg):
     return isinstance(arg, set)
 
 
+_scientific_regexes = {
+    False: re.compile(r'\d+(?:\.\d+)?e[+-]?\d+\Z', re.I),
+    True: re.compile(r'-?\d+(?:\.\d+)?e[+-]?\d+\Z', re.I)
+}
+
 def isScientific(arg, allow_negative=False):
     if arg is None:
         return False
-    neg = ""
-    if allow_negative is True:
-        neg = "-?"
-    if re.match('^' + neg + r'\d+(?:\.\d+)?e[+-]?\d+$', str(arg), re.I):
+    if _scientific_regexes[allow_negative is True].match(str(arg)):
         return True
     return False
 
@@ -1335,12 +1871,17 @@ def isScientific(arg, allow_negative=False):
 # def isThreshold
 
 
+# resolved once rather than checking the Python version on every isStr() call
+if sys.version_info[0] >= 3:
+    _string_types = (str,)
+else:
+    # pylint thinks unicode is an undefined variable
+    _string_types = (str, unicode)  # pylint: disable=undefined-variable
+
+
 def isStr(arg):
     # return type(arg).__name__ in [ 'str', 'unicode' ]
-    if isPythonMinVersion(3):
-        return isinstance(arg, str)
-    # pylint thinks unicode is an undefined variable
-    return isinstance(arg, (str, unicode))  # pylint: disable=undefined-variable
+    return isinstance(arg, _string_types)
     # basestring is abstract superclass of both str and unicode
     # update: looks like this is removed in Python 3
     # return isinstance(arg, basestring)
@@ -1372,7 +1913,8 @@ def isUrl(arg):
     arg = str(arg).strip()
     if not re.search('://', arg):
         arg = 'http://' + arg
-    if re.match('^' + url_regex + '$', arg):
+    _ = _url_split_regex.match(arg)
+    if _ and _is_host(_.group(1)):
         return True
     return False
 
@@ -1380,7 +1922,7 @@ def isUrl(arg):
 def isUrlPathSuffix(arg):
     if arg is None:
         return False
-    if re.match('^' + url_path_suffix_regex + '$', str(arg)):
+    if _anchored_regex('url_path_suffix_regex').match(str(arg)):
         return True
     return False
 
@@ -1388,7 +1930,7 @@ def isUrlPathSuffix(arg):
 def isUser(arg):
     if arg is None:
         return False
-    if re.match('^' + user_regex + '$', str(arg)):
+    if _anchored_regex('user_regex').match(str(arg)):
         return True
     return False
 
@@ -1396,7 +1938,7 @@ def isUser(arg):
 def isVersion(arg):
     if arg is None:
         return False
-    if re.match('^' + version_regex + '$', str(arg)):
+    if _anchored_regex('version_regex').match(str(arg)):
         return True
     return False
 
@@ -1404,7 +1946,7 @@ def isVersion(arg):
 def isVersionLax(arg):
     if arg is None:
         return False
-    if re.match('^' + version_regex_lax + '$', str(arg)):
+    if _anchored_regex('version_regex_lax').match(str(arg)):
         return True
     return False
 
@@ -1484,11 +2026,12 @@ def min_value(val, min_val):
 # open_file
 
 
+_server_not_available_regex = re.compile(r'\b(?:no[\s_]+(?:server|host)[\s_]+available|' +
+                                         r'no[\s_]+available[\s_]+(?:server|host)|' +
+                                         r'(?:server|host)[\s_]+not[\s_]+available)\b', re.I)
+
 def is_str_server_not_available(arg):
-    host = r'(?:server|host)'
-    if re.search(r'\b(?:no[\s_]+{host}[\s_]+available|'.format(host=host) +
-                 r'no[\s_]+available[\s_]+{host}|'.format(host=host) +
-                 r'{host}[\s_]+not[\s_]+available)\b'.format(host=host), str(arg), re.I):
+    if _server_not_available_regex.search(str(arg)):
         return True
     return False
 
@@ -1592,6 +2135,7 @@ def sec2human(secs):
 # set_timeout
 
 
+# process global and main thread only, see harisekhon.deadline.Deadline for thread safe timeouts
 def set_timeout(secs, handler=None):
     if not isInt(secs):
         raise CodingError('non-integer passed for secs to set_timeout()')
@@ -2245,6 +2789,75 @@ def validate_user(arg, name=''):
 #     raise InvalidOptionException('invalid %(name)suser defined, not found on local system' % locals())
 
 
+# ============================================================================ #
+#                             Batch Validation
+# ============================================================================ #
+
+# Vectorised forms of the is*() predicates for validating whole columns of values eg. host lists from an inventory
+# or a CSV / NumPy / Pandas column, without per value logging or option exceptions
+#
+#   (mask, invalid_indexes) = is_many(isHost, hosts)
+#   (mask, invalid_indexes) = is_many(functools.partial(isHostPort, port_optional=True), hostports, processes=4)
+#
+# processes > 1 fans out across a multiprocessing pool, which only pays for itself on very large inputs given the
+# pickling overhead, so inputs no bigger than a single chunk are always validated in process. The predicate must be
+# picklable for this ie. a module level function or a functools.partial of one, not a lambda
+
+def is_many(predicate, values, processes=None, chunksize=10000):
+    if not callable(predicate):
+        code_error('non-callable predicate passed to is_many()')
+    if not isIterableNotStr(values):
+        code_error('non-iterable or string values passed to is_many()')
+    if not isInt(chunksize) or int(chunksize) < 1:
+        code_error('invalid chunksize passed to is_many(), must be a positive integer')
+    chunksize = int(chunksize)
+    # NumPy arrays / Pandas Series - return a NumPy boolean mask in kind without importing NumPy ourselves
+    array_module = type(values).__module__.split('.')[0]
+    is_array = array_module in ('numpy', 'pandas')
+    # tolist() converts NumPy scalars to native types which are much cheaper to str() in the predicates
+    if hasattr(values, 'tolist'):
+        values = values.tolist()
+    elif not isinstance(values, (list, tuple)):
+        values = list(values)
+    if processes is not None and int(processes) > 1 and len(values) > chunksize:
+        import multiprocessing
+        pool = multiprocessing.Pool(int(processes))
+        try:
+            mask = pool.map(predicate, values, chunksize)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        mask = list(map(predicate, values))
+    mask = [_ is True for _ in mask]
+    invalid_indexes = [index for (index, valid) in enumerate(mask) if not valid]
+    if is_array:
+        mask = sys.modules['numpy'].array(mask, dtype=bool)
+    return (mask, invalid_indexes)
+
+
+def validate_many(predicate, values, name='', processes=None, chunksize=10000, max_reported=10):
+    if name:
+        name += ' '
+    if not isIterableNotStr(values):
+        raise InvalidOptionException('%(name)svalues not defined as a list' % locals())
+    if not isinstance(values, (list, tuple)) and not hasattr(values, 'tolist'):
+        values = list(values)
+    if not len(values):  # pylint: disable=len-as-condition
+        raise InvalidOptionException('no %(name)svalues defined' % locals())
+    (mask, invalid_indexes) = is_many(predicate, values, processes=processes, chunksize=chunksize)
+    if invalid_indexes:
+        num_invalid = len(invalid_indexes)
+        invalid = ', '.join(["{0}: '{1}'".format(index, values[index])
+                             for index in invalid_indexes[:max_reported]])
+        if num_invalid > max_reported:
+            invalid += ', ...'
+        raise InvalidOptionException('{num_invalid}/{num} invalid {name}values defined at indexes: {invalid}'\
+                                     .format(num_invalid=num_invalid, num=len(mask), name=name, invalid=invalid))
+    log_option('%(name)svalues' % locals(), '{0} valid'.format(len(mask)))
+    return True
+
+
 # ============================================================================ #
 
 
@@ -0,0 +1,259 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 23:02:51 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+# ============================================================================ #
+#                   PyUnit Tests for HariSekhon.BatchRunner
+# ============================================================================ #
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, CriticalError
+from harisekhon import Result
+from harisekhon.nagiosplugin import NagiosPlugin, BatchRunner
+from harisekhon.nagiosplugin.batch_runner import run_checks, load_checks, batch_stats, worst_status
+
+
+class ValuePlugin(NagiosPlugin):
+
+    def add_options(self):
+        self.add_opt('--value', default='0')
+        self.add_opt('--sleep', default=0)
+
+    def run(self):
+        time.sleep(float(self.get_opt('sleep')))
+        value = self.get_opt('value')
+        if value == 'critical':
+            raise CriticalError('value is critical')
+        self.ok()
+        self.msg = 'value = {0} | value={0}'.format(value)
+
+
+class PidPlugin(NagiosPlugin):
+
+    def run(self):
+        self.ok()
+        self.msg = str(os.getpid())
+
+
+class BrokenInitPlugin(NagiosPlugin):
+
+    def __init__(self):
+        raise ValueError('broken init')
+
+    def run(self):
+        pass
+
+
+PLUGIN_SCRIPT = '''
+import sys
+__version__ = '1.2.3'
+sys.path.append({libdir!r})
+from harisekhon.nagiosplugin import NagiosPlugin
+
+class CheckTest(NagiosPlugin):
+    def add_options(self):
+        self.add_opt('--name', default='test')
+
+    def run(self):
+        self.ok()
+        self.msg = '{{0}} ok'.format(self.get_opt('name'))
+
+if __name__ == '__main__':
+    CheckTest().main()
+'''
+
+
+class BatchRunnerTester(unittest.TestCase):
+
+    # must prefix with test_ in order for the tests to be called
+
+    # Not using assertRaises >= 2.7 and maintaining compatibility with Python 2.6 servers
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        with open(os.path.join(self.tmpdir, 'check_test.py'), 'w') as filehandle:
+            filehandle.write(PLUGIN_SCRIPT.format(libdir=libdir))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_file(self, name, content):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as filehandle:
+            filehandle.write(content)
+        return path
+
+    def test_run_checks(self):
+        checks = [{'name': 'check{0}'.format(_), 'plugin': ValuePlugin, 'args': ['--value', str(_)]}
+                  for _ in range(20)]
+        checks.append({'name': 'critical', 'plugin': ValuePlugin, 'args': ['--value', 'critical']})
+        results = run_checks(checks, workers=5)
+        self.assertEqual([name for (name, _) in results], [check['name'] for check in checks])
+        for (index, (_, result)) in enumerate(results[:20]):
+            self.assertEqual((result.status, result.msg, result.perfdata),
+                             ('OK', 'value = {0}'.format(index), 'value={0}'.format(index)))
+        self.assertEqual((results[-1][1].status, results[-1][1].msg), ('CRITICAL', 'value is critical'))
+
+    def test_run_checks_processes(self):
+        checks = [{'name': 'ok', 'plugin': ValuePlugin, 'args': ['--value', '1']},
+                  {'name': 'critical', 'plugin': ValuePlugin, 'args': ['--value', 'critical']}]
+        results = run_checks(checks, workers=2, processes=True)
+        self.assertEqual(results[0][1].output, 'OK: value = 1 | value=1')
+        self.assertEqual(results[1][1].output, 'CRITICAL: value is critical')
+
+    def test_run_checks_timeout(self):
+        for processes in (False, True):
+            start = time.time()
+            results = run_checks([{'name': 'slow', 'plugin': ValuePlugin, 'args': ['--sleep', '2']},
+                                  {'name': 'fast', 'plugin': ValuePlugin, 'args': [], 'timeout': 5}],
+                                 workers=2, processes=processes, timeout=0.2)
+            self.assertTrue(time.time() - start < 1.5)
+            self.assertEqual(results[0][1].output, 'UNKNOWN: self timed out after 0.2 seconds')
+            self.assertEqual(results[1][1].status, 'OK')
+
+    def test_run_checks_verbose(self):
+        stdout = sys.stdout
+        stderr = sys.stderr
+        log_level = log.level
+        results = run_checks([{'name': 'quiet', 'plugin': PidPlugin},
+                              {'name': 'verbose', 'plugin': PidPlugin, 'args': ['-vvv']},
+                              {'name': 'debug', 'plugin': PidPlugin, 'args': ['--debug']}], workers=3)
+        self.assertEqual([_.status for (name, _) in results], ['OK', 'OK', 'OK'])
+        # verbose checks run in their own process so their log level doesn't affect the other checks
+        self.assertEqual(results[0][1].msg, str(os.getpid()))
+        self.assertNotEqual(results[1][1].msg, str(os.getpid()))
+        self.assertNotEqual(results[2][1].msg, str(os.getpid()))
+        self.assertTrue(sys.stdout is stdout)
+        self.assertTrue(sys.stderr is stderr)
+        self.assertEqual(log.level, log_level)
+
+    def test_run_checks_exception(self):
+        results = run_checks([{'name': 'broken', 'plugin': BrokenInitPlugin}])
+        self.assertEqual(results[0][1].output, 'UNKNOWN: batch runner plugin exception: ValueError: broken init')
+        try:
+            run_checks([{'name': 'invalid', 'plugin': object}])
+            raise AssertionError('failed to raise ValueError for non-NagiosPlugin check class')
+        except ValueError:
+            pass
+
+    def test_load_checks(self):
+        path = self.write_file('checks.yaml', 'checks:\n' +
+                               '  - plugin: check_test.py\n' +
+                               '  - name: named\n' +
+                               '    plugin: check_test.py:CheckTest\n' +
+                               '    args: --name "my name"\n' +
+                               '    timeout: 5\n')
+        checks = load_checks(path)
+        self.assertEqual([(_['name'], _['plugin'].__name__, _['args'], _['timeout']) for _ in checks],
+                         [('check_test.py', 'CheckTest', [], None),
+                          ('named', 'CheckTest', ['--name', 'my name'], 5)])
+        results = run_checks(checks)
+        self.assertEqual([_.output for (name, _) in results], ['OK: test ok', 'OK: my name ok'])
+        path = self.write_file('checks.json', json.dumps([{'plugin': 'check_test.py', 'args': ['--name', 1]}]))
+        self.assertEqual(load_checks(path)[0]['args'], ['--name', '1'])
+
+    def test_load_checks_topfile(self):
+        path = self.write_file('checks.json', json.dumps([{'plugin': 'check_test.py', 'args': ['--version']}]))
+        for processes in (False, True):
+            results = run_checks(load_checks(path), processes=processes)
+            # describes the plugin script rather than the batch runner
+            self.assertTrue(results[0][1].output.startswith('UNKNOWN: check_test.py version 1.2.3 '),
+                            results[0][1].output)
+
+    def test_load_checks_without_yaml(self):
+        json_path = self.write_file('checks.json', json.dumps([{'plugin': 'check_test.py'}]))
+        yaml_path = self.write_file('checks.yaml', '- plugin: check_test.py\n')
+        yaml = sys.modules.get('yaml')
+        # makes importing yaml raise ImportError
+        sys.modules['yaml'] = None
+        try:
+            self.assertEqual(len(load_checks(json_path)), 1)
+            try:
+                load_checks(yaml_path)
+                raise AssertionError('failed to raise ValueError for YAML checks file without PyYAML')
+            except ValueError as _:
+                self.assertIn('PyYAML is required', str(_))
+        finally:
+            if yaml is None:
+                del sys.modules['yaml']
+            else:
+                sys.modules['yaml'] = yaml
+
+    def test_load_checks_invalid(self):
+        for content in ('', 'checks: []', '[1]', '[{plugin: nonexistent.py}]', '[{plugin: check_test.py, args: {}}]',
+                        '[{plugin: check_test.py, timeout: x}]', '{{invalid'):
+            path = self.write_file('checks.yaml', content)
+            try:
+                load_checks(path)
+                raise AssertionError('failed to raise ValueError for checks file content: {0}'.format(content))
+            except ValueError:
+                pass
+
+    def test_batch_stats(self):
+        results = [('check{0}'.format(_), Result('OK' if _ < 8 else 'CRITICAL', run_time=(_ + 1) / 10.0))
+                   for _ in range(10)]
+        stats = batch_stats(results, 2)
+        self.assertEqual(stats['checks'], 10)
+        self.assertEqual(stats['checks_per_sec'], 5)
+        self.assertEqual((stats['ok'], stats['critical'], stats['warning']), (8, 2, 0))
+        self.assertEqual((stats['latency_min_secs'], stats['latency_p50_secs'], stats['latency_max_secs']),
+                         (0.1, 0.5, 1.0))
+        self.assertAlmostEqual(stats['latency_avg_secs'], 0.55)
+
+    def test_worst_status(self):
+        self.assertEqual(worst_status([]), 'OK')
+        self.assertEqual(worst_status(['OK', 'UNKNOWN', 'WARNING']), 'UNKNOWN')
+        self.assertEqual(worst_status(['CRITICAL', 'UNKNOWN']), 'CRITICAL')
+
+    def test_batch_runner(self):
+        path = self.write_file('checks.yaml', '- plugin: check_test.py\n- plugin: check_test.py\n')
+        runner = BatchRunner()
+        result = runner.execute(['--file', path, '--workers', '2', '--check-timeout', '5'])
+        self.assertEqual(result.status, 'OK')
+        self.assertEqual(runner.default_check_timeout, 5)
+        # must not hide CLI.check_timeout()
+        runner.check_timeout()
+        self.assertTrue(result.msg.startswith('2 checks in '))
+        self.assertIn('checks=2 ', result.perfdata)
+        result = BatchRunner().execute(['--file', os.path.join(self.tmpdir, 'nonexistent.yaml')])
+        self.assertEqual(result.status, 'UNKNOWN')
+
+
+def main():
+    # increase the verbosity
+    # verbosity Python >= 2.7
+    #unittest.main(verbosity=2)
+    log.setLevel(logging.DEBUG)
+    suite = unittest.TestLoader().loadTestsFromTestCase(BatchRunnerTester)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__':
+    main()
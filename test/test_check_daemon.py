@@ -0,0 +1,280 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 21:38:20 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+# ============================================================================ #
+#                   PyUnit Tests for HariSekhon.CheckDaemon
+# ============================================================================ #
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import logging
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, CodingError, CriticalError
+from harisekhon.nagiosplugin import NagiosPlugin, CheckDaemon
+from harisekhon.nagiosplugin import check_daemon
+from harisekhon.nagiosplugin.check_daemon import request_check, make_private_dir, DEFAULT_SOCKET, DEFAULT_SOCKET_DIR
+
+
+class OkPlugin(NagiosPlugin):
+
+    def add_options(self):
+        self.add_opt('--value', default='none')
+
+    def run(self):
+        os.environ['CHECK_DAEMON_TEST'] = 'leaked'
+        self.ok()
+        self.msg = 'value = {0}'.format(self.get_opt('value'))
+
+
+class CriticalPlugin(NagiosPlugin):
+
+    def run(self):
+        raise CriticalError('broken')
+
+
+class HangPlugin(NagiosPlugin):
+
+    def run(self):
+        # blocked without ever reaching check_timeout()
+        time.sleep(30)
+
+
+class BrokenInitPlugin(NagiosPlugin):
+
+    def __init__(self):
+        raise ValueError('broken init')
+
+    def run(self):
+        pass
+
+
+PLUGIN_SCRIPT = '''
+import sys
+__version__ = '1.2.3'
+sys.path.append({libdir!r})
+from harisekhon.nagiosplugin import NagiosPlugin
+
+class CheckTest(NagiosPlugin):
+    def run(self):
+        self.ok()
+        self.msg = 'test ok'
+
+if __name__ == '__main__':
+    CheckTest().main()
+'''
+
+
+class CheckDaemonTester(unittest.TestCase):
+
+    # must prefix with test_ in order for the tests to be called
+
+    # Not using assertRaises >= 2.7 and maintaining compatibility with Python 2.6 servers
+
+    def setUp(self):
+        self.daemon = CheckDaemon(plugins={'check_ok.py': OkPlugin,
+                                           'check_critical': CriticalPlugin,
+                                           'check_broken': BrokenInitPlugin,
+                                           'check_hang': HangPlugin})
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write_plugin_script(self, name, content=PLUGIN_SCRIPT):
+        path = os.path.join(self.tmpdir, name)
+        with open(path, 'w') as filehandle:
+            filehandle.write(content.format(libdir=libdir))
+        return path
+
+    def test_run_check(self):
+        self.assertEqual(self.daemon.run_check(['check_ok.py']), (0, 'OK: value = none\n'))
+        self.assertEqual(self.daemon.run_check(['/usr/lib/nagios/plugins/check_ok', '--value', 'test']),
+                         (0, 'OK: value = test\n'))
+        self.assertEqual(self.daemon.run_check(['check_critical']), (2, 'CRITICAL: broken\n'))
+
+    def test_run_check_restores_state(self):
+        argv = sys.argv
+        stdout = sys.stdout
+        stderr = sys.stderr
+        log_level = log.level
+        self.daemon.run_check(['check_ok', '--value', 'test', '-vvv'])
+        self.assertTrue(sys.argv is argv)
+        self.assertTrue(sys.stdout is stdout)
+        self.assertTrue(sys.stderr is stderr)
+        self.assertEqual(log.level, log_level)
+        self.assertTrue('CHECK_DAEMON_TEST' not in os.environ)
+
+    def test_run_check_unknown(self):
+        (exit_code, output) = self.daemon.run_check(['check_ok', '--nonexistent'])
+        self.assertEqual(exit_code, 3)
+        self.assertIn('no such option: --nonexistent', output)
+        (exit_code, output) = self.daemon.run_check(['check_broken'])
+        self.assertEqual(exit_code, 3)
+        self.assertIn('ValueError: broken init', output)
+        for argv in (['check_nonexistent'], [], None, 'check_ok', [1]):
+            (exit_code, output) = self.daemon.run_check(argv)
+            self.assertEqual(exit_code, 3)
+            self.assertTrue(output.startswith('UNKNOWN: '))
+
+    def test_run_check_abandoned(self):
+        check_daemon.CHECK_TIMEOUT_GRACE_SECS = 0.5
+        try:
+            start = time.time()
+            self.assertEqual(self.daemon.run_check(['check_hang', '-t', '1']),
+                             (3, 'UNKNOWN: self timed out after 1 second\n'))
+            self.assertTrue(time.time() - start < 5)
+            self.assertTrue(self.daemon.abandoned)
+            # no timeout of its own
+            daemon = CheckDaemon(plugins={'check_hang': HangPlugin})
+            daemon.max_check_secs = 1
+            self.assertEqual(daemon.run_check(['check_hang', '-t', '0']),
+                             (3, 'UNKNOWN: self timed out after 1 second\n'))
+            self.assertTrue(daemon.abandoned)
+        finally:
+            check_daemon.CHECK_TIMEOUT_GRACE_SECS = 5
+        self.assertFalse(CheckDaemon(plugins={'check_ok': OkPlugin}).abandoned)
+
+    def test_make_private_dir(self):
+        path = os.path.join(self.tmpdir, 'private')
+        make_private_dir(path)
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o700)
+        make_private_dir(path)
+        os.chmod(path, 0o755)
+        try:
+            make_private_dir(path)
+            raise AssertionError('failed to raise ValueError for non-private directory')
+        except ValueError:
+            pass
+        self.assertTrue(DEFAULT_SOCKET.startswith(DEFAULT_SOCKET_DIR) or os.getenv('CHECK_DAEMON_SOCKET'))
+
+    def test_handle(self):
+        (server, client) = socket.socketpair()
+        try:
+            client.sendall(b'{"argv": ["check_ok", "--value", "1"]}\n\n{"argv": ["check_critical"]}\nnot json\n')
+            client.shutdown(socket.SHUT_WR)
+            self.daemon.handle(server)
+            server.close()
+            responses = [json.loads(_) for _ in client.makefile('rb').read().decode('utf-8').splitlines()]
+        finally:
+            client.close()
+        self.assertEqual(responses, [{'exit_code': 0, 'status': 'OK', 'output': 'OK: value = 1\n'},
+                                     {'exit_code': 2, 'status': 'CRITICAL', 'output': 'CRITICAL: broken\n'},
+                                     {'exit_code': 3, 'status': 'UNKNOWN',
+                                      'output': "UNKNOWN: invalid check daemon request, expected JSON object " +
+                                                "with 'argv' list\n"}])
+
+    def test_load_plugin(self):
+        path = self.write_plugin_script('check_test.py')
+        self.daemon.load_plugin(path)
+        self.assertEqual(self.daemon.run_check(['check_test.py']), (0, 'OK: test ok\n'))
+        self.assertEqual(self.daemon.run_check([path]), (0, 'OK: test ok\n'))
+        self.daemon.load_plugin(path + ':CheckTest')
+
+    def test_plugin_topfile(self):
+        path = self.write_plugin_script('check_test.py')
+        self.daemon.load_plugin(path)
+        # describes the plugin script rather than the daemon
+        (exit_code, output) = self.daemon.run_check(['check_test', '--version'])
+        self.assertEqual(exit_code, 3)
+        self.assertTrue(output.startswith('UNKNOWN: check_test.py version 1.2.3 '), output)
+        self.assertEqual(check_daemon.get_plugin_script(check_daemon.load_plugin_class(path)), path)
+        self.assertEqual(check_daemon.get_plugin_script(OkPlugin), None)
+
+    def test_load_plugin_exception(self):
+        path = self.write_plugin_script('check_test.py')
+        for arg in (path + ':Nonexistent', os.path.join(self.tmpdir, 'nonexistent.py')):
+            try:
+                self.daemon.load_plugin(arg)
+                raise AssertionError('failed to exit for plugin {0}'.format(arg))
+            except SystemExit as _:
+                self.assertEqual(_.code, 3)
+
+    def test_add_plugin_exception(self):
+        try:
+            self.daemon.add_plugin('check_test', object)
+            raise AssertionError('failed to raise CodingError for non-NagiosPlugin class')
+        except CodingError:
+            pass
+
+    def test_daemon(self):
+        path = self.write_plugin_script('check_test.py')
+        socket_path = os.path.join(self.tmpdir, 'check_daemon.sock')
+        daemon = subprocess.Popen([sys.executable,
+                                   os.path.join(libdir, 'harisekhon', 'nagiosplugin', 'check_daemon.py'),
+                                   '--socket', socket_path, '--workers', '2', path])
+        try:
+            for _ in range(100):
+                if os.path.exists(socket_path):
+                    break
+                time.sleep(0.1)
+            for _ in range(5):
+                self.assertEqual(request_check(['check_test', '-t', '5'], socket_path, timeout=10),
+                                 (0, 'OK: test ok\n'))
+            self.assertEqual(request_check(['check_other'], socket_path, timeout=10)[0], 3)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+        self.assertFalse(os.path.exists(socket_path))
+
+
+    def test_daemon_replaces_worker(self):
+        path = self.write_plugin_script('check_test.py')
+        hang_path = self.write_plugin_script('check_hang.py', PLUGIN_SCRIPT.replace("self.ok()", "time.sleep(60)")
+                                             .replace('import sys', 'import sys, time'))
+        socket_path = os.path.join(self.tmpdir, 'check_daemon.sock')
+        daemon = subprocess.Popen([sys.executable,
+                                   os.path.join(libdir, 'harisekhon', 'nagiosplugin', 'check_daemon.py'),
+                                   '--socket', socket_path, '--workers', '1', path, hang_path])
+        try:
+            for _ in range(100):
+                if os.path.exists(socket_path):
+                    break
+                time.sleep(0.1)
+            self.assertEqual(request_check(['check_hang', '-t', '1'], socket_path, timeout=30),
+                             (3, 'UNKNOWN: self timed out after 1 second\n'))
+            # the only worker was replaced rather than left running the abandoned check
+            self.assertEqual(request_check(['check_test', '-t', '5'], socket_path, timeout=10),
+                             (0, 'OK: test ok\n'))
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+
+def main():
+    # increase the verbosity
+    # verbosity Python >= 2.7
+    #unittest.main(verbosity=2)
+    log.setLevel(logging.DEBUG)
+    suite = unittest.TestLoader().loadTestsFromTestCase(CheckDaemonTester)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__':
+    main()
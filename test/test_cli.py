@@ -26,7 +26,9 @@ from __future__ import print_function
 
 import logging
 import os
+import subprocess
 import sys
+import tempfile
 import time
 import unittest
 from optparse import OptionConflictError
@@ -330,6 +332,56 @@ class CLITester(unittest.TestCase):
         # except CodingError as _:
         #     pass
 
+    def test_execute(self):
+        result = self.SubCLI().execute([])
+        self.assertEqual(result.status, 'OK')
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.output, '')
+        result = self.SubCLI().execute(['--nonexistent'])
+        self.assertEqual(result.status, 'UNKNOWN')
+        self.assertEqual(result.msg, 'no such option: --nonexistent')
+        result = self.SubCLI().execute(['--version'])
+        self.assertEqual(result.status, 'UNKNOWN')
+        self.assertIn('CLI version', result.msg)
+
+    def test_timeout_exit(self):
+        # the deadline watchdog thread must print and exit the same as the SIGALRM handler used to
+        with tempfile.NamedTemporaryFile('w', suffix='.py') as filehandle:
+            filehandle.write('import sys, time\n' +
+                             'sys.path.append({0!r})\n'.format(os.path.join(os.path.dirname(__file__), '..')) +
+                             'from harisekhon import CLI\n' +
+                             'class SleepCLI(CLI):\n' +
+                             '    def run(self):\n' +
+                             '        time.sleep(10)\n' +
+                             'SleepCLI().main()\n')
+            filehandle.flush()
+            start = time.time()
+            process = subprocess.Popen([sys.executable, filehandle.name, '-t', '1'], stdout=subprocess.PIPE)
+            (stdout, _) = process.communicate()
+        self.assertEqual(process.returncode, 3)
+        self.assertEqual(stdout.decode('utf-8'), 'UNKNOWN: self timed out after 1 second\n')
+        self.assertTrue(time.time() - start < 5)
+
+    def test_timeout_exit_thread(self):
+        # SIGALRM can't be used outside of the main thread so the watchdog hard exits at the deadline instead
+        with tempfile.NamedTemporaryFile('w', suffix='.py') as filehandle:
+            filehandle.write('import sys, threading, time\n' +
+                             'sys.path.append({0!r})\n'.format(os.path.join(os.path.dirname(__file__), '..')) +
+                             'from harisekhon import CLI\n' +
+                             'class SleepCLI(CLI):\n' +
+                             '    def run(self):\n' +
+                             '        time.sleep(10)\n' +
+                             'thread = threading.Thread(target=SleepCLI().main)\n' +
+                             'thread.start()\n' +
+                             'thread.join()\n')
+            filehandle.flush()
+            start = time.time()
+            process = subprocess.Popen([sys.executable, filehandle.name, '-t', '1'], stdout=subprocess.PIPE)
+            (stdout, _) = process.communicate()
+        self.assertEqual(process.returncode, 3)
+        self.assertEqual(stdout.decode('utf-8'), 'UNKNOWN: self timed out after 1 second\n')
+        self.assertTrue(time.time() - start < 5)
+
     def test_cli_abstract(self): # pylint: disable=no-self-use
         try:
             CLI() # pylint: disable=abstract-class-instantiated
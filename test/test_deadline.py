@@ -0,0 +1,180 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-18 23:51:12 +0100 (Sun, 18 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+# ============================================================================ #
+#                   PyUnit Tests for HariSekhon.Deadline
+# ============================================================================ #
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import os
+import sys
+import threading
+import time
+import unittest
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, CodingError, UnknownError
+from harisekhon.deadline import Deadline, DeadlineExceeded, DeadlineWatchdog
+
+
+class DeadlineTester(unittest.TestCase):
+
+    # must prefix with test_ in order for the tests to be called
+
+    # Not using assertRaises >= 2.7 and maintaining compatibility with Python 2.6 servers
+
+    def test_deadline(self):
+        deadline = Deadline(10)
+        self.assertFalse(deadline.expired())
+        self.assertTrue(9 < deadline.remaining() <= 10)
+        self.assertEqual(deadline.timeout(5), 5)
+        self.assertTrue(9 < deadline.timeout() <= 10)
+        self.assertEqual(deadline.msg, 'self timed out after 10 seconds')
+        deadline.check()
+        deadline.cancel()
+
+    def test_no_deadline(self):
+        for secs in (None, 0):
+            deadline = Deadline(secs)
+            self.assertEqual(deadline.remaining(), None)
+            self.assertEqual(deadline.timeout(), None)
+            self.assertEqual(deadline.timeout(5), 5)
+            self.assertFalse(deadline.expired())
+
+    def test_expired(self):
+        deadline = Deadline(0.1)
+        time.sleep(0.2)
+        self.assertTrue(deadline.expired())
+        self.assertEqual(deadline.remaining(), 0)
+        for method in (deadline.check, deadline.timeout):
+            try:
+                method()
+                raise AssertionError('failed to raise DeadlineExceeded after deadline')
+            except DeadlineExceeded as _:
+                self.assertTrue(isinstance(_, UnknownError))
+                self.assertEqual(str(_), 'self timed out after 0.1 seconds')
+
+    def test_sleep(self):
+        start = time.time()
+        deadline = Deadline(0.2)
+        try:
+            deadline.sleep(5)
+            raise AssertionError('failed to raise DeadlineExceeded for sleep past the deadline')
+        except DeadlineExceeded:
+            pass
+        self.assertTrue(time.time() - start < 1)
+        Deadline(5).sleep(0.01)
+
+    def test_callbacks(self):
+        fired = threading.Event()
+        deadlines = [Deadline(0.1, on_expire=lambda _: fired.set()) for _ in range(100)]
+        cancelled = Deadline(0.1, on_expire=lambda _: cancelled_fired.append(_))
+        cancelled_fired = []
+        cancelled.cancel()
+        removed = Deadline(0.1)
+        removed.remove_callback(removed.add_callback(lambda _: cancelled_fired.append(_)))
+        self.assertTrue(fired.wait(2))
+        time.sleep(0.2)
+        self.assertEqual(cancelled_fired, [])
+        self.assertFalse(cancelled.expired())
+        # callbacks added after expiry are called immediately
+        late = []
+        deadlines[0].add_callback(late.append)
+        self.assertEqual(late, [deadlines[0]])
+
+    def test_watchdog_concurrent_schedule(self):
+        # the first deadlines scheduled concurrently in a process, eg. after fork, must all be watched
+        watchdog = DeadlineWatchdog()
+        start = threading.Event()
+        fired = []
+        deadlines = []
+        for _ in range(20):
+            deadline = Deadline(60, on_expire=fired.append)
+            # only fires in time if watched by this watchdog
+            deadline.expires_at -= 59.9
+            deadlines.append(deadline)
+        def schedule(deadline):
+            start.wait()
+            watchdog.schedule(deadline)
+        threads = [threading.Thread(target=schedule, args=(_,)) for _ in deadlines]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for thread in threads:
+            thread.join()
+        for _ in range(100):
+            if len(fired) == len(deadlines):
+                break
+            time.sleep(0.05)
+        self.assertEqual(sorted([id(_) for _ in fired]), sorted([id(_) for _ in deadlines]))
+
+    def test_callback_exception(self):
+        def broken(_):
+            raise ValueError('broken callback')
+        fired = threading.Event()
+        deadline = Deadline(0.1)
+        deadline.add_callback(broken)
+        deadline.add_callback(lambda _: fired.set())
+        self.assertTrue(fired.wait(2))
+
+    def test_current(self):
+        self.assertTrue(Deadline.current() is None)
+        with Deadline(10) as deadline:
+            self.assertTrue(Deadline.current() is deadline)
+            other_thread = []
+            thread = threading.Thread(target=lambda: other_thread.append(Deadline.current()))
+            thread.start()
+            thread.join()
+            self.assertEqual(other_thread, [None])
+        self.assertTrue(Deadline.current() is None)
+        self.assertTrue(deadline.cancelled)
+
+    def test_deadline_exception(self):
+        for arg in ('a', -1, [1]):
+            try:
+                Deadline(arg)
+                raise AssertionError("failed to raise CodingError for Deadline('{0}')".format(arg))
+            except CodingError:
+                pass
+        try:
+            Deadline.set_current(1)
+            raise AssertionError('failed to raise CodingError for Deadline.set_current(1)')
+        except CodingError:
+            pass
+        try:
+            Deadline(10).add_callback(1)
+            raise AssertionError('failed to raise CodingError for non-callable passed to add_callback()')
+        except CodingError:
+            pass
+
+
+def main():
+    # increase the verbosity
+    # verbosity Python >= 2.7
+    #unittest.main(verbosity=2)
+    log.setLevel(logging.DEBUG)
+    suite = unittest.TestLoader().loadTestsFromTestCase(DeadlineTester)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__':
+    main()
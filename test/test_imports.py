@@ -0,0 +1,117 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 01:31:46 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+# ============================================================================ #
+#             PyUnit Tests for HariSekhon package lazy imports
+# ============================================================================ #
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import unittest
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+import harisekhon
+import harisekhon.nagiosplugin
+from harisekhon.utils import log
+
+# third party modules a simple plugin must not pay for importing
+HEAVY_MODULES = ('bs4', 'defusedxml', 'docker', 'requests', 'requests_kerberos', 'yaml')
+
+# median import time budget in milliseconds for a simple plugin, generous to not be flaky on slow or loaded servers
+# while still catching a regression to importing everything, which took over 400 ms
+IMPORT_BUDGET_MS = int(os.getenv('HARISEKHON_IMPORT_BUDGET_MS', 300))
+
+
+class ImportsTester(unittest.TestCase):
+
+    # must prefix with test_ in order for the tests to be called
+
+    # Not using assertRaises >= 2.7 and maintaining compatibility with Python 2.6 servers
+
+    @staticmethod
+    def run_script(content, *args):
+        with tempfile.NamedTemporaryFile('w', suffix='.py') as filehandle:
+            filehandle.write('import sys\nsys.path.insert(0, {0!r})\n'.format(libdir) + content)
+            filehandle.flush()
+            process = subprocess.Popen([sys.executable] + list(args) + [filehandle.name],
+                                       stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            (stdout, stderr) = process.communicate()
+        if process.returncode != 0:
+            raise AssertionError('script failed with exit code {0}: {1}'.format(process.returncode, stderr))
+        return (stdout.decode('utf-8'), stderr.decode('utf-8'))
+
+    def test_lazy_exports(self):
+        (stdout, _) = self.run_script('import json\n' +
+                                      'from harisekhon.nagiosplugin import StatusNagiosPlugin\n' +
+                                      'loaded = [_ for _ in {0!r} if _ in sys.modules]\n'.format(HEAVY_MODULES) +
+                                      'import harisekhon.utils\n' +
+                                      'harisekhon.utils.isYaml("key: value")\n' +
+                                      'from harisekhon import RequestBS4Handler\n' +
+                                      'print(json.dumps([loaded, [_ for _ in ("yaml", "bs4") if _ in sys.modules]]))\n')
+        self.assertEqual(json.loads(stdout), [[], ['yaml', 'bs4']])
+
+    def test_exports(self):
+        for package in (harisekhon, harisekhon.nagiosplugin):
+            for name in package.__all__:
+                self.assertEqual(getattr(package, name).__name__, name)
+                self.assertIn(name, dir(package))
+            try:
+                getattr(package, 'Nonexistent')
+                raise AssertionError('failed to raise AttributeError for nonexistent attribute of {0}'
+                                     .format(package.__name__))
+            except AttributeError:
+                pass
+        self.assertTrue(harisekhon.NagiosPlugin is harisekhon.nagiosplugin.NagiosPlugin)
+        (stdout, _) = self.run_script('from harisekhon import *\n' +
+                                      'print(CLI.__name__, StatusNagiosPlugin.__name__, Threshold.__name__)\n')
+        self.assertEqual(stdout, 'CLI StatusNagiosPlugin Threshold\n')
+
+    def test_import_time_budget(self):
+        timings = []
+        for _ in range(5):
+            (_, stderr) = self.run_script('import harisekhon.nagiosplugin.status_nagiosplugin\n', '-X', 'importtime')
+            # import time: self [us] | cumulative | imported package - the outermost harisekhon module includes the rest
+            cumulative = re.findall(r'^import time:\s+\d+ \|\s+(\d+) \| harisekhon\S*$', stderr, re.M)
+            self.assertTrue(cumulative)
+            timings.append(max([int(_) for _ in cumulative]) / 1000.0)
+        median = sorted(timings)[len(timings) // 2]
+        log.info('import time for a simple plugin: median %.1f ms', median)
+        self.assertTrue(median < IMPORT_BUDGET_MS,
+                        'median import time {0:.1f} ms exceeds budget of {1} ms'.format(median, IMPORT_BUDGET_MS))
+
+
+def main():
+    # increase the verbosity
+    # verbosity Python >= 2.7
+    #unittest.main(verbosity=2)
+    log.setLevel(logging.DEBUG)
+    suite = unittest.TestLoader().loadTestsFromTestCase(ImportsTester)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__':
+    main()
@@ -31,8 +31,9 @@ import unittest
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
-from harisekhon.utils import log
+from harisekhon.utils import log, CriticalError
 from harisekhon import KeyCheckNagiosPlugin
+from harisekhon.deadline import DeadlineExceeded
 
 
 class KeyCheckNagiosPluginTester(unittest.TestCase):
@@ -81,6 +82,85 @@ class KeyCheckNagiosPluginTester(unittest.TestCase):
                 raise AssertionError('KeyCheckNagiosPlugin failed to exit CRITICAL (2), got exit code {0} instead'
                                      .format(_.code))
 
+    class MultiKeyCheckNagiosPlugin(KeyCheckNagiosPlugin):
+        store = {'a': 'test1', 'b': 'test2', 'prefix/c': '5', 'prefix/d': '15'}
+        def __init__(self):
+            # Python 2.x
+            super(KeyCheckNagiosPluginTester.MultiKeyCheckNagiosPlugin, self).__init__()
+            # Python 3.x
+            # super().__init__()
+            self.name = 'test'
+            self.default_port = 80
+        def read(self):
+            if self.key == 'error':
+                raise CriticalError('read failed')
+            return self.store.get(self.key)
+        def list_keys(self, prefix):
+            return [_ for _ in self.store if _.startswith(prefix)]
+
+    def test_multi_key(self):
+        result = self.MultiKeyCheckNagiosPlugin().execute(['-k', 'a,b,a', '-r', '^test'])
+        self.assertEqual(result.status, 'OK')
+        self.assertTrue(result.msg.startswith('test 2 keys read in '))
+        self.assertTrue("OK: key 'a' value = 'test1'\nOK: key 'b' value = 'test2'" in result.output_msg)
+        self.assertTrue('keys=2 ok=2 warning=0 unknown=0 critical=0 query_time=' in result.perfdata)
+
+    def test_multi_key_failures(self):
+        result = self.MultiKeyCheckNagiosPlugin().execute(['-k', 'a,missing,error', '-r', '1$',
+                                                           '--concurrency', 3])
+        self.assertEqual(result.status, 'CRITICAL')
+        self.assertTrue("1 OK, 0 WARNING, 0 UNKNOWN, 2 CRITICAL: key 'missing' not found, key 'error' read failed"
+                        in result.msg)
+        result = self.MultiKeyCheckNagiosPlugin().execute(['-k', 'b', '-r', '1$'])
+        self.assertEqual(result.status, 'CRITICAL')
+
+    def test_key_prefix(self):
+        result = self.MultiKeyCheckNagiosPlugin().execute(['--key-prefix', 'prefix/', '-w', 10, '-c', 20])
+        self.assertEqual(result.status, 'WARNING')
+        self.assertTrue("WARNING: key 'prefix/d' value = '15'" in result.output_msg)
+        self.assertTrue('prefix/c=5;10;20 prefix/d=15;10;20' in result.perfdata)
+        self.assertEqual(self.MultiKeyCheckNagiosPlugin().execute(['--key-prefix', 'nonexistent']).status,
+                         'UNKNOWN')
+        self.assertEqual(self.MultiKeyCheckNagiosPlugin().execute(['-k', 'a', '--key-prefix', 'a']).status,
+                         'UNKNOWN')
+
+    def test_key_prefix_useroption(self):
+        class AuthKeyCheckNagiosPlugin(self.MultiKeyCheckNagiosPlugin):
+            def add_options(self):
+                # Python 2.x
+                super(AuthKeyCheckNagiosPlugin, self).add_options()
+                # Python 3.x
+                # super().add_options()
+                self.add_useroption()
+        # --key-prefix must not clash with -p/--password
+        result = AuthKeyCheckNagiosPlugin().execute(['-u', 'user', '-p', 'pass', '--key-prefix', 'prefix/'])
+        self.assertEqual(result.status, 'OK')
+        self.assertTrue("OK: key 'prefix/d' value = '15'" in result.output_msg)
+
+    def test_read_many_timeout(self):
+        plugin = self.MultiKeyCheckNagiosPlugin()
+        def read():
+            raise DeadlineExceeded('self timed out after 10 seconds')
+        plugin.read = read
+        # running out of time stops the check rather than being reported as each key's value
+        try:
+            plugin.read_many(['a', 'b'])
+            raise AssertionError('read_many() failed to raise DeadlineExceeded')
+        except DeadlineExceeded:
+            pass
+        result = plugin.execute(['-k', 'a,b,c', '-t', 10])
+        self.assertEqual(result.status, 'UNKNOWN')
+        self.assertEqual(result.msg, 'self timed out after 10 seconds')
+
+    def test_read_many(self):
+        plugin = self.MultiKeyCheckNagiosPlugin()
+        calls = []
+        plugin.read_many = lambda keys: calls.append(keys) or {'a': 'x'}
+        result = plugin.execute(['-k', 'a,b'])
+        self.assertEqual(calls, [['a', 'b']])
+        self.assertEqual(result.status, 'CRITICAL')
+        self.assertTrue("key 'b' not found" in result.msg)
+
     def test_plugin_abstract(self):  # pylint: disable=no-self-use
         try:
             KeyCheckNagiosPlugin()  # pylint: disable=abstract-class-instantiated
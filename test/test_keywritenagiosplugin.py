@@ -49,13 +49,16 @@ class KeyWriteNagiosPluginTester(unittest.TestCase):
             # super().__init__()
             self.name = 'test'
             self.default_port = 80
+            self.store = {}
         def read(self):
             print("running SubKeyWriteNagiosPlugin().read()")
-            return self._write_value
+            return self.store.get(self.key)
         def write(self):
             print("running SubKeyWriteNagiosPlugin().write()")
+            self.store[self.key] = self._write_value
         def delete(self):
             print("running SubKeyWriteNagiosPlugin().delete()")
+            del self.store[self.key]
 
 
     #def setUp(self):
@@ -82,6 +85,49 @@ class KeyWriteNagiosPluginTester(unittest.TestCase):
                 raise AssertionError('KeyWriteNagiosPlugin failed to exit CRITICAL (2), got exit code {0} instead'
                                      .format(_.code))
 
+    def test_delete_timeout(self):
+        plugin = self.SubKeyWriteNagiosPlugin()
+        delete = plugin.delete
+        plugin.delete = lambda: delete() or plugin.deadline.expire()
+        result = plugin.execute(['-H', 'localhost', '-t', 10])
+        self.assertEqual(result.status, 'UNKNOWN')
+        self.assertEqual(result.msg, 'self timed out after 10 seconds')
+        # times out before recording a delete timing that overran the deadline
+        self.assertEqual(plugin._delete_timing, None)  # pylint: disable=protected-access
+
+    def test_cycles(self):
+        plugin = self.SubKeyWriteNagiosPlugin()
+        keys = []
+        write = plugin.write
+        plugin.write = lambda: keys.append(plugin.key) or write()
+        result = plugin.execute(['-H', 'localhost', '--iterations', 10, '--concurrency', 3])
+        self.assertEqual(result.status, 'OK')
+        self.assertTrue('10 key write-read-delete cycles from 3 workers' in result.msg)
+        self.assertTrue('all values read back successfully' in result.msg)
+        # each cycle uses a unique key
+        self.assertEqual(len(set(keys)), 10)
+        self.assertEqual(plugin.store, {})
+        for metric in ('ops_per_sec', 'mismatches=0', 'write_p95', 'read_p99', 'delete_max'):
+            self.assertTrue(metric in result.perfdata)
+
+    def test_cycles_mismatch(self):
+        plugin = self.SubKeyWriteNagiosPlugin()
+        plugin.read = lambda: 'wrongreadkey'
+        result = plugin.execute(['-H', 'localhost', '--iterations', 4, '--concurrency', 2])
+        self.assertEqual(result.status, 'CRITICAL')
+        self.assertTrue('4 MISMATCHES' in result.msg)
+        self.assertTrue('mismatches=4' in result.perfdata)
+
+    def test_cycles_thresholds(self):
+        plugin = self.SubKeyWriteNagiosPlugin()
+        result = plugin.execute(['-H', 'localhost', '--iterations', 3, '-w', 0, '-c', 10])
+        self.assertEqual(result.status, 'WARNING')
+
+    def test_cycles_invalid_options(self):
+        for args in (['--iterations', 0], ['--iterations', 'a'], ['--concurrency', 0]):
+            result = self.SubKeyWriteNagiosPlugin().execute(['-H', 'localhost'] + args)
+            self.assertEqual(result.status, 'UNKNOWN')
+
     def test_plugin_abstract(self):  # pylint: disable=no-self-use
         try:
             KeyWriteNagiosPlugin()  # pylint: disable=abstract-class-instantiated
@@ -0,0 +1,156 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 05:44:30 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+# ============================================================================ #
+#                   PyUnit Tests for HariSekhon.LatencyRecorder
+# ============================================================================ #
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import math
+import os
+import random
+import sys
+import time
+import unittest
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, CodingError
+from harisekhon.nagiosplugin import LatencyRecorder, Perfdata
+
+
+class LatencyRecorderTester(unittest.TestCase):
+
+    # must prefix with test_ in order for the tests to be called
+
+    # Not using assertRaises >= 2.7 and maintaining compatibility with Python 2.6 servers
+
+    def test_empty(self):
+        recorder = LatencyRecorder()
+        self.assertEqual(len(recorder), 0)
+        self.assertEqual(recorder.mean, None)
+        self.assertEqual(recorder.percentile(99), None)
+        self.assertEqual(list(recorder.stats().values()), [0, None, None, None, None, None])
+        self.assertEqual(str(recorder.perfdata('latency')), '')
+
+    def test_percentiles(self):
+        random.seed(0)
+        samples = [random.lognormvariate(-7, 1.5) for _ in range(10000)]
+        recorder = LatencyRecorder()
+        for sample in samples:
+            recorder.record(sample)
+        samples.sort()
+        self.assertEqual(len(recorder), 10000)
+        self.assertEqual(recorder.min, samples[0])
+        self.assertEqual(recorder.max, samples[-1])
+        self.assertTrue(abs(recorder.mean - sum(samples) / len(samples)) < 1e-12)
+        for (pct, value) in recorder.percentiles((1, 50, 95, 99, 99.9, 100)).items():
+            exact = samples[max(0, int(math.ceil(pct / 100.0 * len(samples))) - 1)]
+            # within the 2 significant digits plus the microsecond resolution
+            self.assertTrue(abs(value - exact) <= exact / 100 + 0.000001,
+                            'p{0} = {1} vs exact {2}'.format(pct, value, exact))
+        self.assertEqual(recorder.percentile(100), samples[-1])
+
+    def test_exact_small_values(self):
+        recorder = LatencyRecorder()
+        for usecs in range(1, 101):
+            recorder.record(usecs / 1000000.0)
+        self.assertEqual([round(_, 7) for _ in recorder.percentiles((1, 50, 99)).values()],
+                         [0.000001, 0.00005, 0.000099])
+
+    def test_highest(self):
+        recorder = LatencyRecorder(highest=10)
+        recorder.record(1)
+        recorder.record(100)
+        self.assertEqual(recorder.max, 100)
+        self.assertTrue(9.9 < recorder.percentile(100) <= 100)
+
+    def test_time(self):
+        recorder = LatencyRecorder()
+        with recorder.time():
+            time.sleep(0.01)
+        self.assertEqual(len(recorder), 1)
+        self.assertTrue(0.01 <= recorder.max < 1)
+
+    def test_merge(self):
+        random.seed(1)
+        samples = [random.random() for _ in range(1000)]
+        whole = LatencyRecorder()
+        parts = [LatencyRecorder() for _ in range(4)]
+        for (index, sample) in enumerate(samples):
+            whole.record(sample)
+            parts[index % 4].record(sample)
+        merged = LatencyRecorder()
+        for part in parts:
+            self.assertTrue(merged.merge(part) is merged)
+        merged.merge(LatencyRecorder())
+        self.assertEqual(len(merged), 1000)
+        self.assertEqual((merged.min, merged.max), (whole.min, whole.max))
+        self.assertEqual(merged.percentiles((50, 95, 99, 100)), whole.percentiles((50, 95, 99, 100)))
+
+    def test_perfdata(self):
+        recorder = LatencyRecorder()
+        for secs in (0.001, 0.002, 0.003, 0.004):
+            recorder.record(secs)
+        # percentiles are the highest value in their bucket, 2000us is in the 2000-2007us bucket
+        self.assertEqual(str(recorder.perfdata('write', warning=1, critical=2, pcts=(50,))),
+                         'write_mean=0.002500s;1;2 write_p50=0.002007s;1;2 write_max=0.004000s;1;2')
+        perfdata = Perfdata().add('ops', 4)
+        self.assertTrue(recorder.perfdata('read', perfdata=perfdata) is perfdata)
+        self.assertEqual(perfdata.labels(), ['ops', 'read_mean', 'read_p50', 'read_p95', 'read_p99', 'read_max'])
+
+    def test_latency_exception(self):
+        for kwargs in ({'resolution': 0}, {'highest': 0}, {'highest': 'a'}, {'significant_digits': 0},
+                       {'significant_digits': 6}):
+            try:
+                LatencyRecorder(**kwargs)
+                raise AssertionError('failed to raise CodingError for LatencyRecorder({0})'.format(kwargs))
+            except CodingError:
+                pass
+        try:
+            LatencyRecorder().record(-1)
+            raise AssertionError('failed to raise ValueError for negative latency')
+        except ValueError:
+            pass
+        for pct in (0, 101, 'a'):
+            try:
+                LatencyRecorder().percentile(pct)
+                raise AssertionError('failed to raise CodingError for percentile {0}'.format(pct))
+            except CodingError:
+                pass
+        try:
+            LatencyRecorder().merge(LatencyRecorder(significant_digits=3))
+            raise AssertionError('failed to raise CodingError for merging different LatencyRecorders')
+        except CodingError:
+            pass
+
+
+def main():
+    # increase the verbosity
+    # verbosity Python >= 2.7
+    #unittest.main(verbosity=2)
+    log.setLevel(logging.DEBUG)
+    suite = unittest.TestLoader().loadTestsFromTestCase(LatencyRecorderTester)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__':
+    main()
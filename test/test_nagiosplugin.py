@@ -27,12 +27,15 @@ from __future__ import unicode_literals
 import logging
 import os
 import sys
+import threading
+import time
 import unittest
+from collections import OrderedDict
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
-from harisekhon.utils import log, CodingError
-from harisekhon import NagiosPlugin
+from harisekhon.utils import log, CodingError, CriticalError, qquit, is_result_mode
+from harisekhon import NagiosPlugin, Result
 from harisekhon.nagiosplugin import Threshold
 
 class NagiosPluginTester(unittest.TestCase):
@@ -132,6 +135,50 @@ class NagiosPluginTester(unittest.TestCase):
         except CodingError:
             pass
 
+    def test_check_metrics(self):
+        self.plugin.add_metric_thresholds('queue_*', 10, 20)
+        self.plugin.add_metric_thresholds('queue_important', 1, 2)
+        self.plugin.add_metric_thresholds('ratio', critical='@0.5:0.75', integer=False)
+        self.plugin.ok()
+        self.assertEqual(self.plugin.check_metrics([('queue_a', 5), ('queue_important', 0), ('other', 1.5)]),
+                         'queue_a = 5, queue_important = 0, other = 1.5 | ' +
+                         'queue_a=5;10;20 queue_important=0;1;2 other=1.5')
+        self.assertEqual(self.plugin.status, 'OK')
+        self.assertEqual(self.plugin.check_metrics(OrderedDict([('queue_a', 15), ('my queue', 1000000)]), units='c'),
+                         'queue_a = 15 (15 > 10), my queue = 1000000 | ' +
+                         "queue_a=15c;10;20 'my queue'=1000000c")
+        self.assertEqual(self.plugin.status, 'WARNING')
+        self.assertEqual(self.plugin.check_metrics(OrderedDict([('queue_important', 'x'), ('ratio', 0.6)]),
+                                                   units={'ratio': '%'}),
+                         'queue_important = x (not a float!), ratio = 0.6 (0.5 <= 0.6 <= 0.75) | ' +
+                         'ratio=0.6%;;@0.5:0.75')
+        self.assertEqual(self.plugin.status, 'CRITICAL')
+        self.assertEqual(self.plugin.get_metric_thresholds('nonexistent'), (None, None))
+        try:
+            self.plugin.check_metrics([('queue_a', 1)], units='invalid')
+            raise AssertionError('failed to raise CodingError for invalid units passed to check_metrics()')
+        except CodingError:
+            pass
+        try:
+            self.plugin.add_metric_thresholds('queue_b', 'invalid')
+            raise AssertionError('failed to exit for invalid metric threshold')
+        except SystemExit:
+            pass
+
+    def test_check_thresholds_many(self):
+        self.plugin.validate_thresholds('test', 2, 3)
+        self.plugin.ok()
+        self.assertEqual(self.plugin.check_thresholds_many([0, 1, 2], 'test'), [])
+        self.assertEqual(self.plugin.status, 'OK')
+        self.assertEqual(self.plugin.check_thresholds_many([1, 2.5, 4, 'x', 0], 'test'),
+                         [(1, 'WARNING'), (2, 'CRITICAL'), (3, 'CRITICAL')])
+        self.assertEqual(self.plugin.status, 'CRITICAL')
+        try:
+            self.plugin.check_thresholds_many([10], 'nonexistent')
+            raise AssertionError('failed to raise exception for check_thresholds_many() when thresholds are not set')
+        except CodingError:
+            pass
+
     def test_get_perf_thresholds(self):
         self.assertEqual(self.plugin.get_perf_thresholds(), ';;')
 
@@ -198,6 +245,82 @@ class NagiosPluginTester(unittest.TestCase):
                 raise AssertionError('NagiosPlugin failed to exit CRITICAL (2), got exit code {0} instead'\
                                      .format(_.code))
 
+    class ResultNagiosPlugin(NagiosPlugin):
+        def add_options(self):
+            self.add_opt('--value', default='0')
+        def run(self):
+            value = self.get_opt('value')
+            if value == 'sleep':
+                self.sleep(5)
+            elif value == 'blocking':
+                time.sleep(1.2)
+            if value == 'raise':
+                raise CriticalError('value raised')
+            elif value == 'quit':
+                qquit('WARNING', 'quit called directly')
+            self.ok()
+            self.msg = 'value = {0} | value={0}'.format(value)
+
+    def test_execute(self):
+        result = self.ResultNagiosPlugin().execute(['--value', '5'])
+        self.assertTrue(isinstance(result, Result))
+        self.assertEqual(result.status, 'OK')
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(result.msg, 'value = 5')
+        self.assertEqual(result.perfdata, 'value=5')
+        self.assertEqual(result.output, 'OK: value = 5 | value=5')
+        self.assertTrue(result.is_ok())
+        self.assertTrue(result.run_time >= 0)
+        self.assertFalse(is_result_mode())
+
+    def test_execute_non_ok(self):
+        result = self.ResultNagiosPlugin().execute(['--value', 'raise'])
+        self.assertEqual((result.status, result.exit_code, result.msg), ('CRITICAL', 2, 'value raised'))
+        self.assertEqual(result.perfdata, '')
+        result = self.ResultNagiosPlugin().execute(['--value', 'quit'])
+        self.assertEqual((result.status, result.exit_code, result.msg), ('WARNING', 1, 'quit called directly'))
+
+    def test_execute_invalid_option(self):
+        result = self.ResultNagiosPlugin().execute(['--nonexistent'])
+        self.assertEqual(result.status, 'UNKNOWN')
+        self.assertEqual(result.exit_code, 3)
+        self.assertEqual(result.msg, 'no such option: --nonexistent')
+
+    def test_execute_threads(self):
+        results = {}
+        def execute(value):
+            results[value] = self.ResultNagiosPlugin().execute(['--value', value])
+        threads = [threading.Thread(target=execute, args=(str(_),)) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for _ in range(10):
+            self.assertEqual(results[str(_)].output, 'OK: value = {0} | value={0}'.format(_))
+
+    def test_execute_timeout(self):
+        start = time.time()
+        result = self.ResultNagiosPlugin().execute(['--value', 'sleep', '--timeout', '1'])
+        self.assertEqual(result.output, 'UNKNOWN: self timed out after 1 second')
+        self.assertTrue(time.time() - start < 3)
+        # timeouts can't interrupt blocking code in result mode, but it is still reported as timed out
+        result = self.ResultNagiosPlugin().execute(['--value', 'blocking', '--timeout', '1'])
+        self.assertEqual(result.output, 'UNKNOWN: self timed out after 1 second')
+
+    def test_result_quit(self):
+        try:
+            Result('CRITICAL', 'test').quit()
+            raise AssertionError('Result.quit() failed to exit')
+        except SystemExit as _:
+            self.assertEqual(_.code, 2)
+
+    def test_result_invalid_status(self):
+        try:
+            Result('invalidstatus')
+            raise AssertionError('failed to raise CodingError for invalid status passed to Result()')
+        except CodingError:
+            pass
+
     def test_nagiosplugin_abstract(self): # pylint: disable=no-self-use
         try:
             NagiosPlugin() # pylint: disable=abstract-class-instantiated
@@ -0,0 +1,141 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 03:18:40 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+# ============================================================================ #
+#                   PyUnit Tests for HariSekhon.Perfdata
+# ============================================================================ #
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import os
+import sys
+import unittest
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, CodingError
+from harisekhon.nagiosplugin import Perfdata, Threshold
+from harisekhon.nagiosplugin.perfdata import perf_number, perf_range, split_output
+
+
+class PerfdataTester(unittest.TestCase):
+
+    # must prefix with test_ in order for the tests to be called
+
+    # Not using assertRaises >= 2.7 and maintaining compatibility with Python 2.6 servers
+
+    def test_render(self):
+        perfdata = Perfdata()
+        self.assertEqual(str(perfdata), '')
+        self.assertFalse(perfdata)
+        perfdata.add('count', 5) \
+                .add('my time', 0.123456789, 's', warning=1, critical=Threshold('2')) \
+                .add('query_time', 0.5, 's', precision=4) \
+                .add("it's", 99.5, '%', minimum=0, maximum=100) \
+                .add('unknown', None) \
+                .add('range', 7, warning=Threshold('5:10'), critical='@10:20') \
+                .add('big', 12345678901)
+        self.assertEqual(len(perfdata), 7)
+        self.assertEqual(str(perfdata),
+                         "count=5 'my time'=0.123457s;1;2 query_time=0.5000s 'it''s'=99.5%;;;0;100 unknown=U " +
+                         "range=7;5:10;@10:20 big=12345678901")
+        self.assertEqual(perfdata.get('count'), 5)
+        self.assertEqual(perfdata.get('unknown'), None)
+        self.assertEqual(perfdata.get('nonexistent', 'default'), 'default')
+        self.assertEqual(perfdata.labels()[:2], ['count', 'my time'])
+        self.assertEqual(list(perfdata)[1], ('my time', 0.123456789, 's', '1', '2', '', ''))
+
+    def test_add_invalid(self):
+        for (args, kwargs) in (((None, 1), {}), (('', 1), {}), (('label', 1, 'invalid'), {}),
+                               (('label', 1), {'precision': 21})):
+            try:
+                Perfdata().add(*args, **kwargs)
+                raise AssertionError('failed to raise CodingError for Perfdata.add({0}, {1})'.format(args, kwargs))
+            except CodingError:
+                pass
+        for value in ('x', float('inf')):
+            try:
+                Perfdata().add('label', value)
+                raise AssertionError("failed to raise ValueError for Perfdata.add('label', {0!r})".format(value))
+            except ValueError:
+                pass
+
+    def test_parse(self):
+        text = "count=5 'my time'=0.123457s;1;2 query_time=0.5000s 'it''s'=99.5%;;;0;100 unknown=U " + \
+               "range=7;5:10;@10:20 negative=-1.5e2KiB;~:5"
+        perfdata = Perfdata.parse(text)
+        self.assertEqual(str(perfdata), text.replace('-1.5e2', '-150'))
+        self.assertEqual(perfdata.to_dict(),
+                         {'count': 5, 'my time': 0.123457, 'query_time': 0.5, "it's": 99.5, 'unknown': None,
+                          'range': 7, 'negative': -150})
+        self.assertEqual(list(perfdata)[-1], ('negative', -150, 'KiB', '~:5', '', '', ''))
+        self.assertEqual(Perfdata.parse('  '), Perfdata())
+        for invalid in ('a', 'a=', 'a=x', "'a=1", 'a=1;2;3;4;5;6', 'a=1 b', None):
+            try:
+                Perfdata.parse(invalid)
+                raise AssertionError('failed to raise ValueError parsing invalid perfdata: {0}'.format(invalid))
+            except ValueError:
+                pass
+
+    def test_extend(self):
+        perfdata = Perfdata().add('a', 1)
+        perfdata.extend(Perfdata.parse('b=2.50ms;1 c=3KiB'))
+        self.assertEqual(str(perfdata), 'a=1 b=2.50ms;1 c=3KiB')
+        try:
+            perfdata.extend('d=4')
+            raise AssertionError('failed to raise CodingError for non-Perfdata passed to extend()')
+        except CodingError:
+            pass
+
+    def test_perf_number(self):
+        self.assertEqual(perf_number(1000000), '1000000')
+        self.assertEqual(perf_number(1e6), '1000000')
+        self.assertEqual(perf_number(0.1), '0.1')
+        self.assertEqual(perf_number(True), '1')
+        self.assertEqual(perf_number(0.5), '0.5')
+        self.assertEqual(perf_number(1.25), '1.25')
+        self.assertEqual(perf_number(1234.5678901), '1234.56789')
+        # small values aren't rounded to 0 or given exponents
+        self.assertEqual(perf_number(1.2e-7), '0.00000012')
+        self.assertEqual(perf_number(-1.2e-7), '-0.00000012')
+        self.assertEqual(perf_number(0.000123456789), '0.000123457')
+        self.assertEqual(perf_number(1e-20), '0.' + '0' * 19 + '1')
+        self.assertEqual(Perfdata().add('t', 1.2e-7, 's').render(), 't=0.00000012s')
+        self.assertEqual(perf_range(Threshold('5:10')), '5:10')
+        self.assertEqual(perf_range(Threshold('5', simple='lower')), '5:')
+        self.assertEqual(perf_range(Threshold(None, optional=True)), '')
+
+    def test_split_output(self):
+        self.assertEqual(split_output('OK: msg'), ('OK: msg', ''))
+        self.assertEqual(split_output('OK: msg | a=1\nlong output\nmore | b=2\nc=3'),
+                         ('OK: msg\nlong output\nmore', 'a=1 b=2 c=3'))
+
+
+def main():
+    # increase the verbosity
+    # verbosity Python >= 2.7
+    #unittest.main(verbosity=2)
+    log.setLevel(logging.DEBUG)
+    suite = unittest.TestLoader().loadTestsFromTestCase(PerfdataTester)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__':
+    main()
@@ -27,7 +27,15 @@ from __future__ import unicode_literals
 import logging
 import os
 import sys
+import threading
+import time
 import unittest
+try:
+    # Python 3
+    from queue import Queue, Empty
+except ImportError:
+    # Python 2
+    from Queue import Queue, Empty  # pylint: disable=import-error
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
@@ -59,6 +67,30 @@ class PubSubNagiosPluginTester(unittest.TestCase):
             #return 'pretend consumed message'
             return self.publish_message
 
+    class QueuePubSubNagiosPlugin(PubSubNagiosPlugin):
+        def __init__(self):
+            # Python 2.x
+            super(PubSubNagiosPluginTester.QueuePubSubNagiosPlugin, self).__init__()
+            # Python 3.x
+            # super().__init__()
+            self.name = 'test'
+            self.default_port = 80
+            self.queue = Queue()
+            self.drop_every = None
+            self.published = 0
+        def subscribe(self):
+            pass
+        def publish(self):
+            self.published += 1
+            if self.drop_every and self.published % self.drop_every == 0:
+                return
+            self.queue.put(self.publish_message)
+        def consume(self):
+            try:
+                return self.queue.get(timeout=0.1)
+            except Empty:
+                return None
+
     #def setUp(self):
     #    self.plugin = self.SubPubSubNagiosPlugin()
 
@@ -83,6 +115,89 @@ class PubSubNagiosPluginTester(unittest.TestCase):
                 raise AssertionError('PubSubNagiosPlugin failed to exit CRITICAL (2), got exit code {0} instead'
                                      .format(_.code))
 
+    def test_bench(self):
+        result = self.QueuePubSubNagiosPlugin().execute(['--bench-messages', 200, '--concurrency', 4,
+                                                         '--message-size', 100])
+        self.assertEqual(result.status, 'OK')
+        self.assertTrue(result.msg.startswith('test benchmark published 200 messages of 100 bytes from 4 publishers ' +
+                                              'and consumed them back successfully, messages = 200, consumed = 200, ' +
+                                              'lost = 0'))
+        for metric in ('msgs_per_sec', 'bytes_per_sec', 'latency_p50', 'latency_p99', 'publish_latency_max'):
+            self.assertTrue(' {0}='.format(metric) in ' ' + result.perfdata)
+        result = self.QueuePubSubNagiosPlugin().execute(['--bench-secs', 0.2])
+        self.assertEqual(result.status, 'OK')
+        self.assertTrue('and consumed them back successfully' in result.msg)
+
+    def test_bench_stops_consumer(self):
+        plugin = self.QueuePubSubNagiosPlugin()
+        # lost messages keep the consumer waiting for them until the end of the benchmark
+        plugin.drop_every = 10
+        unsubscribed = threading.Event()
+        consume = plugin.consume
+        consumed = []
+        def blocking_consume():
+            # blocks until unsubscribed once all messages are consumed, like a client waiting on the broker
+            if len(consumed) >= 18:
+                unsubscribed.wait(10)
+                return None
+            message = consume()
+            if message is not None:
+                consumed.append(message)
+            return message
+        plugin.consume = blocking_consume
+        plugin.unsubscribe = unsubscribed.set
+        threads = threading.active_count()
+        start = time.time()
+        result = plugin.execute(['--bench-messages', 20, '--sleep', 0.5])
+        self.assertEqual(result.status, 'CRITICAL')
+        self.assertTrue(', 2 LOST,' in result.msg)
+        self.assertTrue(unsubscribed.is_set())
+        self.assertTrue(time.time() - start < 5)
+        self.assertEqual(threading.active_count(), threads)
+
+    def test_bench_lost(self):
+        plugin = self.QueuePubSubNagiosPlugin()
+        plugin.drop_every = 10
+        result = plugin.execute(['--bench-messages', 100, '--sleep', 0.2])
+        self.assertEqual(result.status, 'CRITICAL')
+        self.assertTrue('published 100 messages of' in result.msg)
+        self.assertTrue(', 10 LOST,' in result.msg)
+
+    def test_bench_out_of_order(self):
+        plugin = self.QueuePubSubNagiosPlugin()
+        held = []
+        def publish():
+            # swaps the first two messages
+            plugin.published += 1
+            if plugin.published == 1:
+                held.append(plugin.publish_message)
+                return
+            plugin.queue.put(plugin.publish_message)
+            while held:
+                plugin.queue.put(held.pop())
+        plugin.publish = publish
+        result = plugin.execute(['--bench-messages', 5])
+        self.assertEqual(result.status, 'CRITICAL')
+        self.assertTrue(', 1 OUT OF ORDER,' in result.msg)
+        plugin = self.QueuePubSubNagiosPlugin()
+        held = []
+        plugin.publish = publish
+        self.assertEqual(plugin.execute(['--bench-messages', 5, '--unordered']).status, 'WARNING')
+
+    def test_bench_thresholds(self):
+        result = self.QueuePubSubNagiosPlugin().execute(['--bench-messages', 10,
+                                                         '--bench-warning', 'latency_*=1000',
+                                                         '--bench-critical', 'msgs_per_sec=100000000'])
+        self.assertEqual(result.status, 'CRITICAL')
+        self.assertTrue(', msgs_per_sec = ' in result.msg)
+        self.assertTrue('msgs_per_sec=' in result.perfdata)
+        self.assertTrue('latency_p99=' in result.perfdata)
+        self.assertTrue('e-0' not in result.msg)
+        for args in (['--bench-critical', 'nonexistent=1'], ['--bench-warning', 'latency_p99'],
+                     ['--bench-messages', 'a'], ['--concurrency', 0]):
+            result = self.QueuePubSubNagiosPlugin().execute(['--bench-messages', 10] + args)
+            self.assertEqual(result.status, 'UNKNOWN')
+
     def test_plugin_abstract(self):  # pylint: disable=no-self-use
         try:
             PubSubNagiosPlugin()  # pylint: disable=abstract-class-instantiated
@@ -33,8 +33,9 @@ import requests
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
-from harisekhon.utils import log
+from harisekhon.utils import log, CodingError
 from harisekhon import RequestBS4Handler
+from harisekhon.request_bs4_handler import get_bs4_parser
 
 
 class RequestBS4HandlerTester(unittest.TestCase):
@@ -47,6 +48,16 @@ class RequestBS4HandlerTester(unittest.TestCase):
         def parse(self, soup):
             pass
 
+    class StatusRequestBS4Handler(RequestBS4Handler):
+        parse_only = ('th', 'td')
+        def parse(self, soup):
+            return soup
+
+    class FakeResponse(object):  # pylint: disable=too-few-public-methods
+        content = b'<html><body><div><p>intro</p><table>' + \
+                  b'<tr><th>Uptime:</th><td>5 days</td></tr><tr><th>Version:</th><td>1.2</td></tr>' + \
+                  b'</table></div></body></html>'
+
     # TODO: mock this
     def test_request_bs4_handler(self):
         req = self.SubRequestBS4Handler().get('www.travis-ci.com')
@@ -54,6 +65,40 @@ class RequestBS4HandlerTester(unittest.TestCase):
         self.SubRequestBS4Handler(req)
 
 
+    def test_parse_only(self):
+        soup = self.StatusRequestBS4Handler().__parse__(self.FakeResponse())
+        self.assertEqual(soup.find('p'), None)
+        self.assertEqual(soup.find('th', string='Uptime:').find_next_sibling().get_text(), '5 days')
+        self.assertEqual(soup.find('th', string='Version:').find_next_sibling().get_text(), '1.2')
+        # the whole document by default
+        handler = self.StatusRequestBS4Handler()
+        handler.parse_only = None
+        self.assertEqual(handler.__parse__(self.FakeResponse()).find('p').get_text(), 'intro')
+        handler.parse_only = 'td'
+        self.assertEqual([_.get_text() for _ in handler.__parse__(self.FakeResponse()).find_all('td')],
+                         ['5 days', '1.2'])
+
+    def test_parse_only_invalid(self):
+        handler = self.StatusRequestBS4Handler()
+        for parse_only in ((), ('th', 1), 1):
+            handler.parse_only = parse_only
+            try:
+                handler.get_parse_only()
+                raise AssertionError('failed to raise CodingError for parse_only {0}'.format(parse_only))
+            except CodingError:
+                pass
+
+    def test_parser(self):
+        try:
+            import lxml  # pylint: disable=unused-variable
+            self.assertEqual(get_bs4_parser(), 'lxml')
+        except ImportError:
+            self.assertEqual(get_bs4_parser(), 'html.parser')
+        handler = self.StatusRequestBS4Handler()
+        handler.parser = 'html.parser'
+        self.assertEqual(handler.__parse__(self.FakeResponse()).find('td').get_text(), '5 days')
+
+
 def main():
     # increase the verbosity
     # verbosity Python >= 2.7
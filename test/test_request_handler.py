@@ -27,14 +27,84 @@ from __future__ import print_function
 import logging
 import os
 import sys
+import threading
+import time
 import unittest
+try:
+    # Python 3
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+except ImportError:
+    # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
 # inspect.getfile(inspect.currentframe()) # filename
 import requests
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
-from harisekhon.utils import log, CriticalError
+from harisekhon.utils import log, CriticalError, CodingError
 from harisekhon import RequestHandler
+from harisekhon.deadline import Deadline, DeadlineExceeded
+
+
+class LocalHTTPRequestHandler(BaseHTTPRequestHandler):
+
+    # keep-alive
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        # records the client port of each request to tell whether connections are being reused
+        self.server.client_ports.append(self.client_address[1])
+        status = 200
+        path = self.path.split('?')[0]
+        if path.startswith('/status/'):
+            status = int(path.split('/')[2])
+        elif path.startswith('/sleep/'):
+            time.sleep(float(path.split('/')[2]))
+        if path.startswith('/size/'):
+            body = b'x' * int(path.split('/')[2])
+        else:
+            body = '{{"path": "{0}"}}'.format(self.path).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Set-Cookie', 'session=test')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class LocalHTTPServer(ThreadingMixIn, HTTPServer):
+
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), LocalHTTPRequestHandler)
+        self.client_ports = []
+        self.url = 'http://127.0.0.1:{0}'.format(self.server_address[1])
+
+
+class ListLogHandler(logging.Handler):
+
+    def __init__(self):
+        logging.Handler.__init__(self)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+class UnreadableResponse(object):
+
+    status_code = 200
+    reason = 'OK'
+
+    @property
+    def content(self):
+        raise AssertionError('response content accessed')
 
 
 class RequestHandlerTester(unittest.TestCase):
@@ -43,6 +113,178 @@ class RequestHandlerTester(unittest.TestCase):
 
     # Not using assertRaises >= 2.7 and maintaining compatibility with Python 2.6 servers
 
+    @classmethod
+    def setUpClass(cls):
+        cls.server = LocalHTTPServer()
+        cls.server_thread = threading.Thread(target=cls.server.serve_forever)
+        cls.server_thread.daemon = True
+        cls.server_thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        RequestHandler.close_sessions()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        RequestHandler.close_sessions()
+        del self.server.client_ports[:]
+        self.log_level = log.level
+        self.log_handler = ListLogHandler()
+        log.addHandler(self.log_handler)
+
+    def tearDown(self):
+        log.removeHandler(self.log_handler)
+        log.setLevel(self.log_level)
+
+    def test_request_handler_log_output_not_debug(self):
+        log.setLevel(logging.INFO)
+        RequestHandler().log_output(UnreadableResponse())
+        self.assertEqual(self.log_handler.messages, [])
+
+    def test_request_handler_log_output_truncated(self):
+        log.setLevel(logging.DEBUG)
+        request_handler = RequestHandler()
+        request_handler.log_content_max_bytes = 100
+        req = request_handler.get(self.server.url + '/size/1000')
+        self.assertEqual(len(req.content), 1000)
+        content_log = [_ for _ in self.log_handler.messages if _.startswith('content:')][0]
+        self.assertIn('x' * 100, content_log)
+        self.assertIn('\n... (truncated to 100 of 1000 bytes)', content_log)
+        self.assertNotIn('x' * 101, content_log)
+
+    def test_request_handler_stream(self):
+        log.setLevel(logging.DEBUG)
+
+        class StreamRequestHandler(RequestHandler):
+            def parse(self, req):
+                self.num_bytes = sum([len(_) for _ in req.iter_content(chunk_size=1000)])  # pylint: disable=W0201
+                return self.num_bytes
+
+        request_handler = StreamRequestHandler(stream=True)
+        for _ in range(2):
+            request_handler.get(self.server.url + '/size/100000')
+            self.assertEqual(request_handler.num_bytes, 100000)
+        self.assertIn('content: not logged in stream mode', self.log_handler.messages)
+        # fully consumed streams release their connections back to the pool for reuse
+        self.assertEqual(len(set(self.server.client_ports)), 1)
+        (results, _) = request_handler.get_many([self.server.url + '/size/10'])
+        self.assertEqual(list(results.values()), [10])
+
+    def test_request_handler_stream_unread(self):
+        class UnreadRequestHandler(RequestHandler):
+            def parse(self, req):
+                return req.raw.read(10)
+
+        req = UnreadRequestHandler(stream=True).get(self.server.url + '/size/100000')
+        self.assertEqual(req.status_code, 200)
+
+    def test_request_handler_session_reuse(self):
+        request_handler = RequestHandler()
+        for _ in range(3):
+            req = request_handler.get(self.server.url + '/test')
+            self.assertEqual(req.status_code, 200)
+        # different handler instances share the same pooled session and connection
+        RequestHandler().get(self.server.url + '/test')
+        self.assertEqual(len(self.server.client_ports), 4)
+        self.assertEqual(len(set(self.server.client_ports)), 1)
+        self.assertTrue(RequestHandler().session is request_handler.session)
+
+    def test_request_handler_session_pool_settings(self):
+        session = RequestHandler(pool_maxsize=2, max_retries=1).session
+        self.assertFalse(session is RequestHandler().session)
+        self.assertTrue(session is RequestHandler.get_session(pool_maxsize=2, max_retries=1))
+        self.assertEqual(session.get_adapter('http://localhost').max_retries.total, 1)
+
+    def test_request_handler_session_no_cookies(self):
+        request_handler = RequestHandler()
+        request_handler.get(self.server.url + '/test')
+        self.assertEqual(len(request_handler.session.cookies), 0)
+
+    def test_request_handler_no_keep_alive(self):
+        request_handler = RequestHandler(keep_alive=False)
+        self.assertEqual(request_handler.session, None)
+        for _ in range(2):
+            request_handler.get(self.server.url + '/test')
+        self.assertEqual(len(set(self.server.client_ports)), 2)
+
+    def test_request_handler_session_status_failure(self):
+        try:
+            RequestHandler().get(self.server.url + '/status/500')
+            raise AssertionError('failed to raise exception for 500 status code')
+        except CriticalError:
+            pass
+
+    def test_request_handler_get_many(self):
+        urls = [self.server.url + '/node{0}'.format(_) for _ in range(20)]
+        (results, errors) = RequestHandler().get_many(urls + [urls[0]], max_workers=5)
+        self.assertEqual(list(results), urls)
+        self.assertEqual(results[urls[3]], b'{"path": "/node3"}')
+        self.assertEqual(errors, {})
+
+    def test_request_handler_get_many_errors(self):
+        urls = [self.server.url + '/ok', self.server.url + '/status/500', '127.0.0.1:1', self.server.url + '/ok2']
+        (results, errors) = RequestHandler().get_many(urls)
+        self.assertEqual(list(results), [urls[0], urls[3]])
+        self.assertEqual(list(errors), [urls[1], urls[2]])
+        for error in errors.values():
+            self.assertTrue(isinstance(error, CriticalError))
+        self.assertTrue(str(errors[urls[1]]).startswith('500 '))
+
+    def test_request_handler_get_many_concurrent(self):
+        urls = [self.server.url + '/sleep/0.5?{0}'.format(_) for _ in range(6)]
+        start = time.time()
+        (results, errors) = RequestHandler().get_many(urls, max_workers=6)
+        self.assertTrue(time.time() - start < 2)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(errors, {})
+
+    def test_request_handler_get_many_timeout(self):
+        (results, errors) = RequestHandler().get_many([self.server.url + '/sleep/2'], timeout=0.2)
+        self.assertEqual(results, {})
+        self.assertEqual(len(errors), 1)
+
+    def test_request_handler_deadline(self):
+        start = time.time()
+        with Deadline(0.3):
+            try:
+                RequestHandler().get(self.server.url + '/sleep/2')
+                raise AssertionError('failed to raise DeadlineExceeded for request exceeding the deadline')
+            except DeadlineExceeded as _:
+                self.assertEqual(str(_), 'self timed out after 0.3 seconds')
+            try:
+                RequestHandler().get_many([self.server.url + '/sleep/2?{0}'.format(_) for _ in range(2)])
+                raise AssertionError('failed to raise DeadlineExceeded from get_many() once past the deadline')
+            except DeadlineExceeded:
+                pass
+        self.assertTrue(time.time() - start < 1.5)
+        self.assertTrue(Deadline.current() is None)
+
+    def test_request_handler_get_many_parse(self):
+        class JsonRequestHandler(RequestHandler):
+            def parse(self, req):
+                return req.json()['path']
+        (results, _) = JsonRequestHandler().get_many([self.server.url + '/a', self.server.url + '/b'])
+        self.assertEqual(list(results.values()), ['/a', '/b'])
+        self.assertEqual(RequestHandler().get_many([]), ({}, {}))
+
+    @staticmethod
+    def test_request_handler_get_many_exception():
+        try:
+            RequestHandler().get_many(['127.0.0.1:1'], max_workers=0)
+            raise AssertionError('failed to raise CodingError for max_workers=0')
+        except CodingError:
+            pass
+
+    @staticmethod
+    def test_request_handler_pool_settings_exception():
+        for kwargs in ({'pool_connections': 0}, {'pool_maxsize': 'a'}, {'max_retries': -1}):
+            try:
+                RequestHandler(**kwargs)
+                raise AssertionError('failed to raise CodingError for RequestHandler({0})'.format(kwargs))
+            except CodingError:
+                pass
+
     def test_request_handler(self):
         req = RequestHandler().get('www.google.com')
         self.assertTrue(isinstance, requests.Response)
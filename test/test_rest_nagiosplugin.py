@@ -24,14 +24,16 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import io
 import logging
 import os
 import sys
+import time
 import unittest
 libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(libdir)
 # pylint: disable=wrong-import-position
-from harisekhon.utils import log, InvalidOptionException
+from harisekhon.utils import log, InvalidOptionException, UnknownError
 from harisekhon.nagiosplugin import RestNagiosPlugin
 
 class RestNagiosPluginTester(unittest.TestCase):
@@ -54,9 +56,67 @@ class RestNagiosPluginTester(unittest.TestCase):
         def parse(self, req):
             self.msg = 'unittest message'
 
+    class JsonPathsRestNagiosPlugin(RestNagiosPlugin):
+        def __init__(self):
+            # Python 2.x
+            super(RestNagiosPluginTester.JsonPathsRestNagiosPlugin, self).__init__()
+            # Python 3.x
+            # super().__init__()
+            self.name = 'test'
+            self.json = True
+            self.json_paths = ['nodes.*.name', 'cluster.version']
+            self.auth = False
+        def parse_json(self, json_data):
+            self.msg = 'nodes = {0}, version = {1}'.format(','.join(json_data['nodes.*.name']),
+                                                           json_data['cluster.version'][0])
+
+    class FakeStreamResponse(object):
+        def __init__(self, content):
+            self.raw = io.BytesIO(content)
+            self.closed = False
+        def close(self):
+            self.closed = True
+
     #def setUp(self):
     #    self.plugin = self.SubRestNagiosPlugin()
 
+    def test_process_json_paths(self):
+        plugin = self.JsonPathsRestNagiosPlugin()
+        plugin.request.stream = True
+        req = self.FakeStreamResponse(b'{"nodes": {"x": {"name": "node1", "stats": {}}, "y": {"name": "node2"}}, ' +
+                                      b'"cluster": {"version": "1.2.3"}}')
+        plugin.process_json_paths(req)
+        self.assertEqual(plugin.msg, 'nodes = node1,node2, version = 1.2.3')
+        self.assertTrue(req.closed)
+
+    def test_process_json_paths_exception(self):
+        plugin = self.JsonPathsRestNagiosPlugin()
+        plugin.request.stream = True
+        for content in (b'{"nodes": ', b'{"nodes": {}}'):
+            req = self.FakeStreamResponse(content)
+            try:
+                plugin.process_json_paths(req)
+                raise AssertionError('failed to raise UnknownError for {0}'.format(content))
+            except UnknownError:
+                pass
+            self.assertTrue(req.closed)
+
+    def test_stream_query_time(self):
+        plugin = self.JsonPathsRestNagiosPlugin()
+        plugin.query = lambda: self.FakeStreamResponse(b'{"nodes": {"x": {"name": "node1"}}, ' +
+                                                       b'"cluster": {"version": "1.2.3"}}')
+        process_json_paths = plugin.process_json_paths
+        def slow_process_json_paths(req):
+            time.sleep(0.2)
+            process_json_paths(req)
+        plugin.process_json_paths = slow_process_json_paths
+        result = plugin.execute(['-H', 'localhost', '-P', 80])
+        self.assertEqual(result.status, 'OK')
+        self.assertEqual(result.msg, 'nodes = node1, version = 1.2.3')
+        # includes streaming the body rather than only the time to the response headers
+        query_time = float(result.perfdata.split('query_time=')[1].split('s')[0])
+        self.assertTrue(query_time >= 0.2, 'query_time {0} excludes reading the stream'.format(query_time))
+
     def test_exit_0(self):
         plugin = self.SubRestNagiosPlugin()
         try:
@@ -0,0 +1,270 @@
+#  vim:ts=4:sts=4:sw=4:et
+#
+#  Author: Hari Sekhon
+#  Date: 2026-10-19 03:58:21 +0100 (Mon, 19 Oct 2026)
+#
+#  https://github.com/HariSekhon/pylib
+#
+#  License: see accompanying Hari Sekhon LICENSE file
+#
+#  If you're using my code you're welcome to connect with me on LinkedIn and optionally send me feedback
+#  to help improve or steer this or other code I publish
+#
+#  https://www.linkedin.com/in/HariSekhon
+#
+
+"""
+# ============================================================================ #
+#                   PyUnit Tests for HariSekhon.ResultCache
+# ============================================================================ #
+"""
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+libdir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(libdir)
+# pylint: disable=wrong-import-position
+from harisekhon.utils import log, qquit, CodingError, CriticalError
+from harisekhon.nagiosplugin import NagiosPlugin, ResultCache
+
+
+class ResultCacheTester(unittest.TestCase):
+
+    # must prefix with test_ in order for the tests to be called
+
+    # Not using assertRaises >= 2.7 and maintaining compatibility with Python 2.6 servers
+
+    class CachedNagiosPlugin(NagiosPlugin):
+        runs = 0
+        status_to_return = 'OK'
+
+        def __init__(self):
+            # Python 2.x
+            super(ResultCacheTester.CachedNagiosPlugin, self).__init__()
+            # Python 3.x
+            # super().__init__()
+            self.result_cache_ttl_default = 0
+
+        def add_options(self):
+            self.add_opt('-H', '--host')
+
+        def run(self):
+            ResultCacheTester.CachedNagiosPlugin.runs += 1
+            if self.status_to_return == 'CRITICAL':
+                raise CriticalError('run {0}'.format(self.runs))
+            self.status = self.status_to_return
+            self.msg = 'run {0} | runs={0}'.format(self.runs)
+
+    class QuitCachedNagiosPlugin(CachedNagiosPlugin):
+        quit_in = 'end'
+
+        def run(self):
+            # Python 2.x
+            super(ResultCacheTester.QuitCachedNagiosPlugin, self).run()
+            # Python 3.x
+            # super().run()
+            if self.quit_in == 'run':
+                qquit('WARNING', 'quit in run {0}'.format(self.runs))
+
+        def end(self):
+            qquit('CRITICAL', 'quit in end {0}'.format(self.runs))
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = ResultCache(60, stale=60, cache_dir=self.cache_dir)
+        os.environ['HARISEKHON_CACHE_DIR'] = self.cache_dir
+        self.CachedNagiosPlugin.runs = 0
+        self.CachedNagiosPlugin.status_to_return = 'OK'
+
+    def tearDown(self):
+        del os.environ['HARISEKHON_CACHE_DIR']
+        shutil.rmtree(self.cache_dir)
+
+    @staticmethod
+    def age(cache, key, secs):
+        # rewrites the cached result as if it was stored secs ago
+        (status, msg, _) = cache.get(key)
+        now = time.time
+        try:
+            time.time = lambda: now() - secs
+            cache.set(key, status, msg)
+        finally:
+            time.time = now
+
+    def test_get_set(self):
+        key = ResultCache.make_key('check', {'host': 'a', 'port': 80})
+        self.assertEqual(key, ResultCache.make_key('check', {'port': 80, 'host': 'a'}))
+        self.assertNotEqual(key, ResultCache.make_key('check', {'host': 'b', 'port': 80}))
+        self.assertEqual(self.cache.get(key), None)
+        self.cache.set(key, 'WARNING', 'msg | perf=1')
+        (status, msg, age) = self.cache.get(key)
+        self.assertEqual((status, msg), ('WARNING', 'msg | perf=1'))
+        self.assertTrue(self.cache.is_fresh(age))
+        self.age(self.cache, key, 90)
+        self.assertFalse(self.cache.is_fresh(self.cache.get(key)[2]))
+        self.age(self.cache, key, 150)
+        self.assertEqual(self.cache.get(key), None)
+
+    def test_lock(self):
+        self.assertTrue(self.cache.lock('key'))
+        self.assertFalse(self.cache.lock('key'))
+        self.cache.unlock('key')
+        self.assertTrue(self.cache.lock('key'))
+        # abandoned locks are taken over
+        cache = ResultCache(60, cache_dir=self.cache_dir, lock_secs=0)
+        time.sleep(0.01)
+        self.assertTrue(cache.lock('key'))
+
+    def test_evict(self):
+        cache = ResultCache(60, cache_dir=self.cache_dir, max_entries=3)
+        for index in range(5):
+            cache.set(str(index), 'OK', index)
+            # soonest to expire are evicted first
+            time.sleep(0.01)
+        self.assertEqual(sorted(os.listdir(self.cache_dir)), ['2.json', '3.json', '4.json'])
+        ResultCache(0, cache_dir=self.cache_dir).set('expired', 'OK', '')
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, 'expired.json')))
+
+    def test_unsafe_cache_dir(self):
+        self.cache.set('key', 'OK', 'msg')
+        self.assertEqual(os.stat(self.cache_dir).st_mode & 0o777, 0o700)
+        self.assertEqual(self.cache.get('key')[:2], ('OK', 'msg'))
+        # another user could plant results in a group or other writable dir
+        os.chmod(self.cache_dir, 0o777)
+        try:
+            self.assertFalse(self.cache.is_safe())
+            self.assertEqual(self.cache.get('key'), None)
+            self.cache.set('key2', 'OK', 'msg')
+            self.assertFalse(os.path.exists(os.path.join(self.cache_dir, 'key2.json')))
+        finally:
+            os.chmod(self.cache_dir, 0o700)
+        # created private
+        cache = ResultCache(60, cache_dir=os.path.join(self.cache_dir, 'new'))
+        cache.set('key', 'OK', 'msg')
+        self.assertEqual(os.stat(cache.cache_dir).st_mode & 0o777, 0o700)
+        self.assertTrue(cache.is_safe())
+
+    def test_set_failure_removes_tmp(self):
+        rename = os.rename
+        try:
+            os.rename = lambda *args: os.remove('/nonexistent')
+            self.cache.set('key', 'OK', 'msg')
+        finally:
+            os.rename = rename
+        self.assertEqual([_ for _ in os.listdir(self.cache_dir) if _.endswith('.tmp')], [])
+
+    def test_result_cache_exception(self):
+        for kwargs in ({'ttl': -1}, {'ttl': 'a'}, {'ttl': 1, 'stale': -1}, {'ttl': 1, 'max_entries': 0}):
+            try:
+                ResultCache(**kwargs)
+                raise AssertionError('failed to raise CodingError for ResultCache({0})'.format(kwargs))
+            except CodingError:
+                pass
+        try:
+            self.cache.set('key', 'BAD', '')
+            raise AssertionError('failed to raise CodingError for invalid status passed to ResultCache.set()')
+        except CodingError:
+            pass
+
+    def test_plugin_cache(self):
+        # disabled by default
+        for _ in range(2):
+            result = self.CachedNagiosPlugin().execute(['-H', 'a'])
+        self.assertEqual(self.CachedNagiosPlugin.runs, 2)
+        self.assertEqual(result.msg, 'run 2')
+        for _ in range(3):
+            result = self.CachedNagiosPlugin().execute(['-H', 'a', '--cache-ttl', 60])
+            self.assertEqual(result.status, 'OK')
+            self.assertEqual(result.msg, 'run 3')
+            self.assertEqual(result.perfdata, 'runs=3')
+        self.assertEqual(self.CachedNagiosPlugin.runs, 3)
+        # options which don't change the result share the cache, others don't
+        self.assertEqual(self.CachedNagiosPlugin().execute(['-H', 'a', '--cache-ttl', 60, '-t', 5]).msg, 'run 3')
+        self.assertEqual(self.CachedNagiosPlugin().execute(['-H', 'b', '--cache-ttl', 60]).msg, 'run 4')
+        self.assertEqual(len([_ for _ in os.listdir(os.path.join(self.cache_dir, 'results'))
+                              if _.endswith('.json')]), 2)
+
+    def test_plugin_cache_stale(self):
+        plugin = self.CachedNagiosPlugin()
+        plugin.execute(['--cache-ttl', 1, '--cache-stale', 60])
+        key = plugin.result_cache_key()
+        cache = ResultCache(1, stale=60)
+        self.assertEqual(cache.get(key)[:2], ('OK', 'run 1 | runs=1'))
+        self.age(cache, key, 5)
+        # another invocation is already refreshing so the stale result is returned
+        cache.lock(key)
+        self.assertEqual(self.CachedNagiosPlugin().execute(['--cache-ttl', 1, '--cache-stale', 60]).msg, 'run 1')
+        self.assertEqual(self.CachedNagiosPlugin.runs, 1)
+        cache.unlock(key)
+        self.assertEqual(self.CachedNagiosPlugin().execute(['--cache-ttl', 1, '--cache-stale', 60]).msg, 'run 2')
+        self.assertTrue(cache.lock(key))
+
+    def test_plugin_cache_qquit(self):
+        for quit_in in ('end', 'run'):
+            self.QuitCachedNagiosPlugin.quit_in = quit_in
+            plugin = self.QuitCachedNagiosPlugin()
+            result = plugin.execute(['-H', quit_in, '--cache-ttl', 1, '--cache-stale', 60])
+            key = plugin.result_cache_key()
+            cache = ResultCache(1, stale=60)
+            expected = cache.get(key)[:2]
+            self.assertEqual(expected, (result.status, result.msg))
+            # the refresh lock is released
+            self.assertTrue(cache.lock(key))
+            cache.unlock(key)
+            runs = self.QuitCachedNagiosPlugin.runs
+            self.assertEqual(self.QuitCachedNagiosPlugin().execute(['-H', quit_in, '--cache-ttl', 1]).msg,
+                             expected[1])
+            self.assertEqual(self.QuitCachedNagiosPlugin.runs, runs)
+            # and likewise when refreshing the stale result outside of result mode
+            self.age(cache, key, 5)
+            argv = sys.argv
+            sys.argv = ['check', '-H', quit_in, '--cache-ttl', '1', '--cache-stale', '60']
+            try:
+                self.QuitCachedNagiosPlugin().main()
+                raise AssertionError('plugin failed to quit')
+            except SystemExit:
+                pass
+            finally:
+                sys.argv = argv
+            self.assertEqual(self.QuitCachedNagiosPlugin.runs, runs + 1)
+            (status, msg, age) = cache.get(key)
+            self.assertEqual((status, msg), (expected[0], expected[1].replace(str(runs), str(runs + 1))))
+            self.assertTrue(cache.is_fresh(age))
+            self.assertTrue(cache.lock(key))
+        self.assertEqual(expected, ('WARNING', 'quit in run 3'))
+
+    def test_plugin_cache_status(self):
+        self.CachedNagiosPlugin.status_to_return = 'CRITICAL'
+        for _ in range(2):
+            result = self.CachedNagiosPlugin().execute(['--cache-ttl', 60])
+            self.assertEqual((result.status, result.msg), ('CRITICAL', 'run 1'))
+        # UNKNOWN results aren't cached
+        self.CachedNagiosPlugin.status_to_return = 'UNKNOWN'
+        for _ in range(2):
+            self.CachedNagiosPlugin().execute(['-H', 'unknown', '--cache-ttl', 60])
+        self.assertEqual(self.CachedNagiosPlugin.runs, 3)
+        result = self.CachedNagiosPlugin().execute(['--cache-ttl', 'a'])
+        self.assertEqual(result.status, 'UNKNOWN')
+        self.assertTrue('cache ttl' in result.msg)
+
+
+def main():
+    # increase the verbosity
+    # verbosity Python >= 2.7
+    #unittest.main(verbosity=2)
+    log.setLevel(logging.DEBUG)
+    suite = unittest.TestLoader().loadTestsFromTestCase(ResultCacheTester)
+    unittest.TextTestRunner(verbosity=2).run(suite)
+
+if __name__ == '__main__':
+    main()
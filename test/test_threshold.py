@@ -85,6 +85,42 @@ class NagiosThresholdTester(unittest.TestCase):
         self.assertFalse(self.threshold_range_inverted.check(4))
         self.assertFalse(self.threshold_range_inverted.check(11))
 
+    def test_threshold_check_not_float(self):
+        for result in (None, 'x', -1, float('nan')):
+            self.assertEqual(self.threshold.check(result), '(not a float!)')
+        self.assertEqual(self.threshold.check('6'), '(6 > 5)')
+        self.assertEqual(self.threshold_lower.check(4.5), '(4.5 < 5)')
+        self.assertEqual(self.threshold_range_inverted.check(7), '(5 <= 7 <= 10)')
+        self.assertEqual(Threshold(None, optional=True).check('x'), '')
+
+    def test_threshold_check_many(self):
+        results = [0, 4, 5, 6, 10, 11, -1, 'x', None, '7', float('nan'), float('inf')]
+        for threshold in (self.threshold, self.threshold_lower, self.threshold_range, self.threshold_range_inverted,
+                          self.threshold_float, Threshold(None, optional=True)):
+            expected = [index for (index, result) in enumerate(results) if threshold.check(result)]
+            self.assertEqual(threshold.check_many(results), expected)
+            self.assertEqual(threshold.check_many(iter(results)), expected)
+            # large enough to use NumPy if available
+            self.assertEqual(threshold.check_many([_ for _ in results if _ not in ('x', None)] * 20),
+                             [index for (index, result)
+                              in enumerate([_ for _ in results if _ not in ('x', None)] * 20)
+                              if threshold.check(result)])
+        self.assertEqual(self.threshold.check_many([]), [])
+
+    def test_threshold_compile(self):
+        compiled = self.threshold_range.compiled
+        self.assertEqual((compiled.lower, compiled.upper, compiled.invert), (5, 10, False))
+        self.assertTrue(self.threshold_range_inverted.compiled.invert)
+        try:
+            compiled.other = 1
+            raise AssertionError('failed to raise AttributeError setting non-slot attribute on CompiledThreshold')
+        except AttributeError:
+            pass
+        self.threshold_range.thresholds['upper'] = 20
+        self.threshold_range.compile()
+        self.assertFalse(self.threshold_range.check(15))
+        self.assertTrue(self.threshold_range.compiled.breached(21))
+
     @staticmethod
     def test_invalid_max_upper_boundary():
         try:
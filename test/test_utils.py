@@ -24,9 +24,14 @@ from __future__ import division
 from __future__ import print_function
 #from __future__ import unicode_literals
 
+import inspect
 import logging
 import os
+import shutil
+import subprocess
 import sys
+import tempfile
+import threading
 import unittest
 # unittest2 from pypi works for Python 2.4-2.6
 # import unittest2
@@ -150,6 +155,17 @@ class UtilsTester(unittest.TestCase):
             if _.code != 2:
                 raise AssertionError("incorrect exit code '%s' raised by qquit(wrongstatus, test)" % _.code)
 
+    def test_qquit_result_mode(self):
+        set_result_mode(True)
+        try:
+            qquit('WARNING', 'test')
+            raise AssertionError('failed to raise QuitException from qquit(WARNING, test) in result mode')
+        except QuitException as _:
+            self.assertEqual((_.status, _.msg, _.code), ('WARNING', 'test', 1))
+        finally:
+            set_result_mode(False)
+        self.assertFalse(is_result_mode())
+
     def test_usage(self):
         from optparse import OptionParser
         parser = OptionParser()
@@ -181,6 +197,40 @@ class UtilsTester(unittest.TestCase):
         # comes out as utrunner.py in IDE or python2.7/runpy.py
         # self.assertEqual('test_utils.py', get_topfile())
 
+    def test_set_topfile(self):
+        topfile = get_topfile()
+        set_topfile(__file__)
+        try:
+            self.assertEqual(get_topfile(), __file__)
+            # only in this thread
+            topfiles = []
+            thread = threading.Thread(target=lambda: topfiles.append(get_topfile()))
+            thread.start()
+            thread.join()
+            self.assertEqual(topfiles, [topfile])
+        finally:
+            set_topfile(None)
+        self.assertEqual(get_topfile(), topfile)
+
+    def test_get_caller(self):
+        def inner():
+            return get_caller()
+        def outer():
+            return inner()
+        self.assertEqual(outer(), 'outer')
+        self.assertEqual(get_caller(depth=10000), None)
+
+    def test_frames(self):
+        frame = get_frame()
+        self.assertEqual(frame.f_code.co_name, 'test_frames')
+        self.assertEqual(get_frame(1), frame.f_back)
+        self.assertEqual(get_frame(10000), None)
+        frames = list(iter_frames())
+        self.assertEqual([_.f_code.co_name for _ in frames], [_[3] for _ in inspect.stack()])
+        self.assertEqual(list(iter_frames(1))[0], frame.f_back)
+        self.assertEqual(get_bottom_frame(), frames[-1])
+        self.assertEqual(get_bottom_frame().f_code.co_filename, inspect.getfile(inspect.stack()[-1][0]))
+
     def test_get_file_version(self):
         filename = os.path.join(libdir, 'harisekhon', 'utils.py')
         version = get_file_version(filename)
@@ -193,6 +243,47 @@ class UtilsTester(unittest.TestCase):
     def test_get_file_github_repo(self):
         self.assertEqual(get_file_github_repo(__file__), 'https://github.com/HariSekhon/pylib')
 
+    def test_get_file_metadata(self):
+        metadata = get_file_metadata(os.path.join(libdir, 'harisekhon', 'utils.py'))
+        self.assertEqual(metadata['version'], utils.__version__)
+        self.assertEqual(metadata['docstring'], inspect.cleandoc(utils.__doc__))
+        self.assertEqual(metadata['github_repo'], 'https://github.com/HariSekhon/pylib')
+        tmpdir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmpdir, 'test.py')
+            for (content, docstring, version) in (
+                    ('#!/usr/bin/env python\n\n"""\n  my docstring\n"""\n__version__ = "0.1"\n', 'my docstring', '0.1'),
+                    ("'one' 'two'  # comment\n__version__ = u'1.2.3'  # comment\n", 'onetwo', '1.2.3'),
+                    ('("parenthesized")\n__version__ = ("0.2")\n', 'parenthesized', '0.2'),
+                    ('"not docstring".upper()\ndef f():\n    __version__ = "0.3"\n', None, None),
+                    ('import os\n"""not docstring"""\n', None, None),
+                    ('', None, None)):
+                with open(filename, 'w') as filehandle:
+                    filehandle.write(content)
+                # set mtime explicitly as the size can match between rewrites within the same second
+                os.utime(filename, (len(content), len(content)))
+                metadata = get_file_metadata(filename)
+                self.assertEqual((metadata['docstring'], metadata['version']), (docstring, version))
+                self.assertEqual(get_file_docstring(filename), docstring)
+                self.assertEqual(get_file_version(filename), version)
+            # on-disk cache is used when $HARISEKHON_CACHE_DIR is set
+            os.environ['HARISEKHON_CACHE_DIR'] = os.path.join(tmpdir, 'cache')
+            try:
+                with open(filename, 'w') as filehandle:
+                    filehandle.write('"""cached"""\n')
+                os.utime(filename, (1, 1))
+                self.assertEqual(get_file_docstring(filename), 'cached')
+                self.assertEqual(len(os.listdir(os.path.join(tmpdir, 'cache'))), 1)
+                utils._file_metadata.clear()  # pylint: disable=protected-access
+                self.assertEqual(get_file_docstring(filename), 'cached')
+                with open(filename, 'w') as filehandle:
+                    filehandle.write('"""changed"""\n')
+                self.assertEqual(get_file_docstring(filename), 'changed')
+            finally:
+                del os.environ['HARISEKHON_CACHE_DIR']
+        finally:
+            shutil.rmtree(tmpdir)
+
     def test_find_git_root(self):
         gitroot = find_git_root(__file__)
         if os.path.exists('.git'):
@@ -314,6 +405,7 @@ class UtilsTester(unittest.TestCase):
 
     def test_check_tldcount(self):
         utils._check_tldcount()
+        tlds = utils._tlds
         log.debug('resetting _tlds to empty')
         utils._tlds = set()
         try:
@@ -321,6 +413,9 @@ class UtilsTester(unittest.TestCase):
             raise AssertionError('check_tldcount() failed to raise exception before IANA list loaded')
         except CodingError:
             pass
+        finally:
+            # TLDs are lazy loaded so other tests may be the first to use them
+            utils._tlds = tlds
 
     def test_load_tlds(self):
         # check we can't accidentally double load the IANA list
@@ -331,7 +426,7 @@ class UtilsTester(unittest.TestCase):
         utils._load_tlds('fake_tld.txt')
         os.system('rm fake_tld.txt')
         # artifically double load tlds and check
-        tlds = utils._tlds
+        tlds = set(utils._tlds)
         utils._tlds.clear()
         for x in range(2000):
             utils._tlds.add(x)
@@ -345,6 +440,78 @@ class UtilsTester(unittest.TestCase):
         # reset the TLDs
         utils._tlds = tlds
 
+    def test_tlds_lazy_load(self):
+        self.assertTrue(isStr(utils.tld_regex))
+        self.assertTrue(isStr(utils.host_regex))
+        try:
+            utils.nonexistent_regex  # pylint: disable=pointless-statement
+            raise AssertionError('failed to raise AttributeError for nonexistent module attribute')
+        except AttributeError:
+            pass
+        # check that simply importing utils in a fresh interpreter doesn't load the TLDs or build the TLD regexes
+        (filehandle, script) = tempfile.mkstemp(suffix='.py')
+        os.write(filehandle, '\n'.join([
+            'import sys',
+            'sys.path.insert(0, {0!r})'.format(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+            'from harisekhon import utils',
+            "print(len(utils._tlds), 'domain_regex' in vars(utils))",
+            "print(utils.isDomain('harisekhon.com'))",
+            "print(len(utils._tlds) > 1000, 'domain_regex' in vars(utils))",
+            'utils.domain_regex',
+            "print('domain_regex' in vars(utils))",
+        ]).encode('utf-8'))
+        os.close(filehandle)
+        try:
+            output = subprocess.check_output([sys.executable, script]).decode('utf-8').split('\n')
+        finally:
+            os.remove(script)
+        self.assertEqual(output[0], '0 False')
+        self.assertEqual(output[1], 'True')
+        # validation uses the TLD set directly and doesn't need to build the regexes
+        self.assertEqual(output[2], 'True False')
+        self.assertEqual(output[3], 'True')
+
+    def test_anchored_regex(self):
+        regex = utils._anchored_regex('host_regex')
+        self.assertTrue(regex is utils._anchored_regex('host_regex'))
+        self.assertTrue(utils._anchored_regex('version_regex').match('1.2.3'))
+        self.assertFalse(utils._anchored_regex('version_regex').match('1.2.3a'))
+        self.assertFalse(utils._anchored_regex('version_regex').match('1.2.3\n'))
+        self.assertFalse(isIP('10.10.10.1\n'))
+        self.assertFalse(isInt('1\n'))
+        try:
+            utils._anchored_regex('log')
+            raise AssertionError('failed to raise CodingError for unknown regex name')
+        except CodingError:
+            pass
+
+    def test_domain_labels_match_regexes(self):
+        # label based validation must agree with the original TLD regexes, using TLDs in the same case
+        # as the TLD files as only the label based validation is case insensitive
+        samples = ['COM', 'harisekhon.COM', 'a.b.c.COM', 'a' * 63 + '.COM', 'a' * 64 + '.COM', '-a.COM', 'a-.COM',
+                   'a_b.COM', 'a_b.c.COM', 'my-host.eu-west-1.compute.internal', 'host.', '.COM', 'a..COM',
+                   'harisekhon', 'ip-172-31-1-1', 'ip-172-31-1-1.eu-west-1.COMPUTE', 'ip-172-31-1-1.COM',
+                   '10.10.10.1', '10.10.10.256', '1.COM', 'hari@harisekhon.COM', "hari'sekhon@harisekhon.COM",
+                   'hari@@harisekhon.COM', '@harisekhon.COM', 'hari@harisekhon', 'hari', 'hari/host.COM@REALM.COM',
+                   'hari/host@REALM.COM', 'hari@REALM', 'hari/@REALM.COM', 'hari/a/b@REALM.COM', 'h@ri@REALM.COM']
+        for (regex, func) in (('domain_regex', isDomain),
+                              ('domain_regex_strict', isDomainStrict),
+                              ('fqdn_regex', isFqdn),
+                              ('hostname_regex', isHostname),
+                              ('host_regex', isHost),
+                              ('email_regex', isEmail),
+                              ('aws_hostname_regex', isAwsHostname),
+                              ('aws_fqdn_regex', isAwsFqdn),
+                              ('krb5_principal_regex', isKrb5Princ)):
+            for sample in samples:
+                self.assertEqual(bool(re.match('^' + getattr(utils, regex) + '$', sample)), func(sample),
+                                 '{0}({1!r}) differs from {2}'.format(func.__name__, sample, regex))
+        for sample in samples + ['http://harisekhon.COM:80/path?a=b', 'https://10.10.10.1/', 'http://host:123456',
+                                 'ftp://harisekhon.COM', 'http://harisekhon.COM:80:80', 'http://a b.COM/']:
+            url = sample if '://' in sample else 'http://' + sample
+            self.assertEqual(bool(re.match('^' + utils.url_regex + '$', url)), isUrl(sample),
+                             'isUrl({0!r}) differs from url_regex'.format(sample))
+
     def test_expand_units_bytes(self):
         assert expand_units('7', 'B') == 7
 
@@ -788,6 +955,51 @@ class UtilsTester(unittest.TestCase):
         self.assertFalse(isHost(' '))
         self.assertFalse(isHost(None))
 
+    def test_isHostPort(self):
+        self.assertTrue(isHostPort('harisekhon.com:80'))
+        self.assertTrue(isHostPort('harisekhon:443'))
+        self.assertTrue(isHostPort('10.10.10.1:65535'))
+        self.assertTrue(isHostPort('harisekhon.com', port_optional=True))
+        self.assertFalse(isHostPort('harisekhon.com'))
+        self.assertFalse(isHostPort('harisekhon.com:0'))
+        self.assertFalse(isHostPort('harisekhon.com:65536'))
+        self.assertFalse(isHostPort('10.10.10.256:80'))
+        self.assertFalse(isHostPort('harisekhon.com:80:80'))
+        self.assertFalse(isHostPort('NO_SERVER_AVAILABLE:80'))
+        self.assertFalse(isHostPort(' '))
+        self.assertFalse(isHostPort(None))
+
+    def test_is_many(self):
+        values = ['harisekhon.com', 'a' * 256, '10.10.10.1', None, 'ip-172-31-1-1', '10.10.10.256']
+        (mask, invalid_indexes) = is_many(isHost, values)
+        self.assertEqual(mask, [True, False, True, False, True, False])
+        self.assertEqual(invalid_indexes, [1, 3, 5])
+        # generators and tuples work the same
+        self.assertEqual(is_many(isHost, (_ for _ in values)), (mask, invalid_indexes))
+        self.assertEqual(is_many(isHost, tuple(values)), (mask, invalid_indexes))
+        self.assertEqual(is_many(isHost, []), ([], []))
+        # must agree with the scalar predicate
+        self.assertEqual(mask, [isHost(_) for _ in values])
+
+    def test_is_many_processes(self):
+        values = ['harisekhon.com:80', 'harisekhon.com', '10.10.10.1:8080', 'nonport:a'] * 5
+        expected = ([True, False, True, False] * 5, [_ for _ in range(20) if _ % 2])
+        self.assertEqual(is_many(isHostPort, values, processes=2, chunksize=3), expected)
+        # single chunk inputs don't fan out
+        self.assertEqual(is_many(isHostPort, values, processes=2), expected)
+
+    def test_is_many_exception(self):
+        for (predicate, values, chunksize) in ((None, ['a'], 1),
+                                               (isHost, 'harisekhon.com', 1),
+                                               (isHost, None, 1),
+                                               (isHost, ['a'], 0)):
+            try:
+                is_many(predicate, values, chunksize=chunksize)
+                raise AssertionError('is_many() failed to raise CodingError for {0}, {1}, {2}'
+                                     .format(predicate, values, chunksize))
+            except CodingError:
+                pass
+
     def test_isHostname(self):
         self.assertTrue(isHostname('harisekhon.com'))
         self.assertTrue(isHostname('harisekhon'))
@@ -1258,12 +1470,136 @@ class UtilsTester(unittest.TestCase):
     def test_read_file_without_comments(self):
         read_file_without_comments(self.libfile)
 
+    def test_json_loads(self):
+        expected = {'name': {'first': 'Hari', 'last': 'Sekhon'}}
+        self.assertEqual(json_loads(self.jsondata), expected)
+        self.assertEqual(json_loads(self.jsondata.encode('utf-8')), expected)
+        self.assertEqual(json_loads('"\u00e9"'), u'\u00e9')
+        # json module extensions and integers beyond 64 bits must decode the same whichever backend is used
+        self.assertEqual(json_loads('[123456789012345678901234567890, -18446744073709551616]'),
+                         [123456789012345678901234567890, -18446744073709551616])
+        self.assertTrue(isinstance(json_loads('[18446744073709551615]')[0], int))
+        # 19 digits below -2**63
+        self.assertEqual(json_loads('{"offset": -9223372036854775809}'), {'offset': -9223372036854775809})
+        self.assertEqual(json_loads(b'{"offset": -9223372036854775809}'), {'offset': -9223372036854775809})
+        self.assertEqual(str(json_loads('[NaN, Infinity]')), '[nan, inf]')
+        try:
+            json_loads(self.jsondata_broken)
+            raise AssertionError('json_loads() failed to raise ValueError for broken json')
+        except ValueError:
+            pass
+
+    def test_get_set_json_backend(self):
+        backend = get_json_backend()
+        self.assertIn(backend, utils._json_backends)
+        try:
+            set_json_backend('json')
+            self.assertEqual(get_json_backend(), 'json')
+            self.assertEqual(json_loads(self.jsondata), {'name': {'first': 'Hari', 'last': 'Sekhon'}})
+            self.assertTrue(isJson(self.jsondata))
+            self.assertFalse(isJson(self.jsondata_broken))
+        finally:
+            set_json_backend(backend)
+        self.assertEqual(get_json_backend(), backend)
+
+    def test_json_backend_without_orjson(self):
+        json_backend = utils._json_backend  # pylint: disable=protected-access
+        orjson = sys.modules.get('orjson')
+        # makes import orjson raise ImportError
+        sys.modules['orjson'] = None
+        try:
+            utils._json_backend = None  # pylint: disable=protected-access
+            self.assertEqual(get_json_backend(), 'json')
+            self.assertEqual(json_loads(self.jsondata), {'name': {'first': 'Hari', 'last': 'Sekhon'}})
+            self.assertEqual(json_loads(b'[-9223372036854775809]'), [-9223372036854775809])
+            try:
+                set_json_backend('orjson')
+                raise AssertionError('set_json_backend() failed to raise CodingError for uninstalled backend')
+            except CodingError:
+                pass
+        finally:
+            if orjson is None:
+                del sys.modules['orjson']
+            else:
+                sys.modules['orjson'] = orjson
+            utils._json_backend = json_backend  # pylint: disable=protected-access
+
+    def test_set_json_backend_exception(self):
+        try:
+            set_json_backend('nonexistent')
+            raise AssertionError('set_json_backend() failed to raise CodingError for nonexistent backend')
+        except CodingError:
+            pass
+
     def test_jsonpp(self):
         data = '{ "name": { "first": "Hari", "last": "Sekhon" } }'
         data2 = '{\n    "name": {\n        "first": "Hari",\n        "last": "Sekhon"\n    }\n}'
         # print("jsonpp(data) = " + jsonpp(data))
         self.assertEqual(jsonpp(json.loads(data)), data2)
         self.assertEqual(jsonpp(data), data2)
+        self.assertEqual(jsonpp(data.encode('utf-8')), data2)
+
+    json_paths_data = '''{"nodes": {"a1": {"name": "node1", "jvm": {"heap": 51.5, "pools": [1, 2]}},
+                                    "b2": {"name": "node2", "jvm": {"heap": 3, "pools": []}}},
+                          "items": [{"Hosts": {"host_name": "host1"}}, {"Hosts": {"host_name": "host2"}}],
+                          "item": null, "nested": [[1, {"flag": true}]]}'''
+    json_paths = ['nodes.*.name', 'nodes.*.jvm', 'nodes.*.jvm.pools', 'items.item.Hosts.host_name', 'missing',
+                  'nested.item.item', 'item', '*.name']
+    json_paths_expected = [('nodes.*.name', ['node1', 'node2']),
+                           ('nodes.*.jvm', [{'heap': 51.5, 'pools': [1, 2]}, {'heap': 3, 'pools': []}]),
+                           ('nodes.*.jvm.pools', [[1, 2], []]),
+                           ('items.item.Hosts.host_name', ['host1', 'host2']),
+                           ('missing', []),
+                           ('nested.item.item', [1, {'flag': True}]),
+                           ('item', [None]),
+                           ('*.name', [])]
+
+    def test_json_extract_paths(self):
+        import io
+        results = json_extract_paths(self.json_paths_data, self.json_paths)
+        self.assertEqual(list(results.items()), self.json_paths_expected)
+        # file-like streams such as requests response.raw
+        results = json_extract_paths(io.BytesIO(self.json_paths_data.encode('utf-8')), self.json_paths)
+        self.assertEqual(list(results.items()), self.json_paths_expected)
+        self.assertEqual(json_extract_paths('[1, 2]', [''])[''], [[1, 2]])
+        # single prefix fast path
+        for paths in (self.json_paths[:3:2], self.json_paths[3:4]):
+            results = json_extract_paths(io.BytesIO(self.json_paths_data.encode('utf-8')), paths)
+            self.assertEqual(list(results.items()), [_ for _ in self.json_paths_expected if _[0] in paths])
+
+    def test_json_extract_paths_without_ijson(self):
+        import io
+        ijson = sys.modules.get('ijson')
+        # makes import ijson raise ImportError
+        sys.modules['ijson'] = None
+        try:
+            results = json_extract_paths(self.json_paths_data, self.json_paths)
+            self.assertEqual(list(results.items()), self.json_paths_expected)
+            results = json_extract_paths(io.BytesIO(self.json_paths_data.encode('utf-8')), self.json_paths)
+            self.assertEqual(list(results.items()), self.json_paths_expected)
+            try:
+                json_extract_paths('{"a": ', ['a'])
+                raise AssertionError('json_extract_paths() failed to raise ValueError for broken json')
+            except ValueError:
+                pass
+        finally:
+            if ijson is None:
+                del sys.modules['ijson']
+            else:
+                sys.modules['ijson'] = ijson
+
+    def test_json_extract_paths_exception(self):
+        try:
+            json_extract_paths(self.jsondata_broken, ['name.first'])
+            raise AssertionError('json_extract_paths() failed to raise ValueError for broken json')
+        except ValueError:
+            pass
+        for paths in ('name', [], None, [1]):
+            try:
+                json_extract_paths(self.jsondata, paths)
+                raise AssertionError('json_extract_paths() failed to raise CodingError for paths {0}'.format(paths))
+            except CodingError:
+                pass
 
     def test_list_sort_dicts_by_value(self):
         myList = [{"name": "DATANODE"}, {"name": "STORM_UI_SERVER"}, {"name": "SUPERVISOR"}, {"name": "FLUME_HANDLER"},
@@ -2729,6 +3065,30 @@ class UtilsTester(unittest.TestCase):
 
 # ============================================================================ #
 
+    def test_validate_many(self):
+        self.assertTrue(validate_many(isHost, ['harisekhon.com', '10.10.10.1'], 'host'))
+        self.assertTrue(validate_many(isIP, iter(['10.10.10.1', '10.10.10.2'])))
+
+    def test_validate_many_exception(self):
+        try:
+            validate_many(isHost, ['harisekhon.com', '10.10.10.256', 'harisekhon', None], 'host')
+            raise AssertionError('validate_many() failed to raise exception for invalid hosts')
+        except InvalidOptionException as _:
+            self.assertIn("2/4 invalid host values defined at indexes: 1: '10.10.10.256', 3: 'None'", str(_))
+        try:
+            validate_many(isIP, ['a'] * 20, max_reported=2)
+            raise AssertionError('validate_many() failed to raise exception for invalid IPs')
+        except InvalidOptionException as _:
+            self.assertTrue(str(_).endswith("0: 'a', 1: 'a', ..."))
+
+    def test_validate_many_exception_empty(self):
+        for values in ([], None, 'harisekhon.com'):
+            try:
+                validate_many(isHost, values)
+                raise AssertionError('validate_many() failed to raise exception for {0}'.format(values))
+            except InvalidOptionException:
+                pass
+
     def test_validate_nosql_key(self):
         self.assertTrue(validate_nosql_key('HariSekhon:check_riak_write.pl:riak1:1385226607.02182:20abc'))
         self.assertTrue(validate_nosql_key('HariSekhon:check_riak_write.pl:riak1:1385226607.02182:20abc', 'name'))